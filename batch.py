@@ -0,0 +1,157 @@
+"""CSC111 Final Project, Batch Routing
+
+This python module answers many route queries without any user interaction. Queries are read from a
+csv or JSON lines file (or standard input), every query is answered against a single loaded road
+graph, and one JSON line of results is written per query as soon as it has been computed.
+
+Each query has an origin, a destination and a mode of transport. In a csv file these are the
+columns 'origin', 'destination' and 'mode' of the header row, and in a JSON lines file they are the
+keys of the same names. The mode may be left out, in which case it is 'motor'.
+
+For each query, the result line contains the shortest route ( computations.shortest_route() ), the
+most direct route ( computations.direct_route() ) and the fastest route in the given mode
+( computations.fastest_route() ), or an error message if either junction does not exist.
+
+Run it with:
+    python main.py batch queries.csv -o results.jsonl
+Add --workers N to spread the queries over N processes ( parallel.route_queries() ), and
+--algorithm ch to answer them from the saved contraction hierarchies of the csv file
+( hierarchy.py ).
+The routes in the results can then be drawn on a map without folium ( export.py ).
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Iterable, Iterator, Optional, TextIO
+import argparse
+import csv
+import itertools
+import json
+import sys
+import computations
+import graph_store
+
+
+def read_queries(lines: Iterable[str]) -> Iterator[tuple[str, str, str]]:
+    """Yield the (origin, destination, mode) of every query in lines, which are the lines of a
+    csv file with a header row or of a JSON lines file. The format is chosen from the first
+    non-blank line.
+
+    >>> list(read_queries(['origin,destination,mode', 'A406,LA Boundary,cycle']))
+    [('A406', 'LA Boundary', 'cycle')]
+    >>> list(read_queries(['{"origin": "A406", "destination": "A223"}', '']))
+    [('A406', 'A223', 'motor')]
+    """
+    lines = iter(lines)
+    first = next((line for line in lines if line.strip() != ''), None)
+    if first is None:
+        return
+
+    lines = itertools.chain([first], lines)
+    if first.lstrip().startswith('{'):
+        records = (json.loads(line) for line in lines if line.strip() != '')
+    else:
+        records = csv.DictReader(line for line in lines if line.strip() != '')
+
+    for record in records:
+        yield (record['origin'], record['destination'], record.get('mode') or 'motor')
+
+
+def answer_query(graph: computations.Graph, origin: str, destination: str, mode: str,
+                 algorithm: str = 'dijkstra') -> dict:
+    """Return a dictionary of the shortest, most direct and fastest routes from origin to
+    destination in graph, ready to be written as JSON. The shortest and fastest routes are
+    searched for with the given algorithm, as in computations.point_to_point().
+
+    Preconditions:
+    - mode != ''
+    - algorithm in computations.ALGORITHMS
+    """
+    result = {'origin': origin, 'destination': destination, 'mode': mode}
+    missing = [name for name in (origin, destination)
+               if not computations.has_junction(graph, name)]
+    if missing != []:
+        result['error'] = 'Unknown junction: ' + ', '.join(missing)
+        return result
+
+    path, distance = computations.shortest_route(graph, origin, destination, algorithm)
+    result['shortest'] = {'path': path, 'distance': distance}
+    path, distance = computations.direct_route(graph, origin, destination)
+    result['direct'] = {'path': path, 'distance': distance}
+    path, time_taken, distance = computations.fastest_route(graph, origin, destination, mode,
+                                                            algorithm)
+    result['fastest'] = {'path': path, 'time': time_taken, 'distance': distance}
+    return result
+
+
+def run_batch(graph: computations.Graph, queries: Iterable[tuple[str, str, str]],
+              output: TextIO, algorithm: str = 'dijkstra') -> int:
+    """Answer every (origin, destination, mode) query in queries against graph with the given
+    algorithm, writing one JSON line per query to output as soon as it is answered. Return the
+    number of queries.
+    """
+    count = 0
+    for origin, destination, mode in queries:
+        result = answer_query(graph, origin, destination, mode, algorithm)
+        output.write(json.dumps(result) + '\n')
+        count += 1
+    return count
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the batch routing command line with the given arguments (sys.argv[1:] by default).
+    """
+    parser = argparse.ArgumentParser(description='Answer route queries from a csv or JSON lines '
+                                                 'file and write JSON lines of results.')
+    parser.add_argument('queries', nargs='?', default='-',
+                        help='file of queries, or - for standard input (default)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='file to write results to, or - for standard output (default)')
+    parser.add_argument('--data', default='road.csv', help='road map csv file')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='number of worker processes (default 1, 0 for one per cpu)')
+    parser.add_argument('--chunk-size', type=int, default=64,
+                        help='number of queries handed to a worker at a time (default 64)')
+    parser.add_argument('--algorithm', choices=computations.ALGORITHMS, default='dijkstra',
+                        help='how to search for the shortest and fastest routes '
+                             '(default dijkstra)')
+    args = parser.parse_args(argv)
+
+    if args.algorithm == 'ch':
+        # Load the saved hierarchies before any workers are started, so they share them.
+        for weight in ('distance', 'cycle', 'motor'):
+            graph_store.get_hierarchy(args.data, weight)
+
+    queries_file = sys.stdin if args.queries == '-' else open(args.queries, newline='')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if args.workers == 1:
+            run_batch(graph_store.get_compact_graph(args.data), read_queries(queries_file),
+                      output_file, args.algorithm)
+        else:
+            # Imported here since parallel imports this module.
+            import parallel
+            for result in parallel.route_queries(read_queries(queries_file), args.data,
+                                                 args.workers or None, args.chunk_size,
+                                                 args.algorithm):
+                output_file.write(json.dumps(result) + '\n')
+    finally:
+        if queries_file is not sys.stdin:
+            queries_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == '__main__':
+    main()
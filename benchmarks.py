@@ -0,0 +1,351 @@
+"""CSC111 Final Project, Benchmarks
+
+This python module contains benchmarks that compare the routing computations in computations.py
+against the implementations they replaced, on randomly generated road systems of growing size.
+Run this file directly to print the timing tables.
+
+The list of benchmarks are:
+
+1. Heap based Dijkstra against the original list scan Dijkstra ( benchmark_shortest_route() )
+
+2. Throughput of batch route queries against the number of worker processes
+    ( benchmark_parallel_queries() )
+
+3. Junctions settled and time taken by A* search against Dijkstra's algorithm
+    ( benchmark_astar() )
+
+4. Junctions settled and time taken by bidirectional Dijkstra search against Dijkstra's
+    algorithm ( benchmark_bidirectional() )
+
+5. Junctions settled and time taken by contraction hierarchy queries against Dijkstra's
+    algorithm ( benchmark_hierarchy() )
+
+6. Time taken by concurrent route requests from a few busy origins with and without request
+    coalescing ( benchmark_coalescing() )
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Callable, Optional
+import asyncio
+import math
+import os
+import random
+import time
+import classes
+import coalesce
+import computations
+import graph_store
+import parallel
+
+
+def random_road_system(num_junctions: int, extra_roads: int, seed: int = 0) \
+        -> classes.RoadSystem:
+    """Return a connected RoadSystem with num_junctions junctions named 'J0', 'J1', ...
+
+    The junctions are first joined by a random spanning tree so that every pair is connected,
+    then extra_roads more roads are added between random pairs of junctions.
+
+    Preconditions:
+    - num_junctions >= 1
+    - extra_roads >= 0
+
+    >>> g = random_road_system(10, 5)
+    >>> len(g.junctions)
+    10
+    >>> g.connected('J0', 'J9')
+    True
+    """
+    rng = random.Random(seed)
+    graph = classes.RoadSystem()
+    names = [f'J{i}' for i in range(num_junctions)]
+    for name in names:
+        graph.add_junction(name)
+
+    for i in range(1, num_junctions):
+        graph.add_road(names[i], names[rng.randrange(i)], round(rng.uniform(0.1, 10.0), 1),
+                       rng.randint(0, 500), rng.randint(1, 50000))
+    for _ in range(extra_roads):
+        graph.add_road(rng.choice(names), rng.choice(names), round(rng.uniform(0.1, 10.0), 1),
+                       rng.randint(0, 500), rng.randint(1, 50000))
+    return graph
+
+
+def list_scan_shortest_route(graph: classes.RoadSystem, junction1_name: str,
+                             junction2_name: str) -> tuple[list, float]:
+    """The original implementation of computations.shortest_route, kept for comparison.
+    The unvisited junctions are kept in a list which is scanned for the minimum on every step.
+
+    Preconditions:
+    - junction1_name != '' and junction2_name != ''
+    """
+    if not graph.connected(junction1_name, junction2_name):
+        return ([], 0.0)
+
+    path_so_far = []
+    dict_all_dist = {junction1_name: (0, [])}
+    visited = []
+    unvisited = []
+    for v in graph.get_all_junctions():
+        unvisited.append(v)
+        if v != junction1_name:
+            dict_all_dist[v] = (math.inf, [])
+
+    while junction2_name in unvisited:
+        if junction1_name in unvisited:
+            current_vertex = junction1_name
+
+        else:
+            min_d = dict_all_dist[unvisited[0]]
+            current_vertex = unvisited[0]
+            for vertex in unvisited:
+                d = dict_all_dist[vertex]
+                if d < min_d:
+                    current_vertex = vertex
+
+        for neighbor in graph.junctions[current_vertex].neighbours:
+            if neighbor.name not in visited:
+                d = graph.get_junctions_dist(current_vertex, neighbor.name)
+                if d + dict_all_dist[current_vertex][0] < dict_all_dist[neighbor.name][0]:
+                    dict_all_dist[neighbor.name] = \
+                        (d + dict_all_dist[current_vertex][0], current_vertex)
+
+        visited.append(current_vertex)
+
+        unvisited.remove(current_vertex)
+
+    previous_vertex = dict_all_dist[junction2_name][1]
+    path_so_far.append(previous_vertex)
+    while previous_vertex != []:
+        previous_vertex = dict_all_dist[previous_vertex][1]
+        path_so_far.insert(0, previous_vertex)
+
+    path_so_far.append(junction2_name)
+    return (path_so_far[1:], float(dict_all_dist[junction2_name][0]))
+
+
+def time_queries(route_function: Callable, graph: classes.RoadSystem,
+                 queries: list[tuple[str, str]]) -> float:
+    """Return the average number of seconds route_function takes to answer one of queries.
+
+    Preconditions:
+    - queries != []
+    """
+    start_time = time.perf_counter()
+    for start, end in queries:
+        route_function(graph, start, end)
+    return (time.perf_counter() - start_time) / len(queries)
+
+
+def random_queries(graph: computations.Graph, num_queries: int, seed: int = 0) \
+        -> list[tuple[str, str]]:
+    """Return num_queries random (start, end) pairs of junction names in graph."""
+    rng = random.Random(seed)
+    names = graph.get_all_junctions()
+    return [(rng.choice(names), rng.choice(names)) for _ in range(num_queries)]
+
+
+def benchmark_shortest_route(sizes: tuple = (100, 250, 500, 1000, 2000),
+                             num_queries: int = 10) -> list[tuple[int, float, float]]:
+    """Time the list scan and heap based shortest route on random road systems with the given
+    numbers of junctions and print a table of the average time per query.
+
+    Return a list of (number of junctions, list scan seconds, heap seconds) tuples.
+    """
+    results = []
+    print(f'{"junctions":>10} {"list scan (ms)":>15} {"heap (ms)":>10} {"speedup":>8}')
+    for size in sizes:
+        graph = random_road_system(size, size // 2)
+        queries = random_queries(graph, num_queries)
+        old = time_queries(list_scan_shortest_route, graph, queries)
+        new = time_queries(computations.shortest_route, graph, queries)
+        results.append((size, old, new))
+        print(f'{size:>10} {old * 1000:>15.2f} {new * 1000:>10.2f} {old / new:>7.1f}x')
+
+    return results
+
+
+def benchmark_parallel_queries(worker_counts: Optional[tuple] = None, num_queries: int = 2000,
+                               chunk_size: int = 64) -> list[tuple[int, float]]:
+    """Answer num_queries random route queries on the London road graph with each number of
+    worker processes in worker_counts (1, 2, 4, ... up to the number of cpus by default), and
+    print a table of the queries answered per second.
+
+    Return a list of (number of workers, queries per second) tuples.
+    """
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = tuple(sorted({min(2 ** i, cpus) for i in range(cpus.bit_length() + 1)}))
+
+    graph = graph_store.get_compact_graph('road.csv')
+    modes = ['cycle', 'motor']
+    queries = [(start, end, modes[i % 2])
+               for i, (start, end) in enumerate(random_queries(graph, num_queries))]
+    results = []
+    print(f'{"workers":>8} {"queries/s":>10} {"speedup":>8}')
+    for workers in worker_counts:
+        start_time = time.perf_counter()
+        for _ in parallel.route_queries(queries, 'road.csv', workers, chunk_size):
+            pass
+        throughput = num_queries / (time.perf_counter() - start_time)
+        results.append((workers, throughput))
+        print(f'{workers:>8} {throughput:>10.0f} {throughput / results[0][1]:>7.1f}x')
+
+    return results
+
+
+def benchmark_astar(num_queries: int = 500) -> dict[str, tuple[float, float]]:
+    """Find the route between num_queries random pairs of junctions of the London road graph for
+    each road weight, once by Dijkstra's algorithm and once by A* search, and print a table of
+    the mean number of junctions settled and the total time taken by each.
+
+    Return a dictionary mapping each weight to the (settled, time) ratios of A* to Dijkstra.
+    """
+    graph = graph_store.get_compact_graph('road.csv')
+    for weight in ('distance', 'cycle', 'motor'):
+        computations.heuristic_scale(graph, weight)
+    return compare_searches(graph, 'a*', computations.astar, num_queries)
+
+
+def benchmark_bidirectional(num_queries: int = 500) -> dict[str, tuple[float, float]]:
+    """Find the route between num_queries random pairs of junctions of the London road graph for
+    each road weight, once by Dijkstra's algorithm and once by bidirectional Dijkstra search, and
+    print a table of the mean number of junctions settled and the total time taken by each.
+
+    Return a dictionary mapping each weight to the (settled, time) ratios of the bidirectional
+    search to Dijkstra.
+    """
+    graph = graph_store.get_compact_graph('road.csv')
+    return compare_searches(graph, 'bidir', computations.bidirectional_dijkstra, num_queries)
+
+
+def benchmark_hierarchy(num_queries: int = 500) -> dict[str, tuple[float, float]]:
+    """Find the route between num_queries random pairs of junctions of the London road graph for
+    each road weight, once by Dijkstra's algorithm and once from the saved contraction hierarchy
+    of the weight, and print a table of the mean number of junctions settled and the total time
+    taken by each. The time to load or build the hierarchies is not included.
+
+    Return a dictionary mapping each weight to the (settled, time) ratios of the contraction
+    hierarchy to Dijkstra.
+    """
+    graph = graph_store.get_compact_graph('road.csv')
+    for weight in ('distance', 'cycle', 'motor'):
+        graph_store.get_hierarchy('road.csv', weight)
+    return compare_searches(graph, 'ch',
+                            lambda g, start, end, weight: g.hierarchies[weight].route(start, end),
+                            num_queries)
+
+
+def benchmark_coalescing(num_requests: int = 2000, num_origins: int = 20) \
+        -> dict[str, float]:
+    """Make num_requests concurrent shortest and fastest route requests on the London road graph,
+    each from one of num_origins random origins to a random destination, once by answering each
+    request with its own search and once through a coalesce.RouteCoalescer. Print the time taken
+    by each and the statistics of the coalescer.
+
+    Return the statistics of the coalescer, along with the ratio of the time taken with
+    coalescing to the time taken without.
+    """
+    graph = graph_store.get_graph('road.csv')
+    rng = random.Random(0)
+    origins = [start for start, _ in random_queries(graph, num_origins)]
+    modes = ['distance', 'cycle', 'motor']
+    requests = [(rng.choice(origins), end, modes[i % 3])
+                for i, (_, end) in enumerate(random_queries(graph, num_requests, seed=1))]
+
+    def answer(start: str, end: str, mode: str) -> tuple:
+        """Answer one request with its own search."""
+        if mode == 'distance':
+            return computations.shortest_route(graph, start, end)
+        return computations.fastest_route(graph, start, end, mode)
+
+    start_time = time.perf_counter()
+    expected = [answer(start, end, mode) for start, end, mode in requests]
+    separate_time = time.perf_counter() - start_time
+
+    coalescer = coalesce.RouteCoalescer(graph)
+
+    async def answer_all() -> list:
+        """Answer every request through coalescer at once."""
+        return await asyncio.gather(*(coalescer.shortest_route(start, end) if mode == 'distance'
+                                      else coalescer.fastest_route(start, end, mode)
+                                      for start, end, mode in requests))
+
+    start_time = time.perf_counter()
+    results = asyncio.run(answer_all())
+    coalesced_time = time.perf_counter() - start_time
+
+    stats = coalescer.stats()
+    stats['time_ratio'] = coalesced_time / separate_time
+    print(f'{"requests":>8} {"searches":>8} {"separate s":>10} {"coalesced s":>11} {"same":>5}')
+    print(f'{num_requests:>8} {stats["searches"]:>8} {separate_time:>10.3f} '
+          f'{coalesced_time:>11.3f} {str(results == expected):>5}')
+    return stats
+
+
+def compare_searches(graph: computations.Graph, label: str,
+                     search: Callable[[computations.Graph, str, str, str], tuple],
+                     num_queries: int) -> dict[str, tuple[float, float]]:
+    """Find the route between num_queries random pairs of junctions of graph for each road
+    weight, once by computations.dijkstra_keys() and once by search, and print a table of the
+    mean number of junctions settled and the total time taken by each. search returns the
+    number of junctions it settled as the last item of its result.
+
+    Return a dictionary mapping each weight to the (settled, time) ratios of search to Dijkstra.
+    """
+    queries = [(computations.junction_key(graph, start), computations.junction_key(graph, end),
+                start, end) for start, end in random_queries(graph, num_queries)]
+    results = {}
+    print(f'{"weight":>8} {"dijkstra settled":>16} {label + " settled":>14} {"dijkstra s":>10} '
+          f'{label + " s":>8}')
+    for weight in ('distance', 'cycle', 'motor'):
+        start_time = time.perf_counter()
+        dijkstra_settled = sum(len(computations.dijkstra_keys(graph, source, target,
+                                                              weight=weight)[0])
+                               for source, target, _, _ in queries)
+        dijkstra_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        search_settled = sum(search(graph, start, end, weight)[-1] for _, _, start, end in queries)
+        search_time = time.perf_counter() - start_time
+
+        results[weight] = (search_settled / dijkstra_settled, search_time / dijkstra_time)
+        print(f'{weight:>8} {dijkstra_settled / num_queries:>16.1f} '
+              f'{search_settled / num_queries:>14.1f} {dijkstra_time:>10.3f} {search_time:>8.3f}')
+
+    return results
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    benchmark_shortest_route()
+    benchmark_parallel_queries()
+    benchmark_astar()
+    benchmark_bidirectional()
+    benchmark_hierarchy()
+    benchmark_coalescing()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['asyncio', 'math', 'os', 'random', 'time', 'typing', 'classes',
+                          'coalesce', 'computations', 'graph_store', 'parallel'],
+        'allowed-io': ['benchmark_shortest_route', 'benchmark_parallel_queries',
+                       'benchmark_astar', 'benchmark_bidirectional', 'benchmark_hierarchy',
+                       'benchmark_coalescing', 'compare_searches'],
+        'max-nested-blocks': 5,
+    })
@@ -4,6 +4,11 @@ This python module contains classes for junctions and road system(entire system
 functions to read road map data, add junctions, add roads, get distance, location, vehicle data,
 compute the time between two junctions, and create the graph according to the dataset.
 
+A RoadSystem can also be kept up to date with new traffic counts without loading the whole csv
+file again, by applying a stream of updates to its roads ( RoadSystem.apply_updates(), with
+read_updates() to read updates from a csv file and diff_updates() to compute them from a newer
+version of the road map data ).
+
 
 Copyright and Usage Information
 ===============================
@@ -19,8 +24,11 @@ last updated in October 2020.
 """
 
 from __future__ import annotations
-from typing import Any, Union
+from typing import AbstractSet, Any, Iterable, Iterator, Optional, Union
 import csv
+import math
+import numpy as np
+import ingest
 
 
 class Junction:
@@ -68,18 +76,48 @@ class RoadSystem:
 
     Instance Attributes:
         - junctions - A dictionary of the junction name with the junction object.
+        - locations - A dictionary mapping the unordered pair of junction names of a road to the
+         [latitude, longitude] of the count point on that road.
+        - travel_times - A dictionary mapping the unordered pair of junction names of a road to
+         the time in hours it takes to travel along it by cycle and by motor vehicle, as computed
+         by travel_time(). A time of math.inf means the road cannot be used in that mode.
+        - heuristic_scales - A dictionary mapping a road weight to the scale of the A* search
+         heuristic for that weight, once it has been computed by computations.heuristic_scale().
+        - hierarchies - A dictionary mapping a road weight to the contraction hierarchy for that
+         weight, once it has been built by hierarchy.graph_hierarchy().
+        - components - A union-find forest over the junction names: maps each junction name to
+         another junction in the same connected component, or to itself if it is the
+         representative of its component. Use find_component() to get the representative.
+        - versions - A dictionary mapping each road weight ('distance', 'cycle' and 'motor') to
+         the number of changes made so far to the roads that can affect routes by that weight.
+         Results computed from the graph can be kept for as long as the version of the weight
+         they used stays the same.
 
     Representation Invariants:
     - isinstance(self.junctions, dict)
+    - all(len(pair) in {1, 2} for pair in self.locations)
+    - all(len(pair) in {1, 2} for pair in self.travel_times)
 
     """
 
     junctions: dict[Any, Junction]
+    locations: dict[frozenset[str], list[float]]
+    travel_times: dict[frozenset[str], tuple[float, float]]
+    heuristic_scales: dict[str, float]
+    hierarchies: dict[str, Any]
+    components: dict[str, str]
+    versions: dict[str, int]
 
     def __init__(self) -> None:
         """Initialize an empty RoadSystem
         """
         self.junctions = {}
+        self.locations = {}
+        self.travel_times = {}
+        self.heuristic_scales = {}
+        self.hierarchies = {}
+        self.components = {}
+        self.versions = {'distance': 0, 'cycle': 0, 'motor': 0}
 
     def get_all_junctions(self) -> list:
         """Return a list of all the junctions in the RoadSystem"""
@@ -105,12 +143,20 @@ class RoadSystem:
             return None
         else:
             self.junctions[road_name] = Junction(road_name, {})
+            self.components[road_name] = road_name
             return None
 
     def add_road(self, junction1_name: str, junction2_name: str,
-                 distance: float, cycles: int, motor: int) -> None:
+                 distance: float, cycles: int, motor: int,
+                 location: Optional[list[float]] = None, compute_times: bool = True) -> None:
         """Adds a road(edge) if two junctions are adjacent to one another
 
+        If location is given, it is recorded as the [latitude, longitude] of the road unless a
+        location was already recorded for a road between the same two junctions.
+
+        If compute_times is False, the travel times of the road are not computed. This is used
+        when adding many roads at once, followed by a single call to compute_travel_times().
+
         Raises a ValueError if either of the junctions entered as parameter aren't present in
         self._junctions.
 
@@ -128,10 +174,259 @@ class RoadSystem:
 
             v1.neighbours[v2] = (distance, [cycles, motor])
             v2.neighbours[v1] = (distance, [cycles, motor])
+            root1 = self.find_component(junction1_name)
+            root2 = self.find_component(junction2_name)
+            if root1 != root2:
+                self.components[root2] = root1
+            if compute_times:
+                self.travel_times[frozenset((junction1_name, junction2_name))] = \
+                    (travel_time(distance, cycles), travel_time(distance, motor))
+            if location is not None:
+                self.locations.setdefault(frozenset((junction1_name, junction2_name)), location)
+            self.heuristic_scales = {}
+            self.hierarchies = {}
+            for weight in self.versions:
+                self.versions[weight] += 1
             return None
         else:
             raise ValueError
 
+    def update_counts(self, junction1_name: str, junction2_name: str,
+                      cycles: Optional[int] = None, motor: Optional[int] = None) -> None:
+        """Change the number of cycles and motor vehicles counted on the road between the two
+        junctions. A count that is None is left as it is.
+
+        Only the travel times of this road are recomputed, and only the cached results for the
+        modes whose counts changed are dropped.
+
+        Raises a ValueError if there is no road between the two junctions.
+
+        Preconditions:
+          - cycles is None or cycles >= 0
+          - motor is None or motor >= 0
+
+        >>> g = RoadSystem()
+        >>> g.add_junction('A')
+        >>> g.add_junction('B')
+        >>> g.add_road('A', 'B', 2.0, 0, 240)
+        >>> g.update_counts('B', 'A', cycles=24)
+        >>> g.travel_times[frozenset(('A', 'B'))], g.get_road_vehicle_data('A', 'B', 'cycle')
+        ((0.017, 0.017), 24)
+        >>> g.versions['distance'] < g.versions['cycle']
+        True
+        """
+        distance = self.get_junctions_dist(junction1_name, junction2_name) \
+            if junction1_name in self.junctions and junction2_name in self.junctions else None
+        if distance is None:
+            raise ValueError
+
+        v1 = self.junctions[junction1_name]
+        v2 = self.junctions[junction2_name]
+        old_counts = v1.neighbours[v2][1]
+        counts = [old_counts[0] if cycles is None else cycles,
+                  old_counts[1] if motor is None else motor]
+        v1.neighbours[v2] = (distance, counts)
+        v2.neighbours[v1] = (distance, list(counts))
+        self.travel_times[frozenset((junction1_name, junction2_name))] = \
+            (travel_time(distance, counts[0]), travel_time(distance, counts[1]))
+
+        for weight, old, new in [('cycle', old_counts[0], counts[0]),
+                                 ('motor', old_counts[1], counts[1])]:
+            if old != new:
+                self.heuristic_scales.pop(weight, None)
+                self.hierarchies.pop(weight, None)
+                self.versions[weight] += 1
+
+    def remove_road(self, junction1_name: str, junction2_name: str) -> None:
+        """Remove the road between the two junctions.
+
+        If that splits a connected component in two, the component labels of both parts are
+        rebuilt by a breadth-first search over them, since a union-find forest cannot be split.
+
+        Raises a ValueError if there is no road between the two junctions.
+
+        >>> g = RoadSystem()
+        >>> for junction in ['A', 'B', 'C']:
+        ...     g.add_junction(junction)
+        >>> g.add_road('A', 'B', 1.0, 0, 0)
+        >>> g.add_road('B', 'C', 1.0, 0, 0)
+        >>> g.remove_road('B', 'C')
+        >>> g.connected('A', 'B'), g.connected('A', 'C')
+        (True, False)
+        >>> g.add_road('B', 'C', 1.0, 0, 0, compute_times=False)
+        >>> g.remove_road('B', 'C')
+        >>> g.get_junctions_dist('B', 'C') is None
+        True
+        """
+        if junction1_name not in self.junctions or junction2_name not in self.junctions \
+                or self.get_junctions_dist(junction1_name, junction2_name) is None:
+            raise ValueError
+
+        v1 = self.junctions[junction1_name]
+        v2 = self.junctions[junction2_name]
+        v1.neighbours.pop(v2)
+        v2.neighbours.pop(v1, None)
+        pair = frozenset((junction1_name, junction2_name))
+        self.travel_times.pop(pair, None)
+        self.locations.pop(pair, None)
+
+        part = self.component_of(junction1_name)
+        if junction2_name not in part:
+            for name in part:
+                self.components[name] = junction1_name
+            for name in self.component_of(junction2_name):
+                self.components[name] = junction2_name
+
+        self.heuristic_scales = {}
+        self.hierarchies = {}
+        for weight in self.versions:
+            self.versions[weight] += 1
+
+    def component_of(self, name: str) -> set[str]:
+        """Return the set of names of the junctions that can be reached from the junction with
+        the given name, found by a breadth-first search.
+
+        Preconditions:
+        - name in self.junctions
+        """
+        found = {name}
+        queue = [self.junctions[name]]
+        while queue:
+            junction = queue.pop()
+            for v in junction.neighbours:
+                if v.name not in found:
+                    found.add(v.name)
+                    queue.append(v)
+        return found
+
+    def apply_updates(self, updates: Iterable[dict[str, Any]]) -> int:
+        """Apply every update in updates to the roads of this RoadSystem in order, and return the
+        number of updates applied.
+
+        Each update is a dictionary with the keys 'start_junction_road_name' and
+        'end_junction_road_name' of the road it changes, named as in the columns of the road map
+        csv file, and a key 'change' which is one of:
+        - 'counts': change the counts of the road to the values of the keys 'pedal_cycles'
+         and/or 'all_motor_vehicles' ( update_counts() )
+        - 'add': add the road, adding its junctions if needed, from the keys 'link_length_km',
+         'pedal_cycles', 'all_motor_vehicles', and optionally 'latitude' and 'longitude'
+         ( add_road() )
+        - 'remove': remove the road ( remove_road() )
+        The values may be numbers or strings of numbers, as read from a csv file.
+
+        Raises a ValueError for an unknown change, or a change to a road that does not exist.
+
+        >>> g = RoadSystem()
+        >>> g.apply_updates([
+        ...     {'change': 'add', 'start_junction_road_name': 'A',
+        ...      'end_junction_road_name': 'B', 'link_length_km': '2.0', 'pedal_cycles': '0',
+        ...      'all_motor_vehicles': '240'},
+        ...     {'change': 'counts', 'start_junction_road_name': 'A',
+        ...      'end_junction_road_name': 'B', 'pedal_cycles': '24'}])
+        2
+        >>> g.weighted_neighbours('A', 'cycle')
+        [('B', 0.017)]
+        """
+        count = 0
+        for update in updates:
+            start = update['start_junction_road_name']
+            end = update['end_junction_road_name']
+            if update['change'] == 'counts':
+                self.update_counts(start, end, _optional_count(update, 'pedal_cycles'),
+                                   _optional_count(update, 'all_motor_vehicles'))
+            elif update['change'] == 'add':
+                location = None
+                if update.get('latitude') not in (None, '') \
+                        and update.get('longitude') not in (None, ''):
+                    location = [float(update['latitude']), float(update['longitude'])]
+                self.add_junction(start)
+                self.add_junction(end)
+                self.add_road(start, end, float(update['link_length_km']),
+                              int(update['pedal_cycles']), int(update['all_motor_vehicles']),
+                              location)
+            elif update['change'] == 'remove':
+                self.remove_road(start, end)
+            else:
+                raise ValueError
+            count += 1
+        return count
+
+    def compute_travel_times(self) -> None:
+        """Recompute the travel times of every road in the RoadSystem in one vectorized pass
+        with travel_times().
+
+        >>> g = RoadSystem()
+        >>> g.add_junction('A')
+        >>> g.add_junction('B')
+        >>> g.add_road('A', 'B', 2.0, 0, 240, compute_times=False)
+        >>> g.compute_travel_times()
+        >>> g.travel_times[frozenset(('A', 'B'))]
+        (inf, 0.017)
+        """
+        roads = {}
+        for name, junction in self.junctions.items():
+            for v, (distance, (cycles, motor)) in junction.neighbours.items():
+                roads[frozenset((name, v.name))] = (distance, cycles, motor)
+
+        data = np.array(list(roads.values()), dtype=float).reshape((len(roads), 3))
+        cycle_times = travel_times(data[:, 0], data[:, 1]).tolist()
+        motor_times = travel_times(data[:, 0], data[:, 2]).tolist()
+        self.travel_times = dict(zip(roads, zip(cycle_times, motor_times)))
+        self.heuristic_scales = {}
+        self.hierarchies = {}
+
+    def junction_position(self, name: str) -> Optional[tuple[float, float, float]]:
+        """Return the approximate position of the junction with the given name as
+        (latitude, longitude, error in km), or None if none of its roads have a location.
+
+        Junction locations are not in the data, so this is the location of the count point on
+        the shortest road leaving the junction that has one. Since the count point is on that
+        road, the junction is no further from it than the length of the road, which is the error.
+
+        Preconditions:
+        - name in self.junctions
+        """
+        best = None
+        for v, (distance, _) in self.junctions[name].neighbours.items():
+            location = self.locations.get(frozenset((name, v.name)))
+            if location is not None and (best is None or distance < best[2]):
+                best = (location[0], location[1], distance)
+        return best
+
+    def path_travel_times(self, path: list[str], mode: str) -> np.ndarray:
+        """Return an array of the time in hours taken to travel along each road of path in the
+        given mode of transport. Roads that cannot be used in that mode take math.inf hours.
+
+        Preconditions:
+        - mode != ''
+        - every pair of consecutive junctions in path are neighbours
+
+        >>> g = RoadSystem()
+        >>> for junction in ['A', 'B', 'C']:
+        ...     g.add_junction(junction)
+        >>> g.add_road('A', 'B', 1.0, 0, 240)
+        >>> g.add_road('B', 'C', 2.0, 24, 240)
+        >>> g.path_travel_times(['A', 'B', 'C'], 'motor').tolist()
+        [0.017, 0.017]
+        >>> g.path_time(['A', 'B', 'C'], 'cycle')
+        inf
+        """
+        index = 0 if mode == 'cycle' else 1
+        pairs = map(frozenset, zip(path, path[1:]))
+        return np.fromiter((self.travel_times[pair][index] for pair in pairs), dtype=float,
+                           count=max(len(path) - 1, 0))
+
+    def path_time(self, path: list[str], mode: str) -> float:
+        """Return the total time in hours taken to travel along path in the given mode of
+        transport, rounded to 3 decimal places, or math.inf if the path uses a road that cannot be
+        used in that mode.
+
+        Preconditions:
+        - mode != ''
+        - every pair of consecutive junctions in path are neighbours
+        """
+        return round(float(self.path_travel_times(path, mode).sum()), 3)
+
     def get_junctions_dist(self, start: str, end: str) -> Union[float, None]:
         """ Return the distance associated with the start and end junction if they are neighbours.
 
@@ -148,32 +443,23 @@ class RoadSystem:
         else:
             return None
 
-    @staticmethod
-    def get_junctions_location(start: str, end: str) -> [float, float]:
+    def get_junctions_location(self, start: str, end: str) -> list[float]:
         """ Return the location as [latitude, longitude] associated with the start and end junction.
 
+        Return [] if no location was recorded for the road between them.
+
         Precondition:
         - start != ''
         - end != ''
-        """
-        dict_junctions = load_dict('road.csv')
-        location = []
-        start_vertex_dict = dict_junctions[start]
-        for value in start_vertex_dict:
-            if value['end junction'] == end:
-                location.extend([value['latitude'], value['longitude']])
-                break
-
-        if location != []:
-            return location
-        else:
-            end_vertex_dict = dict_junctions[end]
-            for value in end_vertex_dict:
-                if value['end junction'] == start:
-                    location.extend([value['latitude'], value['longitude']])
-                    break
 
-            return location
+        >>> g = RoadSystem()
+        >>> g.add_junction('A')
+        >>> g.add_junction('B')
+        >>> g.add_road('A', 'B', 1.0, 0, 0, [51.5, -0.1])
+        >>> g.get_junctions_location('B', 'A')
+        [51.5, -0.1]
+        """
+        return list(self.locations.get(frozenset((start, end)), []))
 
     def get_road_vehicle_data(self, start: str, end: str, mode: str) -> Union[int, None]:
         """ Return the number of vehicles present on the road between start and end junctions,
@@ -197,14 +483,78 @@ class RoadSystem:
         else:
             return None
 
+    def weighted_neighbours(self, name: str, weight: str = 'distance') \
+            -> list[tuple[str, float]]:
+        """Return a list of (neighbour name, road weight) for every road leaving the junction
+        with the given name.
+
+        If weight is 'distance', the road weight is its length. If weight is 'cycle' or 'motor',
+        the road weight is its travel time in that mode, and roads that cannot be used in that
+        mode are left out.
+
+        Preconditions:
+        - name in self.junctions
+        - weight in {'distance', 'cycle', 'motor'}
+
+        >>> g = RoadSystem()
+        >>> for junction in ['A', 'B', 'C']:
+        ...     g.add_junction(junction)
+        >>> g.add_road('A', 'B', 1.0, 0, 240)
+        >>> g.add_road('A', 'C', 2.0, 24, 240)
+        >>> g.weighted_neighbours('A')
+        [('B', 1.0), ('C', 2.0)]
+        >>> g.weighted_neighbours('A', 'cycle')
+        [('C', 0.017)]
+        """
+        neighbours = self.junctions[name].neighbours
+        if weight == 'distance':
+            return [(v.name, distance) for v, (distance, _) in neighbours.items()]
+
+        index = 0 if weight == 'cycle' else 1
+        result = []
+        for v in neighbours:
+            time_taken = self.travel_times[frozenset((name, v.name))][index]
+            if time_taken != math.inf:
+                result.append((v.name, time_taken))
+        return result
+
+    def find_component(self, name: str) -> str:
+        """Return the representative junction of the connected component containing the junction
+        with the given name. Two junctions are connected exactly when they have the same
+        representative.
+
+        Preconditions:
+        - name in self.junctions
+        """
+        root = name
+        while self.components[root] != root:
+            root = self.components[root]
+
+        # Point every junction on the way straight at the root, so later calls are faster.
+        while self.components[name] != root:
+            self.components[name], name = root, self.components[name]
+        return root
+
     def connected(self, item1: Any, item2: Any) -> bool:
         """Return whether item1 and item2 are connected vertices in this graph.
 
         Return False if item1 or item2 do not appear as vertices in this graph.
+
+        The connected components are kept up to date by add_road(), so this does not search the
+        graph.
+
+        >>> g = RoadSystem()
+        >>> for junction in ['A', 'B', 'C']:
+        ...     g.add_junction(junction)
+        >>> g.add_road('A', 'B', 1.0, 0, 0)
+        >>> g.connected('A', 'B'), g.connected('A', 'C')
+        (True, False)
+        >>> g.add_road('B', 'C', 1.0, 0, 0)
+        >>> g.connected('A', 'C')
+        True
         """
         if item1 in self.junctions and item2 in self.junctions:
-            v1 = self.junctions[item1]
-            return v1.check_connected(item2, set())  # Pass in an empty "visited" set
+            return self.find_component(item1) == self.find_component(item2)
         else:
             return False
 
@@ -213,59 +563,175 @@ class RoadSystem:
         This method calculates the time taken based on the mode of transport the user inputs,
         accounting for any delays due to traffic.
 
+        The times are computed by travel_time() when the road is added, so this is a lookup.
+
         Preconditions:
         - mode != ''
         - start != ''
         - end != ''
         """
-        dist = self.get_junctions_dist(start, end)
-        vehicle = self.get_road_vehicle_data(start, end, mode)
         if mode == 'cycle':
-            if vehicle == 0:
+            time_taken = self.travel_times[frozenset((start, end))][0]
+            if time_taken == math.inf:
                 return 'Cycles cannot be used on that road!'
-            else:
-                cycle_flow = vehicle / 24
-                cycle_density = (cycle_flow / 60.0) / dist
-                speed = float(cycle_flow) / float(cycle_density)
-                time_taken = dist / speed
         else:
-            motor_flow = vehicle / 24
-            motor_density = (motor_flow / 60.0) / dist
-            speed = motor_flow / motor_density
-            time_taken = dist / speed
+            time_taken = self.travel_times[frozenset((start, end))][1]
 
-        return round(time_taken, 3)
+        return time_taken
 
 
-def load_graph(file_name: str) -> RoadSystem:
+def travel_time(distance: float, vehicles: int) -> float:
+    """Return the time in hours taken to travel a road of the given distance on which the given
+    number of vehicles were counted, accounting for any delays due to traffic.
+
+    Return math.inf if no vehicles were counted, since the road cannot be used in that mode.
+
+    Preconditions:
+    - distance >= 0.0
+    - vehicles >= 0
+
+    >>> travel_time(2.0, 240)
+    0.017
+    >>> travel_time(2.0, 0)
+    inf
+    """
+    if vehicles == 0:
+        return math.inf
+    elif distance == 0.0:
+        return 0.0
+    else:
+        flow = vehicles / 24
+        density = (flow / 60.0) / distance
+        speed = flow / density
+        return round(distance / speed, 3)
+
+
+def travel_times(distances: np.ndarray, vehicles: np.ndarray) -> np.ndarray:
+    """Return the array of results of travel_time() for each pair of corresponding elements
+    of distances and vehicles, computed in one vectorized pass.
+
+    Preconditions:
+    - distances.shape == vehicles.shape
+    - all(distances >= 0.0) and all(vehicles >= 0)
+
+    >>> travel_times(np.array([2.0, 2.0, 0.0]), np.array([240, 0, 5])).tolist()
+    [0.017, inf, 0.0]
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flow = vehicles / 24
+        density = (flow / 60.0) / distances
+        speed = flow / density
+        times = np.round(distances / speed, 3)
+    times[distances == 0.0] = 0.0
+    times[vehicles == 0] = math.inf
+    return times
+
+
+def load_graph(file_name: str, regions: Optional[AbstractSet[str]] = None,
+               years: Optional[AbstractSet[int]] = None,
+               road_types: Optional[AbstractSet[str]] = None, policy: str = 'latest') \
+        -> RoadSystem:
     """Read file_name and return a graph where the vertices are the start_junction_road_name
     and end_junction_road_name with their edge and their distance.
     Both the start and end junctions are major roads located in London.
+    The latitude and longitude of each road are kept in the graph's locations, and the travel
+    times of all roads are computed together once every road has been added.
+
+    The rows are streamed by ingest.read_count_points(), keeping only those in the given
+    regions, years and road types, and the rows of each road are combined by
+    ingest.aggregate_count_points() with the given policy.
 
     Preconditions
        - isinstance(file_name, str)
        - file_name is a path to the csv file location
+       - policy in ingest.POLICIES
 
     Note: The file_name is 'road.csv'
     """
+    points = ingest.read_count_points(file_name, regions, years, road_types)
+    junctions, roads, locations = ingest.aggregate_count_points(points, policy)
     graph = RoadSystem()
-    with open(file_name) as csv_file:
-        reader = csv.reader(csv_file)
-        next(reader)
-        for row in reader:
-            graph.add_junction(row[4])
-            graph.add_junction(row[5])
-            graph.add_road(row[4], row[5], float(row[8]), int(row[9]), int(row[10]))
+    for name in junctions:
+        graph.add_junction(name)
+    for pair, point in roads.items():
+        graph.add_road(point.start, point.end, point.distance, point.cycles, point.motor,
+                       list(locations[pair][:2]), compute_times=False)
+    graph.compute_travel_times()
     return graph
 
 
-def load_dict(file_name: str) -> dict[str, list[dict]]:
+def _optional_count(update: dict[str, Any], key: str) -> Optional[int]:
+    """Return the count of update under key as an int, or None if it is missing or blank."""
+    value = update.get(key)
+    return None if value in (None, '') else int(value)
+
+
+def read_updates(file_name: str) -> Iterator[dict[str, str]]:
+    """Yield the updates in the csv file file_name, in the form taken by
+    RoadSystem.apply_updates(). The header row of the file names the keys of each update.
+
+    Preconditions
+       - file_name is a path to a csv file with the columns change,
+         start_junction_road_name and end_junction_road_name
+    """
+    with open(file_name, newline='') as csv_file:
+        yield from csv.DictReader(csv_file)
+
+
+def diff_updates(graph: RoadSystem, file_name: str) -> list[dict[str, Any]]:
+    """Return the updates that make graph have the same roads and counts as
+    load_graph(file_name), in the form taken by RoadSystem.apply_updates(). This is used when a
+    newer version of the road map data arrives.
+
+    Roads whose length changed are removed and added again. Junctions left without any roads are
+    kept.
+
+    Preconditions
+       - file_name is a path to the csv file location
+    """
+    new_graph = load_graph(file_name)
+    updates = []
+    for pair in graph.travel_times:
+        if pair not in new_graph.travel_times:
+            start, end = (list(pair) * 2)[:2]
+            updates.append({'change': 'remove', 'start_junction_road_name': start,
+                            'end_junction_road_name': end})
+
+    for pair in new_graph.travel_times:
+        start, end = (list(pair) * 2)[:2]
+        distance = new_graph.get_junctions_dist(start, end)
+        cycles = new_graph.get_road_vehicle_data(start, end, 'cycle')
+        motor = new_graph.get_road_vehicle_data(start, end, 'motor')
+        road = {'start_junction_road_name': start, 'end_junction_road_name': end}
+        if pair in graph.travel_times and graph.get_junctions_dist(start, end) == distance:
+            if (graph.get_road_vehicle_data(start, end, 'cycle'),
+                    graph.get_road_vehicle_data(start, end, 'motor')) != (cycles, motor):
+                updates.append({'change': 'counts', 'pedal_cycles': cycles,
+                                'all_motor_vehicles': motor, **road})
+        else:
+            if pair in graph.travel_times:
+                updates.append({'change': 'remove', **road})
+            location = new_graph.get_junctions_location(start, end)
+            updates.append({'change': 'add', 'link_length_km': distance, 'pedal_cycles': cycles,
+                            'all_motor_vehicles': motor,
+                            'latitude': location[0] if location else '',
+                            'longitude': location[1] if location else '', **road})
+    return updates
+
+
+def load_dict(file_name: str, regions: Optional[AbstractSet[str]] = None,
+              years: Optional[AbstractSet[int]] = None,
+              road_types: Optional[AbstractSet[str]] = None) -> dict[str, list[dict]]:
     """Read file_name and return a dictionary where the keys are the start junctions
         and the values are a list of dictionaries. Each dictionary contains the keys
         road name, end junction,  latitude, longitude, pedal cycle, distance, and all motor vehicles
         with their corresponding value.
         The roads are major roads located in London in 2019(latest version).
 
+        Only the first row from each start junction to each end junction is used. The rows are
+        streamed by ingest.read_count_points(), keeping only those in the given regions, years
+        and road types.
+
        Preconditions
        - isinstance(file_name, str)
        - file_name is a path to the csv file location
@@ -273,31 +739,19 @@ def load_dict(file_name: str) -> dict[str, list[dict]]:
         Note: The file_name is 'road.csv'
        """
     dict_so_far = {}
-    with open(file_name) as csv_file:
-        reader = csv.reader(csv_file)
-        next(reader)
-        for row in reader:
-            new_dict = {}
-            if row[4] not in dict_so_far:
-                dict_so_far[row[4]] = []
-                dict_so_far[row[4]].append(new_dict)
-                new_dict['end junction'] = row[5]
-                new_dict['road name'] = row[2]
-                new_dict['latitude'] = float(row[6])
-                new_dict['longitude'] = float(row[7])
-                new_dict['distance'] = float(row[8])
-                new_dict['pedal cycle'] = int(row[9])
-                new_dict['all motor vehicles'] = int(row[10])
-            else:
-                if all(row[5] != subdict['end junction'] for subdict in dict_so_far[row[4]]):
-                    dict_so_far[row[4]].append(new_dict)
-                    new_dict['end junction'] = row[5]
-                    new_dict['road name'] = row[2]
-                    new_dict['latitude'] = float(row[6])
-                    new_dict['longitude'] = float(row[7])
-                    new_dict['distance'] = float(row[8])
-                    new_dict['pedal cycle'] = int(row[9])
-                    new_dict['all motor vehicles'] = int(row[10])
+    seen = set()
+    for point in ingest.read_count_points(file_name, regions, years, road_types):
+        if (point.start, point.end) not in seen:
+            seen.add((point.start, point.end))
+            dict_so_far.setdefault(point.start, []).append({
+                'end junction': point.end,
+                'road name': point.road_name,
+                'latitude': point.latitude,
+                'longitude': point.longitude,
+                'distance': point.distance,
+                'pedal cycle': point.cycles,
+                'all motor vehicles': point.motor
+            })
 
     return dict_so_far
 
@@ -312,7 +766,7 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'max-line-length': 100,
         'disable': ['E9998', 'E1136', 'R0913'],
-        'extra-imports': ['math', 'csv'],
-        'allowed-io': [],
+        'extra-imports': ['math', 'csv', 'numpy', 'ingest'],
+        'allowed-io': ['read_updates'],
         'max-nested-blocks': 5,
     })
@@ -0,0 +1,220 @@
+"""CSC111 Final Project, Request Coalescing
+
+This python module answers route requests arriving at the same time from many asyncio tasks (for
+example, the clients of a web service) with as few graph searches as possible.
+
+Requests are not searched for as soon as they arrive. Instead, the requests with the same origin and
+mode of transport that arrive within a short window of each other are grouped together, and the
+whole group is answered by one search from the origin ( one_to_many() ), since a single search
+from a junction finds the shortest route to every other junction. The search is run in an
+executor so that the event loop keeps accepting requests while it runs.
+
+The routes are the same as those of computations.shortest_route() and computations.fastest_route().
+The number of searches saved by grouping is given by RouteCoalescer.stats().
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from concurrent.futures import Executor
+from typing import Optional
+import asyncio
+import math
+import computations
+import path_tree
+
+
+def one_to_many(graph: computations.Graph, origin: str, destinations: list[str],
+                weight: str = 'distance') -> list[tuple[list[str], float, float]]:
+    """Return the path with the least total road weight from origin to each of destinations,
+    along with that total and the length of the path in km, or ([], math.inf, math.inf) for a
+    destination with no path. The road weights are as in computations.dijkstra().
+
+    Only one search is made from origin, however many destinations there are: the paths are read
+    off its path_tree.ShortestPathTree. Each path is the same as computations.point_to_point()
+    would return.
+
+    Preconditions:
+    - origin and every destination are junctions of graph
+    - weight in {'distance', 'cycle', 'motor'}
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0)
+    >>> g.add_road('B', 'C', 2.0, 0, 0)
+    >>> one_to_many(g, 'A', ['C', 'A', 'D'])
+    [(['A', 'B', 'C'], 3.0, 3.0), (['A'], 0.0, 0.0), ([], inf, inf)]
+    """
+    tree = path_tree.build_tree(graph, origin, weight)
+    return [(tree.path_to(name), tree.costs[name], tree.distances[name]) if tree.reaches(name)
+            else ([], math.inf, math.inf) for name in destinations]
+
+
+class RouteCoalescer:
+    """Answers route requests in one graph, searching once for all the requests with the same
+    origin and road weight that arrive within window seconds of the first of them.
+
+    Instance Attributes:
+        - graph - The graph routes are found in.
+        - window - The number of seconds requests are collected for before being searched for.
+        - requests - The number of requests made between two junctions of the graph.
+        - searches - The number of searches made to answer them.
+        - largest_group - The greatest number of requests answered by one search.
+
+    Representation Invariants:
+        - self.window >= 0
+        - self.searches <= self.requests
+    """
+    graph: computations.Graph
+    window: float
+    requests: int
+    searches: int
+    largest_group: int
+    # Private Instance Attributes:
+    #     - _executor: The executor searches are run in, or None for the event loop's default
+    #       executor.
+    #     - _pending: Maps the (origin, weight) of each group waiting to be searched for to the
+    #       destination and future of each of its requests.
+    _executor: Optional[Executor]
+    _pending: dict[tuple[str, str], list[tuple[str, asyncio.Future]]]
+
+    def __init__(self, graph: computations.Graph, window: float = 0.002,
+                 executor: Optional[Executor] = None) -> None:
+        """Initialize a coalescer answering requests in graph, collecting them for window seconds
+        and running searches in executor (the event loop's default executor if None).
+
+        The graph must not be changed while the coalescer is in use, since it is searched from
+        the executor's threads.
+
+        Preconditions:
+        - window >= 0
+        """
+        self.graph = graph
+        self.window = window
+        self.requests = 0
+        self.searches = 0
+        self.largest_group = 0
+        self._executor = executor
+        self._pending = {}
+
+    async def shortest_route(self, start: str, end: str) -> tuple[list[str], float]:
+        """Return the shortest route from start to end and its distance, as in
+        computations.shortest_route(), or ([], 0.0) if there is none.
+
+        >>> import classes
+        >>> g = classes.RoadSystem()
+        >>> for name in ['A', 'B', 'C']:
+        ...     g.add_junction(name)
+        >>> g.add_road('A', 'B', 1.0, 0, 0)
+        >>> g.add_road('B', 'C', 2.0, 0, 0)
+        >>> coalescer = RouteCoalescer(g)
+        >>> async def ask() -> list:
+        ...     return await asyncio.gather(coalescer.shortest_route('A', 'C'),
+        ...                                 coalescer.shortest_route('A', 'B'))
+        >>> asyncio.run(ask())
+        [(['A', 'B', 'C'], 3.0), (['A', 'B'], 1.0)]
+        >>> coalescer.stats()['searches']
+        1
+        """
+        path, distance, _ = await self._request(start, end, 'distance')
+        if path == []:
+            return ([], 0.0)
+        return (path, float(distance))
+
+    async def fastest_route(self, start: str, end: str, mode: str) \
+            -> tuple[list[str], float, float]:
+        """Return the fastest route from start to end in the given mode of transport, the time
+        taken along it and its distance, as in computations.fastest_route(), or ([], 0.0, 0.0) if
+        there is none.
+
+        Preconditions:
+        - mode != ''
+        """
+        path, time_taken, distance = await self._request(start, end,
+                                                         'cycle' if mode == 'cycle' else 'motor')
+        if path == []:
+            return ([], 0.0, 0.0)
+        return (path, round(time_taken, 3), distance)
+
+    async def _request(self, start: str, end: str, weight: str) \
+            -> tuple[list[str], float, float]:
+        """Return one_to_many(self.graph, start, [end], weight)[0], searching for it together
+        with the other requests from start with the same weight. Return ([], math.inf, math.inf)
+        if start or end is not a junction of the graph."""
+        if not computations.has_junction(self.graph, start) \
+                or not computations.has_junction(self.graph, end):
+            return ([], math.inf, math.inf)
+
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        key = (start, weight)
+        if key not in self._pending:
+            self._pending[key] = []
+            loop.call_later(self.window, self._search, key)
+        future = loop.create_future()
+        self._pending[key].append((end, future))
+        return await future
+
+    def _search(self, key: tuple[str, str]) -> None:
+        """Start the search answering the group of requests of key, and resolve the future of
+        each request when it is done."""
+        group = self._pending.pop(key)
+        self.searches += 1
+        self.largest_group = max(self.largest_group, len(group))
+
+        origin, weight = key
+        search = asyncio.get_running_loop().run_in_executor(
+            self._executor, one_to_many, self.graph, origin, [end for end, _ in group], weight)
+
+        def resolve(done: asyncio.Future) -> None:
+            """Resolve the future of every request of group with the result of done."""
+            for i, (_, future) in enumerate(group):
+                if future.done():
+                    continue
+                elif done.exception() is not None:
+                    future.set_exception(done.exception())
+                else:
+                    future.set_result(done.result()[i])
+
+        search.add_done_callback(resolve)
+
+    def stats(self) -> dict[str, float]:
+        """Return the number of requests, the number of searches made for them, the number of
+        searches saved by answering requests together, the fraction of requests that did not
+        need a search of their own, and the mean and greatest number of requests answered by one
+        search.
+
+        Requests waiting for their search to start are counted as requests but not as searches.
+        """
+        saved = self.requests - self.searches
+        return {'requests': self.requests, 'searches': self.searches, 'saved_searches': saved,
+                'saved_fraction': saved / self.requests if self.requests > 0 else 0.0,
+                'mean_group': self.requests / self.searches if self.searches > 0 else 0.0,
+                'largest_group': self.largest_group}
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['concurrent.futures', 'asyncio', 'math', 'typing', 'computations',
+                          'path_tree'],
+        'allowed-io': [],
+        'max-nested-blocks': 5,
+    })
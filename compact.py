@@ -0,0 +1,377 @@
+"""CSC111 Final Project, Compact Road System
+
+This python module contains a compact, array based version of the RoadSystem class which stores
+the road network in compressed sparse row (CSR) form. Junction names are replaced by integer ids,
+and the roads leaving each junction are stored next to each other in flat arrays, so a road costs a
+few bytes in each array instead of a dictionary entry, a tuple and a list in both directions.
+
+The CompactRoadSystem can be built from an existing RoadSystem
+( CompactRoadSystem.from_road_system() ) or straight from the csv file ( load_compact_graph() ), and
+can be passed to the routing functions in computations.py in place of a RoadSystem.
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from __future__ import annotations
+from array import array
+from typing import AbstractSet, Any, Iterator, Optional, Union
+import math
+import numpy as np
+import classes
+import ingest
+
+
+class CompactRoadSystem:
+    """This dataclass represents the entire system of roads in London in compressed sparse
+    row form.
+
+    The roads leaving the junction with id i are stored at the positions
+    offsets[i] to offsets[i + 1] - 1 of targets, distances, cycles and motor. Every road appears
+    once for each of its directions, except roads that start and end at the same junction.
+
+    Instance Attributes:
+        - names - The junction names, indexed by junction id.
+        - ids - A dictionary mapping each junction name to its id.
+        - offsets - The position in targets where the roads of each junction start.
+        - targets - The id of the junction at the other end of each road.
+        - distances - The length of each road in km.
+        - cycles - The number of pedal cycles counted on each road.
+        - motor - The number of motor vehicles counted on each road.
+        - cycle_times - The time in hours to cycle along each road, or math.inf if it cannot be
+         cycled on.
+        - motor_times - The time in hours to drive along each road, or math.inf if it cannot be
+         driven on.
+        - latitudes - The latitude of the count point on each road, or math.nan if unknown.
+        - longitudes - The longitude of the count point on each road, or math.nan if unknown.
+        - road_ids - The index in road_names of the name of each road, or -1 if unknown.
+        - road_names - The distinct road names.
+        - heuristic_scales - A dictionary mapping a road weight to the scale of the A* search
+         heuristic for that weight, once it has been computed by computations.heuristic_scale().
+        - hierarchies - A dictionary mapping a road weight to the contraction hierarchy for that
+         weight, once it has been built by hierarchy.graph_hierarchy().
+        - components - The connected component label of each junction, or None if it has not
+         been computed yet. Use component_labels() to get it.
+
+    The arrays may be array.array objects or memoryviews of the same type code, such as the
+    memory mapped arrays of a snapshot loaded by snapshot.load_snapshot().
+
+    Representation Invariants:
+    - len(self.names) == len(self.ids) == len(self.offsets) - 1
+    - len(self.targets) == len(self.distances) == len(self.cycles) == len(self.motor)
+    - self.offsets[-1] == len(self.targets)
+    """
+    names: list[str]
+    ids: dict[str, int]
+    offsets: array
+    targets: array
+    distances: array
+    cycles: array
+    motor: array
+    cycle_times: array
+    motor_times: array
+    latitudes: array
+    longitudes: array
+    road_ids: array
+    road_names: list[str]
+    heuristic_scales: dict[str, float]
+    hierarchies: dict[str, Any]
+    components: Optional[array]
+
+    def __init__(self, names: list[str], offsets: array, targets: array, distances: array,
+                 cycles: array, motor: array, **details: Any) -> None:
+        """Initialize a CompactRoadSystem from its arrays.
+
+        The remaining attributes may be given as keyword arguments. Any that are not given are
+        computed from distances, cycles and motor, or filled in as unknown.
+        """
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.distances = distances
+        self.cycles = cycles
+        self.motor = motor
+
+        road_lengths = np.frombuffer(distances, dtype=float)
+        if 'cycle_times' in details:
+            self.cycle_times = details['cycle_times']
+        else:
+            self.cycle_times = array('d', classes.travel_times(
+                road_lengths, np.frombuffer(cycles, dtype=np.int64)).tobytes())
+        if 'motor_times' in details:
+            self.motor_times = details['motor_times']
+        else:
+            self.motor_times = array('d', classes.travel_times(
+                road_lengths, np.frombuffer(motor, dtype=np.int64)).tobytes())
+
+        unknown = array('d', [math.nan]) * len(targets)
+        self.latitudes = details.get('latitudes', unknown)
+        self.longitudes = details.get('longitudes', unknown)
+        self.road_ids = details.get('road_ids', array('q', [-1]) * len(targets))
+        self.road_names = details.get('road_names', [])
+        self.heuristic_scales = {}
+        self.hierarchies = {}
+        self.components = None
+
+    @staticmethod
+    def from_roads(roads: dict[frozenset[str], tuple[str, str, float, int, int]],
+                   locations: Optional[dict[frozenset[str], tuple[float, float, str]]] = None) \
+            -> CompactRoadSystem:
+        """Return a CompactRoadSystem containing the given roads. roads maps the unordered pair of
+        junction names of each road to (junction1 name, junction2 name, distance, cycles, motor).
+
+        locations maps the unordered pair of junction names of some of the roads to the
+        (latitude, longitude, road name) of their count point.
+
+        >>> g = CompactRoadSystem.from_roads({frozenset(('A', 'B')): ('A', 'B', 1.5, 10, 20)})
+        >>> g.names
+        ['A', 'B']
+        >>> list(g.weighted_neighbours(g.ids['B']))
+        [(0, 1.5)]
+        """
+        ids = {}
+        for name1, name2, _, _, _ in roads.values():
+            ids.setdefault(name1, len(ids))
+            ids.setdefault(name2, len(ids))
+
+        degrees = [0] * (len(ids) + 1)
+        for name1, name2, _, _, _ in roads.values():
+            degrees[ids[name1] + 1] += 1
+            if name1 != name2:
+                degrees[ids[name2] + 1] += 1
+
+        offsets = array('q', degrees)
+        for i in range(1, len(offsets)):
+            offsets[i] += offsets[i - 1]
+
+        size = offsets[-1]
+        targets = array('q', bytes(8 * size))
+        distances = array('d', bytes(8 * size))
+        cycles = array('q', bytes(8 * size))
+        motor = array('q', bytes(8 * size))
+        latitudes = array('d', [math.nan]) * size
+        longitudes = array('d', [math.nan]) * size
+        road_ids = array('q', [-1]) * size
+        road_names = {}
+        position = array('q', offsets[:-1])
+        for pair, (name1, name2, distance, cycle_count, motor_count) in roads.items():
+            directions = [(ids[name1], ids[name2])]
+            if name1 != name2:
+                directions.append((ids[name2], ids[name1]))
+            for u, v in directions:
+                i = position[u]
+                targets[i] = v
+                distances[i] = distance
+                cycles[i] = cycle_count
+                motor[i] = motor_count
+                if locations is not None and pair in locations:
+                    latitudes[i], longitudes[i], road_name = locations[pair]
+                    road_ids[i] = road_names.setdefault(road_name, len(road_names))
+                position[u] += 1
+
+        return CompactRoadSystem(list(ids), offsets, targets, distances, cycles, motor,
+                                 latitudes=latitudes, longitudes=longitudes, road_ids=road_ids,
+                                 road_names=list(road_names))
+
+    @staticmethod
+    def from_road_system(graph: classes.RoadSystem) -> CompactRoadSystem:
+        """Return a CompactRoadSystem with the same junctions and roads as graph.
+
+        Junctions without any roads are left out.
+        """
+        roads = {}
+        for name, junction in graph.junctions.items():
+            for neighbour, (distance, (cycle_count, motor_count)) in junction.neighbours.items():
+                roads.setdefault(frozenset((name, neighbour.name)),
+                                 (name, neighbour.name, distance, cycle_count, motor_count))
+        locations = {pair: (location[0], location[1], '')
+                     for pair, location in graph.locations.items()}
+        return CompactRoadSystem.from_roads(roads, locations)
+
+    def get_all_junctions(self) -> list[str]:
+        """Return a list of all the junction names in the CompactRoadSystem"""
+        return list(self.names)
+
+    def junction_id(self, name: str) -> int:
+        """Return the id of the junction with the given name.
+
+        Raises a ValueError if there is no such junction.
+        """
+        if name in self.ids:
+            return self.ids[name]
+        else:
+            raise ValueError
+
+    def edge_index(self, start: int, end: int) -> int:
+        """Return the position of the road from the junction with id start to the junction with
+        id end in the edge arrays, or -1 if they are not neighbours."""
+        for i in range(self.offsets[start], self.offsets[start + 1]):
+            if self.targets[i] == end:
+                return i
+        return -1
+
+    def path_edges(self, path: list[str]) -> np.ndarray:
+        """Return an array of the positions in the edge arrays of the roads along path.
+
+        Preconditions:
+        - every pair of consecutive junctions in path are neighbours
+        """
+        ids = [self.ids[name] for name in path]
+        return np.array([self.edge_index(u, v) for u, v in zip(ids, ids[1:])], dtype=np.int64)
+
+    def path_time(self, path: list[str], mode: str) -> float:
+        """Return the total time in hours taken to travel along path in the given mode of
+        transport, rounded to 3 decimal places, or math.inf if the path uses a road that cannot be
+        used in that mode.
+
+        Preconditions:
+        - mode != ''
+        - every pair of consecutive junctions in path are neighbours
+
+        >>> g = CompactRoadSystem.from_roads({frozenset(('A', 'B')): ('A', 'B', 2.0, 0, 240)})
+        >>> g.path_time(['A', 'B'], 'motor')
+        0.017
+        >>> g.path_time(['A', 'B'], 'cycle')
+        inf
+        """
+        times = self.cycle_times if mode == 'cycle' else self.motor_times
+        return round(float(np.frombuffer(times, dtype=float)[self.path_edges(path)].sum()), 3)
+
+    def weighted_neighbours(self, junction_id: int, weight: str = 'distance') \
+            -> Iterator[tuple[int, float]]:
+        """Return an iterator over (neighbour id, road weight) for every road leaving the
+        junction with the given id.
+
+        If weight is 'distance', the road weight is its length. If weight is 'cycle' or 'motor',
+        the road weight is its travel time in that mode, and roads that cannot be used in that
+        mode are left out.
+
+        Preconditions:
+        - weight in {'distance', 'cycle', 'motor'}
+        """
+        start, end = self.offsets[junction_id], self.offsets[junction_id + 1]
+        if weight == 'distance':
+            return zip(self.targets[start:end], self.distances[start:end])
+
+        times = self.cycle_times if weight == 'cycle' else self.motor_times
+        return ((v, t) for v, t in zip(self.targets[start:end], times[start:end])
+                if t != math.inf)
+
+    def junction_position(self, junction_id: int) -> Optional[tuple[float, float, float]]:
+        """Return the approximate position of the junction with the given id as
+        (latitude, longitude, error in km), or None if none of its roads have a location.
+
+        As in RoadSystem.junction_position(), this is the location of the count point on the
+        shortest road leaving the junction that has one, and the error is the length of that road.
+        """
+        best = None
+        for i in range(self.offsets[junction_id], self.offsets[junction_id + 1]):
+            if not math.isnan(self.latitudes[i]) and (best is None or self.distances[i] < best[2]):
+                best = (self.latitudes[i], self.longitudes[i], self.distances[i])
+        return best
+
+    def get_junctions_location(self, start: str, end: str) -> list[float]:
+        """Return the location as [latitude, longitude] associated with the start and end junction.
+
+        Return [] if no location was recorded for the road between them.
+        """
+        i = self.edge_index(self.ids[start], self.ids[end])
+        if i == -1 or math.isnan(self.latitudes[i]):
+            return []
+        else:
+            return [self.latitudes[i], self.longitudes[i]]
+
+    def get_junctions_dist(self, start: str, end: str) -> Union[float, None]:
+        """Return the distance associated with the start and end junction if they are neighbours.
+
+        Return None if there is no distance associated between the two junctions.
+        """
+        i = self.edge_index(self.ids[start], self.ids[end])
+        if i == -1:
+            return None
+        else:
+            return self.distances[i]
+
+    def component_labels(self) -> array:
+        """Return the connected component label of every junction, indexed by junction id.
+        Two junctions are connected exactly when they have the same label.
+
+        The labels are computed by a breadth-first search over each component the first time
+        they are needed, and kept for later calls.
+
+        >>> g = CompactRoadSystem.from_roads({frozenset(('A', 'B')): ('A', 'B', 1.0, 0, 0),
+        ...                                   frozenset(('C', 'D')): ('C', 'D', 1.0, 0, 0)})
+        >>> list(g.component_labels())
+        [0, 0, 2, 2]
+        """
+        if self.components is None:
+            labels = array('q', [-1]) * len(self.names)
+            for root in range(len(self.names)):
+                if labels[root] == -1:
+                    labels[root] = root
+                    queue = [root]
+                    for u in queue:
+                        for i in range(self.offsets[u], self.offsets[u + 1]):
+                            v = self.targets[i]
+                            if labels[v] == -1:
+                                labels[v] = root
+                                queue.append(v)
+            self.components = labels
+        return self.components
+
+    def connected(self, item1: str, item2: str) -> bool:
+        """Return whether item1 and item2 are connected junctions in this graph.
+
+        Return False if item1 or item2 do not appear as junctions in this graph.
+        """
+        if item1 not in self.ids or item2 not in self.ids:
+            return False
+
+        labels = self.component_labels()
+        return labels[self.ids[item1]] == labels[self.ids[item2]]
+
+
+def load_compact_graph(file_name: str, regions: Optional[AbstractSet[str]] = None,
+                       years: Optional[AbstractSet[int]] = None,
+                       road_types: Optional[AbstractSet[str]] = None, policy: str = 'latest') \
+        -> CompactRoadSystem:
+    """Read file_name and return a CompactRoadSystem with the same junctions and roads as
+    classes.load_graph(file_name, regions, years, road_types, policy), without creating any
+    Junction objects.
+
+    Preconditions
+       - file_name is a path to the csv file location
+       - policy in ingest.POLICIES
+
+    Note: The file_name is 'road.csv'
+    """
+    points = ingest.read_count_points(file_name, regions, years, road_types)
+    _, points_by_road, locations = ingest.aggregate_count_points(points, policy)
+    roads = {pair: (point.start, point.end, point.distance, point.cycles, point.motor)
+             for pair, point in points_by_road.items()}
+    return CompactRoadSystem.from_roads(roads, locations)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136', 'R0913'],
+        'extra-imports': ['array', 'math', 'numpy', 'typing', 'classes', 'ingest'],
+        'allowed-io': ['load_compact_graph'],
+        'max-nested-blocks': 5,
+    })
@@ -4,16 +4,26 @@ This python module contains several methods for performing the different computa
 extracted from the csv file with the help of methods in classes.py file.
 The list of computations done on this data are:
 
-1. A function with outputs a path with the shortest time ( path_with_shortest_time() )
+1. A function with outputs a path with the shortest time ( fastest_route(), or
+    path_with_shortest_time() to choose between given paths )
 
-2. A function which calculates and outputs the shortest route using Dijkstra's algorithm
-    ( shortest_route() )
+2. A function which calculates and outputs the shortest route using Dijkstra's algorithm, or
+    the A* search algorithm, a bidirectional Dijkstra search or a contraction hierarchy
+    ( shortest_route() with helpers dijkstra(), astar(), bidirectional_dijkstra() and
+    build_path(), and hierarchy.py)
 
-3. A function which outputs all the possible paths between 2 junctions
-    ( multiple_path() with helper find_path())
+3. A function which outputs several of the shortest paths between 2 junctions using Yen's
+    algorithm ( multiple_path() with helper k_shortest_paths())
 
 4. A function which calculates and outputs the most direct route between the 2 junctions using
-    Breadth First Search Algorithm ( direct_route() )
+    Breadth First Search Algorithm ( direct_route(), or hop_counts() for the number of roads to
+    every junction )
+
+5. A function which outputs the shortest route between 2 junctions that stops at exactly a
+    given number of junctions in between ( exact_stops_route(), or exact_stops_routes() for
+    every number of stops up to a limit )
+
+These functions accept either a classes.RoadSystem or the array based compact.CompactRoadSystem.
 
 
 Copyright and Usage Information
@@ -29,16 +39,34 @@ collects traffic data to produce statistics on the level of traffic on roads in
 last updated in October 2020.
 """
 
-from typing import Dict, Union, Optional
+from typing import AbstractSet, Dict, Hashable, Iterator, Union, Optional
+import collections
+import heapq
+import itertools
 import math
 import classes
+import compact
+
+# The routing functions accept either representation of the road network.
+Graph = Union[classes.RoadSystem, compact.CompactRoadSystem]
+
+# The ways a route between two junctions can be searched for, as described in point_to_point().
+ALGORITHMS = ('dijkstra', 'astar', 'bidirectional', 'ch')
+
+# The mean radius of the Earth.
+EARTH_RADIUS_KM = 6371.0
+
+# The greatest number of roads exact_roads_path() tries before it settles for the best route it
+# has found so far.
+MAX_STOPS_SEARCH = 100000
 
 
 def path_with_shortest_time(graph: classes.RoadSystem, mode: str, alternative_paths: Dict) \
         -> tuple[list[str], float, float]:
     """
     Shortest time taken based on the mode of transport the user inputs, accounting for any
-    delays due to traffic.
+    delays due to traffic, out of the given alternative_paths. To find the fastest path out of
+    all paths, use fastest_route().
 
     In the returned tuple, the first element represents the path, the second represents the time
     taken between those paths and the third element represents the distance of that path
@@ -74,13 +102,59 @@ def path_with_shortest_time(graph: classes.RoadSystem, mode: str, alternative_pa
     return (shortest_path, round(min_time, 3), shortest_path_distance)
 
 
-def shortest_route(graph: classes.RoadSystem, junction1_name: str, junction2_name: str) \
-        -> tuple[list, float]:
+def fastest_route(graph: Graph, start: str, end: str, mode: str,
+                  algorithm: str = 'dijkstra') -> tuple[list[str], float, float]:
+    """Return the path from start to end that takes the least time in the given mode of
+    transport, accounting for any delays due to traffic, using Dijkstra's algorithm on the
+    travel times of the roads. Roads that cannot be cycled on are never used when mode is 'cycle'.
+
+    In the returned tuple, the first element represents the path, the second represents the time
+    taken along that path and the third element represents the distance of that path.
+    Return ([], 0.0, 0.0) if there is no such path.
+
+    algorithm chooses how the path is searched for, as described in point_to_point().
+
+    Preconditions:
+    - mode != ''
+    - start != '' and end != ''
+    - algorithm in ALGORITHMS
+
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'C', 1.0, 0, 100)
+    >>> g.add_road('A', 'B', 1.0, 50, 100)
+    >>> g.add_road('B', 'C', 1.0, 50, 100)
+    >>> fastest_route(g, 'A', 'C', 'motor')
+    (['A', 'C'], 0.017, 1.0)
+    >>> fastest_route(g, 'A', 'C', 'cycle')
+    (['A', 'B', 'C'], 0.034, 2.0)
+    """
+    if not has_junction(graph, start) or not has_junction(graph, end):
+        return ([], 0.0, 0.0)
+
+    weight = 'cycle' if mode == 'cycle' else 'motor'
+    path, time_taken = point_to_point(graph, start, end, weight, algorithm)
+    if path == []:
+        return ([], 0.0, 0.0)
+
+    distance = 0.0
+    for i in range(len(path) - 1):
+        distance += graph.get_junctions_dist(path[i], path[i + 1])
+    return (path, round(time_taken, 3), distance)
+
+
+def shortest_route(graph: Graph, junction1_name: str, junction2_name: str,
+                   algorithm: str = 'dijkstra') -> tuple[list, float]:
     """Return the shortest route between junction1 and junction2 using Dijkstra's
     algorithm and its distance
 
+    algorithm chooses how the route is searched for, as described in point_to_point(). Every
+    choice returns a shortest route.
+
     Preconditions:
     - junction1_name != '' and junction2_name != ''
+    - algorithm in ALGORITHMS
 
     >>> g = classes.RoadSystem()
     >>> g.add_junction('A')
@@ -99,140 +173,615 @@ def shortest_route(graph: classes.RoadSystem, junction1_name: str, junction2_nam
     (['A', 'D', 'E', 'C'], 7.0)
     >>> shortest_route(g, 'A', 'B')
     (['A', 'D', 'B'], 3.0)
+    >>> shortest_route(g, 'A', 'C', 'astar')
+    (['A', 'D', 'E', 'C'], 7.0)
     """
     if not graph.connected(junction1_name, junction2_name):
         return ([], 0.0)
 
-    path_so_far = []
-    dict_all_dist = {junction1_name: (0, [])}
-    visited = []
-    unvisited = []
-    for v in graph.get_all_junctions():
-        unvisited.append(v)
-        if v != junction1_name:
-            dict_all_dist[v] = (math.inf, [])
+    path, distance = point_to_point(graph, junction1_name, junction2_name, 'distance', algorithm)
+    return (path, float(distance))
 
-    while junction2_name in unvisited:
-        if junction1_name in unvisited:
-            current_vertex = junction1_name
 
-        else:
-            min_d = dict_all_dist[unvisited[0]]
-            current_vertex = unvisited[0]
-            for vertex in unvisited:
-                d = dict_all_dist[vertex]
-                if d < min_d:
-                    current_vertex = vertex
+def point_to_point(graph: Graph, start: str, end: str, weight: str = 'distance',
+                   algorithm: str = 'dijkstra') -> tuple[list[str], float]:
+    """Return a path from start to end with the least total road weight, along with that total,
+    or ([], math.inf) if there is no such path. The road weights are as in dijkstra().
+
+    algorithm is one of:
+    - 'dijkstra': dijkstra(), stopping once end is reached
+    - 'astar': astar(), which is guided towards end by the road locations
+    - 'bidirectional': bidirectional_dijkstra(), which searches from start and end at once
+    - 'ch': the contraction hierarchy of graph from hierarchy.graph_hierarchy(), which is built
+     the first time it is used for each weight
+
+    Preconditions:
+    - start and end are junctions of graph
+    - algorithm in ALGORITHMS
+    """
+    if algorithm == 'astar':
+        path, cost, _ = astar(graph, start, end, weight)
+        return (path, cost)
+    if algorithm == 'bidirectional':
+        path, cost, _ = bidirectional_dijkstra(graph, start, end, weight)
+        return (path, cost)
+    if algorithm == 'ch':
+        # Imported here since hierarchy imports this module.
+        import hierarchy
+        path, cost, _ = hierarchy.graph_hierarchy(graph, weight).route(start, end)
+        return (path, cost)
+
+    costs, previous = dijkstra(graph, start, end, weight)
+    if end not in costs:
+        return ([], math.inf)
+    return (build_path(previous, end), costs[end])
+
+
+def astar(graph: Graph, start: str, end: str, weight: str = 'distance') \
+        -> tuple[list[str], float, int]:
+    """Return a path from start to end with the least total road weight, that total, and the
+    number of junctions settled while searching for it, using the A* search algorithm. Return
+    ([], math.inf, number of settled junctions) if there is no such path.
+
+    The search is guided by an estimate of the weight of the rest of the route from each
+    junction: the great-circle distance from the junction to end, less the errors of their
+    positions from the graph's junction_position(), times heuristic_scale(). A junction whose
+    roads have no locations is given no guidance.
+
+    Preconditions:
+    - start and end are junctions of graph
+    - weight in {'distance', 'cycle', 'motor'}
+
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 10, 10, [51.50, -0.10])
+    >>> g.add_road('B', 'C', 1.0, 10, 10, [51.51, -0.10])
+    >>> g.add_road('A', 'D', 1.0, 10, 10, [51.49, -0.10])
+    >>> astar(g, 'A', 'C')
+    (['A', 'B', 'C'], 2.0, 4)
+    """
+    source = junction_key(graph, start)
+    target = junction_key(graph, end)
+    goal = graph.junction_position(target)
+    scale = heuristic_scale(graph, weight)
+    estimates = {}
+
+    def estimate(key: Hashable) -> float:
+        """Return a lower bound on the weight of any path from key to target."""
+        if key not in estimates:
+            position = graph.junction_position(key)
+            if goal is None or position is None:
+                estimates[key] = 0.0
+            else:
+                straight = great_circle_distance(position[0], position[1], goal[0], goal[1])
+                estimates[key] = max(0.0, straight - position[2] - goal[2]) * scale
+        return estimates[key]
+
+    best = {source: 0.0}
+    previous = {source: None}
+    heap = [(estimate(source), 0.0, source)]
+    settled = 0
+    while heap:
+        _, cost, key = heapq.heappop(heap)
+        if cost > best[key]:
+            continue
+        settled += 1
+        if key == target:
+            path = build_path(previous, target)
+            return ([junction_name(graph, k) for k in path], cost, settled)
+
+        for other, road_weight in graph.weighted_neighbours(key, weight):
+            new_cost = cost + road_weight
+            if new_cost < best.get(other, math.inf):
+                best[other] = new_cost
+                previous[other] = key
+                heapq.heappush(heap, (new_cost + estimate(other), new_cost, other))
+
+    return ([], math.inf, settled)
+
+
+def bidirectional_dijkstra(graph: Graph, start: str, end: str, weight: str = 'distance') \
+        -> tuple[list[str], float, int]:
+    """Return a path from start to end with the least total road weight, that total, and the
+    number of junctions settled while searching for it, using Dijkstra's algorithm from start and
+    from end at the same time. Return ([], math.inf, number of settled junctions) if there is no
+    such path.
+
+    Every road can be travelled both ways with the same weight, so the search from end follows
+    roads in the same way as the search from start. Each step advances whichever search has the
+    nearer unsettled junction. Whenever a road joins junctions reached by both searches, the
+    route through it is remembered if it is the best so far. The searches stop once the nearest
+    unsettled junctions of the two searches are together at least as far as the best route,
+    since any other route would have to pass beyond both of them.
+
+    Preconditions:
+    - start and end are junctions of graph
+    - weight in {'distance', 'cycle', 'motor'}
+
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D', 'E']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 5.0, 0, 0)
+    >>> g.add_road('A', 'C', 1.0, 0, 0)
+    >>> g.add_road('C', 'D', 1.0, 0, 0)
+    >>> g.add_road('D', 'B', 1.0, 0, 0)
+    >>> bidirectional_dijkstra(g, 'A', 'B')
+    (['A', 'C', 'D', 'B'], 3.0, 3)
+    >>> bidirectional_dijkstra(g, 'A', 'E')
+    ([], inf, 2)
+    """
+    source = junction_key(graph, start)
+    target = junction_key(graph, end)
+    costs = ({source: 0.0}, {target: 0.0})
+    previous = ({source: None}, {target: None})
+    settled = (set(), set())
+    heaps = ([(0.0, source)], [(0.0, target)])
+    best, meeting = (0.0, source) if source == target else (math.inf, None)
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        cost, key = heapq.heappop(heaps[side])
+        if key in settled[side]:
+            continue
+        settled[side].add(key)
+
+        for other, road_weight in graph.weighted_neighbours(key, weight):
+            new_cost = cost + road_weight
+            if new_cost < costs[side].get(other, math.inf):
+                costs[side][other] = new_cost
+                previous[side][other] = key
+                heapq.heappush(heaps[side], (new_cost, other))
+            if other in costs[1 - side] and new_cost + costs[1 - side][other] < best:
+                best = new_cost + costs[1 - side][other]
+                meeting = other
+
+    num_settled = len(settled[0]) + len(settled[1])
+    if meeting is None:
+        return ([], math.inf, num_settled)
+
+    path = build_path(previous[0], meeting) + build_path(previous[1], meeting)[-2::-1]
+    return ([junction_name(graph, k) for k in path], best, num_settled)
+
+
+def heuristic_scale(graph: Graph, weight: str = 'distance') -> float:
+    """Return the greatest number the great-circle estimates of astar() can be multiplied by so
+    that the search still always finds a path with the least total weight.
+
+    This is the case when, along every road from u to v, the estimate for u is no more than the
+    weight of the road plus the estimate for v. Since the estimates only depend on the positions
+    of the junctions, it is enough that the weight of every road from u to v is at least the
+    scale times (the distance between the positions of u and v - the error of u + the error of
+    v). The scale is the least such ratio, and at most 1 km per km for distance weights.
+
+    Junction names in the road data are often the names of roads, which meet in several places,
+    so their positions can be far apart even when a road between them is short. This can make
+    the scale, and so the guidance of the search, small.
+
+    The result is remembered by the graph.
+
+    Preconditions:
+    - weight in {'distance', 'cycle', 'motor'}
+
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 10, 10, [51.50, -0.10])
+    >>> g.add_road('B', 'C', 10.0, 10, 10, [51.60, -0.10])
+    >>> round(heuristic_scale(g), 4)
+    0.497
+    >>> round(heuristic_scale(g, 'cycle'), 4)
+    0.0008
+    """
+    if weight not in graph.heuristic_scales:
+        scale = 1.0 if weight == 'distance' else math.inf
+        positions = {}
+        for name in graph.get_all_junctions():
+            key = junction_key(graph, name)
+            positions[key] = graph.junction_position(key)
+
+        for key, position in positions.items():
+            if position is None:
+                continue
+            for other, road_weight in graph.weighted_neighbours(key, weight):
+                other_position = positions[other]
+                if other_position is None:
+                    continue
+                bound = great_circle_distance(position[0], position[1], other_position[0],
+                                              other_position[1]) - position[2] + other_position[2]
+                if bound > 0.0:
+                    scale = min(scale, road_weight / bound)
+
+        graph.heuristic_scales[weight] = 0.0 if scale == math.inf else scale
+    return graph.heuristic_scales[weight]
+
+
+def great_circle_distance(latitude1: float, longitude1: float, latitude2: float,
+                          longitude2: float) -> float:
+    """Return the great-circle distance in km between two points on the Earth, given in degrees,
+    using the haversine formula.
+
+    >>> round(great_circle_distance(51.5, 0.0, 51.5, 1.0), 1)
+    69.2
+    """
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    half_chord = math.sin((phi2 - phi1) / 2) ** 2 \
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(half_chord))
+
+
+def dijkstra(graph: Graph, source: str, target: Optional[str] = None,
+             weight: str = 'distance') -> tuple[dict[str, float], dict[str, Optional[str]]]:
+    """Run Dijkstra's algorithm from source with a binary heap and return a tuple of two
+    dictionaries: the distance of every settled junction from source, and the junction that
+    precedes it on its shortest path (None for source).
+
+    The roads are weighted as described in weighted_neighbours() of the graph: by length if
+    weight is 'distance', or by travel time if weight is 'cycle' or 'motor'.
+
+    Junctions are pushed onto the heap again whenever a shorter distance is found, and stale
+    heap entries are skipped when popped (lazy deletion). If target is given, the search stops
+    as soon as target is settled, so only the junctions closer to source than target are
+    guaranteed to be in the returned dictionaries.
+
+    Preconditions:
+    - source is a junction of graph
+
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1, 0, 0)
+    >>> g.add_road('B', 'C', 2, 0, 0)
+    >>> g.add_road('A', 'C', 4, 0, 0)
+    >>> dijkstra(g, 'A')
+    ({'A': 0.0, 'B': 1.0, 'C': 3.0}, {'A': None, 'B': 'A', 'C': 'B'})
+    >>> dijkstra(compact.CompactRoadSystem.from_road_system(g), 'A')
+    ({'A': 0.0, 'B': 1.0, 'C': 3.0}, {'A': None, 'B': 'A', 'C': 'B'})
+    """
+    target_key = None if target is None else junction_key(graph, target)
+    distances, previous = dijkstra_keys(graph, junction_key(graph, source), target_key,
+                                        weight=weight)
+    if isinstance(graph, compact.CompactRoadSystem):
+        names = graph.names
+        distances = {names[k]: d for k, d in distances.items()}
+        previous = {names[k]: None if p is None else names[p] for k, p in previous.items()}
+    return (distances, previous)
+
+
+def dijkstra_keys(graph: Graph, source: Hashable, target: Optional[Hashable] = None,
+                  excluded_nodes: AbstractSet = frozenset(),
+                  excluded_edges: AbstractSet = frozenset(),
+                  weight: str = 'distance') -> tuple[dict, dict]:
+    """The search loop of dijkstra(), working on the junction keys returned by junction_key()
+    instead of junction names.
+
+    The search does not enter any junction in excluded_nodes, nor use any road (u, v) in
+    excluded_edges to go from u to v.
+    """
+    distances = {}
+    previous = {source: None}
+    best = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        dist, key = heapq.heappop(heap)
+        if key in distances:
+            continue
+        distances[key] = dist
+        if key == target:
+            break
+
+        for other, road_dist in graph.weighted_neighbours(key, weight):
+            if other in distances or other in excluded_nodes or (key, other) in excluded_edges:
+                continue
+            new_dist = dist + road_dist
+            if new_dist < best.get(other, math.inf):
+                best[other] = new_dist
+                previous[other] = key
+                heapq.heappush(heap, (new_dist, other))
+
+    return (distances, {key: previous[key] for key in distances})
+
+
+def has_junction(graph: Graph, name: str) -> bool:
+    """Return whether graph has a junction with the given name."""
+    if isinstance(graph, compact.CompactRoadSystem):
+        return name in graph.ids
+    else:
+        return name in graph.junctions
 
-        for neighbor in graph.junctions[current_vertex].neighbours:
-            if neighbor.name not in visited:
-                d = graph.get_junctions_dist(current_vertex, neighbor.name)
-                if d + dict_all_dist[current_vertex][0] < dict_all_dist[neighbor.name][0]:
-                    dict_all_dist[neighbor.name] = \
-                        (d + dict_all_dist[current_vertex][0], current_vertex)
 
-        visited.append(current_vertex)
+def junction_key(graph: Graph, name: str) -> Hashable:
+    """Return the key graph.weighted_neighbours() uses for the junction with the given name:
+    the name itself for a RoadSystem and the integer id for a CompactRoadSystem."""
+    if isinstance(graph, compact.CompactRoadSystem):
+        return graph.ids[name]
+    else:
+        return name
 
-        unvisited.remove(current_vertex)
 
-    previous_vertex = dict_all_dist[junction2_name][1]
-    path_so_far.append(previous_vertex)
-    while previous_vertex != []:
-        previous_vertex = dict_all_dist[previous_vertex][1]
-        path_so_far.insert(0, previous_vertex)
+def junction_name(graph: Graph, key: Hashable) -> str:
+    """Return the name of the junction with the given key. This is the inverse of
+    junction_key()."""
+    if isinstance(graph, compact.CompactRoadSystem):
+        return graph.names[key]
+    else:
+        return key
 
-    path_so_far.append(junction2_name)
-    return (path_so_far[1:], float(dict_all_dist[junction2_name][0]))
 
+def build_path(previous: dict[str, Optional[str]], target: str) -> list[str]:
+    """Return the path ending at target by following the previous pointers returned by
+    dijkstra() back to the source. Return [] if target was never reached.
 
-def multiple_path(graph: classes.RoadSystem, start: str, end: str, n: Optional[int] = 0) -> Dict:
-    """This function returns a dictionary mapping the total_distance to the path taken from
-    start to end. The dictionary may contain more than one key depending on the value of 'n'.
+    >>> build_path({'A': None, 'B': 'A', 'C': 'B'}, 'C')
+    ['A', 'B', 'C']
+    >>> build_path({'A': None}, 'C')
+    []
+    """
+    if target not in previous:
+        return []
+    path = []
+    current = target
+    while current is not None:
+        path.append(current)
+        current = previous[current]
+    path.reverse()
+    return path
+
+
+def multiple_path(graph: Graph, start: str, end: str, n: Optional[int] = 0) \
+        -> list[tuple[list[str], float]]:
+    """This function returns a list of the paths taken from start to end along with their total
+    distances. The list may contain more than one path depending on the value of 'n'.
     'n' denotes the number of paths the user wants to have to reach from 'start' to 'end'.
-    Less than 'n' paths are returned if there isn't any such paths.
+    Less than 'n' paths are returned if there isn't any such paths. If 'n' is 0, one path is
+    looked for per road leaving 'start'.
+
+    The paths are the n shortest loopless paths from k_shortest_paths(), in increasing order of
+    distance. Paths with the same total distance are all kept.
 
     Preconditions:
      - start != '' and end != ''
      - graph is a valid graph object with different junctions inputted from the readfile
       methods.
 
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1, 0, 0)
+    >>> g.add_road('B', 'D', 1, 0, 0)
+    >>> g.add_road('A', 'C', 1, 0, 0)
+    >>> g.add_road('C', 'D', 1, 0, 0)
+    >>> multiple_path(g, 'A', 'D', 2)
+    [(['A', 'B', 'D'], 2.0), (['A', 'C', 'D'], 2.0)]
     """
-    all_possible_paths = []
-    start_vertex = graph.get_junction_name(name=start)
-    for junction in start_vertex.neighbours:  # junction represents a vertex
-        path = find_path(junction, end, {start_vertex})
-        if path is not None:
-            if path[-1] == end:
-                # Add the start_node to the path.
-                path.insert(0, start)
-                all_possible_paths.append(path)
-
     if n == 0:
-        dict_path = {}
-        for path in all_possible_paths:
-            total_dist = 0
-            for i in range(0, len(path) - 1):
-                total_dist += graph.get_junctions_dist(path[i], path[i + 1])
+        n = len(list(graph.weighted_neighbours(junction_key(graph, start))))
 
-            dict_path[total_dist] = path
+    return list(itertools.islice(k_shortest_paths(graph, start, end), n))
 
-        return dict_path
 
-    elif n < len(all_possible_paths):
-        dict_path = {}
-        required_paths = all_possible_paths[0:n]
-        for path in required_paths:
-            total_dist = 0
-            for i in range(0, len(path) - 1):
-                total_dist += graph.get_junctions_dist(path[i], path[i + 1])
+def k_shortest_paths(graph: Graph, start: str, end: str) -> Iterator[tuple[list[str], float]]:
+    """Yield the loopless paths from start to end along with their distances, in increasing order
+    of distance, using Yen's algorithm.
 
-            dict_path[total_dist] = path
+    Each path is only computed when it is asked for, so taking the first n paths costs about n
+    times as much as the searches needed to find the n-th path.
 
-        return dict_path
+    Preconditions:
+    - start != '' and end != ''
 
-    else:
-        dict_path = {}
-        for path in all_possible_paths:
-            total_dist = 0
-            for i in range(0, len(path) - 1):
-                total_dist += graph.get_junctions_dist(path[i], path[i + 1])
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1, 0, 0)
+    >>> g.add_road('B', 'D', 1, 0, 0)
+    >>> g.add_road('A', 'C', 2, 0, 0)
+    >>> g.add_road('C', 'D', 2, 0, 0)
+    >>> g.add_road('B', 'C', 1, 0, 0)
+    >>> list(k_shortest_paths(g, 'A', 'D'))
+    [(['A', 'B', 'D'], 2.0), (['A', 'C', 'D'], 4.0), (['A', 'B', 'C', 'D'], 4.0), \
+(['A', 'C', 'B', 'D'], 4.0)]
+    """
+    target = junction_key(graph, end)
+    distances, previous = dijkstra_keys(graph, junction_key(graph, start), target)
+    if target not in distances:
+        return
+
+    path = build_path(previous, target)
+    # Each found path is kept as (list of keys, distance from start to each key in the list).
+    found = [(path, [distances[key] for key in path])]
+    candidates = []
+    seen = {tuple(path)}
+    while True:
+        yield ([junction_name(graph, key) for key in path], found[-1][1][-1])
+
+        last_path, last_costs = found[-1]
+        for i in range(len(last_path) - 1):
+            root = last_path[:i + 1]
+            excluded_edges = {(p[i], p[i + 1]) for p, _ in found if p[:i + 1] == root}
+            spur_distances, spur_previous = dijkstra_keys(graph, root[-1], target,
+                                                          set(root[:-1]), excluded_edges)
+            if target in spur_distances:
+                spur_path = build_path(spur_previous, target)
+                new_path = root[:-1] + spur_path
+                if tuple(new_path) not in seen:
+                    seen.add(tuple(new_path))
+                    costs = last_costs[:i] + [last_costs[i] + spur_distances[key]
+                                              for key in spur_path]
+                    heapq.heappush(candidates, (costs[-1], len(seen), new_path, costs))
+
+        if not candidates:
+            return
+        _, _, path, costs = heapq.heappop(candidates)
+        found.append((path, costs))
+
+
+def exact_stops_route(graph: Graph, start: str, end: str, num_stops: int,
+                      weight: str = 'distance') -> tuple[list[str], float]:
+    """Return the route from start to end with the least total road weight that stops at exactly
+    num_stops junctions in between, along with that total. Return ([], 0.0) if there is no
+    such route. The road weights are as in dijkstra().
+
+    A route never passes through the same junction twice, so it never turns back or goes around
+    a loop to make up the number of stops. The route is the best one found by a search of
+    bounded length (see exact_stops_routes()).
+
+    Preconditions:
+    - start and end are junctions of graph
+    - num_stops >= 0
+    - weight in {'distance', 'cycle', 'motor'}
 
-            dict_path[total_dist] = path
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'D', 10.0, 0, 0)
+    >>> g.add_road('A', 'B', 1.0, 0, 0)
+    >>> g.add_road('B', 'C', 1.0, 0, 0)
+    >>> g.add_road('C', 'D', 1.0, 0, 0)
+    >>> exact_stops_route(g, 'A', 'D', 0)
+    (['A', 'D'], 10.0)
+    >>> exact_stops_route(g, 'A', 'D', 2)
+    (['A', 'B', 'C', 'D'], 3.0)
+    >>> exact_stops_route(g, 'A', 'D', 1)
+    ([], 0.0)
+    """
+    source = junction_key(graph, start)
+    bounds = stops_bounds(graph, junction_key(graph, end), num_stops + 1, weight)
+    route = exact_roads_path(graph, source, bounds, weight) if source in bounds[-1] else None
+    if route is None:
+        return ([], 0.0)
+    return ([junction_name(graph, key) for key in route[0]], route[1])
 
-        return dict_path
 
+def exact_stops_routes(graph: Graph, start: str, end: str, max_stops: int,
+                       weight: str = 'distance') -> dict[int, tuple[list[str], float]]:
+    """Return a dictionary mapping each number of stops from 0 to max_stops for which there is a
+    route from start to end to the result of exact_stops_route() for that number of stops.
 
-def find_path(start: classes.Junction, target: str, visited: set[classes.Junction]) -> \
-        Union[None, list]:
-    """This helper method return a path from the vertex to the target_item if such a path exists.
+    One layered search from end first finds, for every number of roads h up to max_stops + 1,
+    the least total weight of going from each junction to end along exactly h roads, allowing
+    junctions to be passed more than once. This takes time proportional to max_stops times the
+    number of roads. Since no route can do better than that, it bounds a depth first search
+    from start over the routes that do not repeat a junction, which tries the most promising
+    roads first and gives up on a route as soon as it cannot beat the best one found.
+
+    The time of that search can grow exponentially with the number of stops, so it stops after
+    trying MAX_STOPS_SEARCH roads for each number of stops. The result is then the best route
+    found so far, which may not have the least total weight, and a number of stops is left out
+    if no route was found in time, even if there is one.
 
     Preconditions:
-    - target != ''
+    - start and end are junctions of graph
+    - max_stops >= 0
+    - weight in {'distance', 'cycle', 'motor'}
 
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0)
+    >>> g.add_road('B', 'C', 1.0, 0, 0)
+    >>> g.add_road('C', 'A', 1.0, 0, 0)
+    >>> g.add_road('C', 'D', 2.0, 0, 0)
+    >>> exact_stops_routes(g, 'A', 'D', 4)
+    {1: (['A', 'C', 'D'], 3.0), 2: (['A', 'B', 'C', 'D'], 4.0)}
     """
+    source = junction_key(graph, start)
+    bounds = stops_bounds(graph, junction_key(graph, end), max_stops + 1, weight)
+    routes = {}
+    for num_stops in range(max_stops + 1):
+        if source in bounds[num_stops + 1]:
+            route = exact_roads_path(graph, source, bounds[:num_stops + 2], weight)
+            if route is not None:
+                routes[num_stops] = ([junction_name(graph, key) for key in route[0]], route[1])
+    return routes
 
-    if start.name == target:
-        return [start.name]
-    else:
-        visited.add(start)
-        path = [start.name]
-        neighbours = start.neighbours
-        if neighbours != {}:
-            for v in neighbours:
-                if v not in visited:
-                    lst = find_path(start=v, target=target, visited=visited)
-                    if lst is not None:
-                        path.extend(lst)
-                    else:
-                        path.extend([])
-                    return path
 
+def stops_bounds(graph: Graph, target: Hashable, max_roads: int,
+                 weight: str) -> list[dict[Hashable, float]]:
+    """Return a list whose element h, for h from 0 to max_roads, maps the key of every junction
+    with a way to target along exactly h roads to the least total road weight of such a way,
+    which may pass through junctions more than once. This is a helper of exact_stops_routes().
+
+    Roads can be used in both directions, so the ways are searched for from target.
+
+    Preconditions:
+    - target is a junction key of graph
+    - max_roads >= 0
+    - weight in {'distance', 'cycle', 'motor'}
+    """
+    bounds = [{target: 0.0}]
+    for _ in range(max_roads):
+        layer = {}
+        for key, bound in bounds[-1].items():
+            for other, road_weight in graph.weighted_neighbours(key, weight):
+                if other != key and bound + road_weight < layer.get(other, math.inf):
+                    layer[other] = bound + road_weight
+        bounds.append(layer)
+    return bounds
+
+
+def exact_roads_path(graph: Graph, source: Hashable, bounds: list[dict[Hashable, float]],
+                     weight: str, max_roads: int = MAX_STOPS_SEARCH) \
+        -> Optional[tuple[list[Hashable], float]]:
+    """Return the path of junction keys from source with exactly len(bounds) - 1 roads and no
+    repeated junction that has the least total road weight, along with that total, or None if
+    there is no such path. This is a helper of exact_stops_routes().
+
+    Once max_roads roads have been tried, return the best path found so far instead, or None if
+    none has been found.
+
+    bounds[h] maps the key of each junction to a lower bound on the total weight of the rest of
+    a path that has h roads left, and leaves out the junctions that cannot end such a path. The
+    path ends at the only junction in bounds[0].
+
+    Preconditions:
+    - source in bounds[-1]
+    - weight in {'distance', 'cycle', 'motor'}
+    """
+    best_total, best_path = math.inf, None
+    path, totals = [source], [0.0]
+    on_path = {source}
+    # Each junction on path has an iterator over the roads left to try from it, best first.
+    untried = [iter(next_roads(graph, source, bounds[-2], weight))]
+    for _ in range(max_roads):
+        if untried == []:
+            break
+        road = next(untried[-1], None)
+        if road is None:
+            untried.pop()
+            on_path.discard(path.pop())
+            totals.pop()
+            continue
+
+        other, road_weight = road
+        total = totals[-1] + road_weight
+        remaining = len(bounds) - 1 - len(path)
+        if other in on_path or total + bounds[remaining][other] >= best_total:
+            continue
+        elif remaining == 0:
+            best_total, best_path = total, path + [other]
         else:
-            return []
-    return None
+            path.append(other)
+            totals.append(total)
+            on_path.add(other)
+            untried.append(iter(next_roads(graph, other, bounds[remaining - 1], weight)))
+
+    return None if best_path is None else (best_path, best_total)
+
+
+def next_roads(graph: Graph, key: Hashable, bounds: dict[Hashable, float],
+               weight: str) -> list[tuple[Hashable, float]]:
+    """Return the (neighbour key, road weight) of every road leaving key to a junction in
+    bounds, in increasing order of the road weight plus the bound of the neighbour. This is a
+    helper of exact_roads_path().
+    """
+    roads = [(other, road_weight) for other, road_weight in graph.weighted_neighbours(key, weight)
+             if other in bounds]
+    roads.sort(key=lambda road: road[1] + bounds[road[0]])
+    return roads
 
 
-def direct_route(graph: classes.RoadSystem, start: str, end: str) -> tuple[list, float]:
+def direct_route(graph: Graph, start: str, end: str) -> tuple[list, float]:
     """Return the most direct route between start and end along with its distance using
     Breadth-first search algorithm.
     >>> g = classes.RoadSystem()
@@ -253,29 +802,69 @@ def direct_route(graph: classes.RoadSystem, start: str, end: str) -> tuple[list,
     >>> direct_route(g, 'A', 'F')
     (['A', 'B', 'E', 'F'], 13.0)
     """
-    total_distance = 0.0
-    visited = set()
-    queue = [[start]]
     if start == end:
         return ([start], 0.0)
 
-    while queue != []:
-        path = queue.pop(0)
-        node = path[-1]
-        if node not in visited:
-            for neighbour in graph.junctions[node].neighbours:
-                new_path = list(path)
-                new_path.append(neighbour.name)
+    target = junction_key(graph, end)
+    _, parents = breadth_first_keys(graph, junction_key(graph, start), target)
+    if target not in parents:
+        return ([], 0.0)
+
+    roads = []
+    key = target
+    while parents[key] is not None:
+        roads.append((key, parents[key][1]))
+        key = parents[key][0]
+
+    path = [start]
+    total_distance = 0.0
+    for key, distance in reversed(roads):
+        path.append(junction_name(graph, key))
+        total_distance += distance
+    return (path, total_distance)
 
-                queue.append(new_path)
 
-                if neighbour.name == end:
-                    for i in range(len(new_path) - 1):
-                        total_distance += graph.get_junctions_dist(new_path[i], new_path[i + 1])
+def hop_counts(graph: Graph, start: str) -> dict[str, int]:
+    """Return a dictionary mapping every junction that can be reached from start to the least
+    number of roads on a route to it from start.
 
-                    return (new_path, total_distance)
-            visited.add(node)
-    return ([], 0.0)
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 6, 0, 0)
+    >>> g.add_road('B', 'C', 1, 0, 0)
+    >>> hop_counts(g, 'C')
+    {'C': 0, 'B': 1, 'A': 2}
+    """
+    hops, _ = breadth_first_keys(graph, junction_key(graph, start))
+    return {junction_name(graph, key): count for key, count in hops.items()}
+
+
+def breadth_first_keys(graph: Graph, source: Hashable, target: Optional[Hashable] = None) \
+        -> tuple[dict, dict]:
+    """The breadth-first search of direct_route() and hop_counts(), working on the junction keys
+    returned by junction_key() instead of junction names.
+
+    Return a dictionary mapping each junction key found to its number of roads from source, and
+    a dictionary mapping each junction key found to None if it is source, and otherwise to the
+    key it was found from and the distance of the road between them. Junctions are marked as
+    found when they are added to the queue, so each is only added once. The search stops as soon
+    as target is found.
+    """
+    hops = {source: 0}
+    parents = {source: None}
+    queue = collections.deque([source])
+    while queue:
+        key = queue.popleft()
+        for other, distance in graph.weighted_neighbours(key):
+            if other not in parents:
+                hops[other] = hops[key] + 1
+                parents[other] = (key, distance)
+                if other == target:
+                    return (hops, parents)
+                queue.append(other)
+
+    return (hops, parents)
 
 
 if __name__ == '__main__':
@@ -288,7 +877,8 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'max-line-length': 100,
         'disable': ['E9997', 'E1136', 'R0914'],
-        'extra-imports': ['math', 'classes', 'typing'],
+        'extra-imports': ['collections', 'heapq', 'itertools', 'math', 'classes', 'compact',
+                          'typing'],
         'allowed-io': [],
         'max-nested-blocks': 5,
     })
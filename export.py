@@ -0,0 +1,314 @@
+"""CSC111 Final Project, Route Export
+
+This python module writes routes as map data that other programs can draw, without building a
+folium map. It is meant for the results of batch routing ( batch.py ), where there can be
+thousands of routes: each route is written to the output file as soon as it is read, so only one
+route is held in memory at a time.
+
+The list of functions are:
+- Write routes as a GeoJSON FeatureCollection of LineString features ( write_geojson() )
+
+- Write routes in the binary route format described below ( write_binary() ), and read them back
+ ( read_binary() )
+
+- Write an HTML page that draws a GeoJSON file of routes with Leaflet ( write_viewer() )
+
+Routes are written from batch results on the command line with:
+    python export.py results.jsonl -o routes.geojson --viewer routes.html
+The viewer downloads the GeoJSON file only once the page has loaded, so it must be opened through
+a web server, for example by running
+    python -m http.server
+in the same folder and going to http://localhost:8000/routes.html.
+
+Binary route file layout (all numbers little endian):
+- A header of HEADER_FORMAT: the MAGIC bytes and the format VERSION.
+- One record per route: a RECORD_FORMAT header with the number of points and the length of the
+ properties, the properties of the route as utf-8 JSON, and the (longitude, latitude) of each
+ point as 8 byte floats.
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from array import array
+from typing import BinaryIO, Hashable, Iterable, Iterator, Optional, TextIO
+import argparse
+import json
+import os
+import struct
+import sys
+import computations
+import graph_store
+
+MAGIC = b'RDROUTES'
+VERSION = 1
+HEADER_FORMAT = '<8sI'
+RECORD_FORMAT = '<II'
+
+# The kinds of route in each batch result, as written by batch.answer_query().
+ROUTE_KINDS = ('shortest', 'direct', 'fastest')
+
+# The page written by write_viewer(). The same version of Leaflet as folium's maps is used.
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Routes</title>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.6.0/dist/leaflet.css">
+    <script src="https://cdn.jsdelivr.net/npm/leaflet@1.6.0/dist/leaflet.js"></script>
+    <style>html, body, #map {{ width: 100%; height: 100%; margin: 0; }}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+    var map = L.map('map', {{preferCanvas: true}}).setView([51.509865, -0.118092], 12);
+    L.tileLayer('https://{{s}}.basemaps.cartocdn.com/light_all/{{z}}/{{x}}/{{y}}.png', {{
+        attribution: '&copy; OpenStreetMap contributors &copy; CARTO'
+    }}).addTo(map);
+    var colours = {{shortest: 'red', direct: 'blue', fastest: 'green'}};
+    window.addEventListener('load', function () {{
+        fetch({data_file}).then(function (response) {{
+            return response.json();
+        }}).then(function (routes) {{
+            L.geoJSON(routes, {{
+                style: function (feature) {{
+                    return {{color: colours[feature.properties.kind] || 'purple', weight: 3,
+                             opacity: 0.6}};
+                }},
+                onEachFeature: function (feature, layer) {{
+                    var p = feature.properties;
+                    layer.bindTooltip('<b>' + p.kind + '</b>: ' + p.origin + ' to '
+                                      + p.destination);
+                }}
+            }}).addTo(map);
+        }});
+    }});
+</script>
+</body>
+</html>
+"""
+
+
+def path_coordinates(graph: computations.Graph, path: list[str],
+                     index: dict[Hashable, Optional[tuple[float, float]]]) \
+        -> list[tuple[float, float]]:
+    """Return the (longitude, latitude) of each junction of path that has a position, as given
+    by the junction_position() of graph, rounded to 6 decimal places (about 10 cm).
+
+    index maps the key of every junction whose position has already been looked up to its
+    (longitude, latitude), or None if it has no position. Junctions that are not in index are
+    added to it, so each position is only computed once however many routes pass through it.
+
+    Preconditions:
+    - every junction in path is a junction of graph
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0, [51.5, -0.1])
+    >>> g.add_road('B', 'C', 2.0, 0, 0)
+    >>> index = {}
+    >>> path_coordinates(g, ['A', 'B', 'C'], index)
+    [(-0.1, 51.5), (-0.1, 51.5)]
+    >>> index
+    {'A': (-0.1, 51.5), 'B': (-0.1, 51.5), 'C': None}
+    """
+    coordinates = []
+    for name in path:
+        key = computations.junction_key(graph, name)
+        if key not in index:
+            position = graph.junction_position(key)
+            index[key] = None if position is None \
+                else (round(position[1], 6), round(position[0], 6))
+        if index[key] is not None:
+            coordinates.append(index[key])
+    return coordinates
+
+
+def result_routes(results: Iterable[dict]) -> Iterator[tuple[list[str], dict]]:
+    """Yield the (path, properties) of every route in the batch results, as written by
+    batch.answer_query(). The properties are the origin, destination, mode and kind of the route
+    (one of ROUTE_KINDS), and its distance, and its time for the fastest route.
+
+    Results with an error and routes that were not found are skipped.
+
+    >>> result = {'origin': 'A', 'destination': 'B', 'mode': 'cycle',
+    ...           'shortest': {'path': ['A', 'B'], 'distance': 1.0},
+    ...           'direct': {'path': [], 'distance': 0}}
+    >>> list(result_routes([result, {'origin': 'A', 'destination': 'X', 'error': 'Unknown'}]))
+    [(['A', 'B'], {'origin': 'A', 'destination': 'B', 'mode': 'cycle', 'kind': 'shortest', \
+'distance': 1.0})]
+    """
+    for result in results:
+        for kind in ROUTE_KINDS:
+            if kind in result and len(result[kind]['path']) >= 2:
+                properties = {'origin': result['origin'], 'destination': result['destination'],
+                              'mode': result['mode'], 'kind': kind}
+                properties.update((key, value) for key, value in result[kind].items()
+                                  if key != 'path')
+                yield (result[kind]['path'], properties)
+
+
+def write_geojson(graph: computations.Graph, routes: Iterable[tuple[list[str], dict]],
+                  output: TextIO) -> int:
+    """Write the (path, properties) routes in routes to output as a GeoJSON FeatureCollection,
+    with one LineString feature per route whose coordinates are found by path_coordinates().
+    Routes with fewer than two positions are left out. Return the number of features written.
+
+    Each feature is written on its own line as soon as it is made.
+
+    >>> import classes, io
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0, [51.5, -0.1])
+    >>> g.add_road('B', 'C', 2.0, 0, 0, [51.6, -0.2])
+    >>> output = io.StringIO()
+    >>> write_geojson(g, [(['A', 'B', 'C'], {'kind': 'shortest'})], output)
+    1
+    >>> json.loads(output.getvalue())['features'][0]['geometry']
+    {'type': 'LineString', 'coordinates': [[-0.1, 51.5], [-0.1, 51.5], [-0.2, 51.6]]}
+    """
+    index = {}
+    count = 0
+    output.write('{"type": "FeatureCollection", "features": [\n')
+    for path, properties in routes:
+        coordinates = path_coordinates(graph, path, index)
+        if len(coordinates) < 2:
+            continue
+        feature = {'type': 'Feature', 'properties': properties,
+                   'geometry': {'type': 'LineString', 'coordinates': coordinates}}
+        output.write((',\n' if count > 0 else '') + json.dumps(feature))
+        count += 1
+    output.write('\n]}\n')
+    return count
+
+
+def write_binary(graph: computations.Graph, routes: Iterable[tuple[list[str], dict]],
+                 output: BinaryIO) -> int:
+    """Write the (path, properties) routes in routes to output in the binary route format
+    described at the top of this module. As in write_geojson(), routes with fewer than two
+    positions are left out, and the number of routes written is returned.
+
+    This is smaller and much faster to read than GeoJSON, since the coordinates are not written
+    as text.
+    """
+    index = {}
+    count = 0
+    output.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION))
+    for path, properties in routes:
+        coordinates = path_coordinates(graph, path, index)
+        if len(coordinates) < 2:
+            continue
+        encoded = json.dumps(properties).encode('utf-8')
+        output.write(struct.pack(RECORD_FORMAT, len(coordinates), len(encoded)))
+        output.write(encoded)
+        output.write(array('d', [c for point in coordinates for c in point]).tobytes())
+        count += 1
+    return count
+
+
+def read_binary(source: BinaryIO) -> Iterator[tuple[list[tuple[float, float]], dict]]:
+    """Yield the (coordinates, properties) of every route in the binary route file source, as
+    written by write_binary(). Each coordinate is a (longitude, latitude).
+
+    Raises a ValueError if source is not a binary route file of this VERSION.
+
+    >>> import classes, io
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0, [51.5, -0.1])
+    >>> g.add_road('B', 'C', 2.0, 0, 0, [51.6, -0.2])
+    >>> output = io.BytesIO()
+    >>> write_binary(g, [(['C', 'B'], {'kind': 'direct'})], output)
+    1
+    >>> list(read_binary(io.BytesIO(output.getvalue())))
+    [([(-0.2, 51.6), (-0.1, 51.5)], {'kind': 'direct'})]
+    """
+    header = source.read(struct.calcsize(HEADER_FORMAT))
+    if len(header) < struct.calcsize(HEADER_FORMAT) \
+            or struct.unpack(HEADER_FORMAT, header) != (MAGIC, VERSION):
+        raise ValueError('Not a binary route file of version ' + str(VERSION))
+
+    record_size = struct.calcsize(RECORD_FORMAT)
+    record = source.read(record_size)
+    while len(record) == record_size:
+        num_points, properties_size = struct.unpack(RECORD_FORMAT, record)
+        properties = json.loads(source.read(properties_size).decode('utf-8'))
+        values = array('d')
+        values.frombytes(source.read(16 * num_points))
+        yield (list(zip(values[::2], values[1::2])), properties)
+        record = source.read(record_size)
+
+
+def write_viewer(data_file: str, output: TextIO) -> None:
+    """Write to output an HTML page that draws the routes of the GeoJSON file data_file, which
+    is fetched by the page from the address data_file, relative to the page, once it has
+    loaded."""
+    output.write(VIEWER_TEMPLATE.format(data_file=json.dumps(data_file)))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the route export command line with the given arguments (sys.argv[1:] by default)."""
+    parser = argparse.ArgumentParser(description='Export the routes of batch results as GeoJSON '
+                                                 'or binary route files.')
+    parser.add_argument('results', nargs='?', default='-',
+                        help='JSON lines file of batch results, or - for standard input (default)')
+    parser.add_argument('-o', '--output', required=True, help='file to write the routes to')
+    parser.add_argument('--format', choices=('geojson', 'binary'), default='geojson',
+                        help='format of the output file (default geojson)')
+    parser.add_argument('--data', default='road.csv', help='road map csv file')
+    parser.add_argument('--viewer', help='also write an HTML page drawing the GeoJSON output')
+    args = parser.parse_args(argv)
+    if args.viewer is not None and args.format != 'geojson':
+        parser.error('--viewer can only be used with --format geojson')
+
+    graph = graph_store.get_compact_graph(args.data)
+    results_file = sys.stdin if args.results == '-' else open(args.results)
+    try:
+        routes = result_routes(json.loads(line) for line in results_file if line.strip() != '')
+        if args.format == 'binary':
+            with open(args.output, 'wb') as output_file:
+                count = write_binary(graph, routes, output_file)
+        else:
+            with open(args.output, 'w') as output_file:
+                count = write_geojson(graph, routes, output_file)
+    finally:
+        if results_file is not sys.stdin:
+            results_file.close()
+    print(f'Wrote {count} routes to {args.output}')
+
+    if args.viewer is not None:
+        with open(args.viewer, 'w') as viewer_file:
+            relative = os.path.relpath(args.output, os.path.dirname(os.path.abspath(args.viewer)))
+            write_viewer(relative.replace(os.sep, '/'), viewer_file)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+    else:
+        import doctest
+        doctest.testmod()
+
+        import python_ta
+        python_ta.check_all(config={
+            'max-line-length': 100,
+            'disable': ['E1136'],
+            'extra-imports': ['array', 'argparse', 'json', 'os', 'struct', 'sys', 'typing',
+                              'computations', 'graph_store'],
+            'allowed-io': ['main', 'write_viewer'],
+            'max-nested-blocks': 5,
+        })
@@ -0,0 +1,133 @@
+"""CSC111 Final Project, Graph Store
+
+This python module keeps a single, process-wide copy of the data loaded from each csv file so that
+the road map data is only read once no matter how many visualizations or computations need it.
+
+Loaded data is keyed by the absolute path of the file together with its modification time. When the
+file changes on disk, the next request reloads it and the stale copy is dropped.
+
+The list of loaders are:
+- The RoadSystem graph of a csv file ( get_graph() )
+
+- The dictionary of start junctions of a csv file ( get_dict() )
+
+- The CompactRoadSystem of a csv file, memory mapped from its binary snapshot
+ ( get_compact_graph() )
+
+- The contraction hierarchy of a csv file for a road weight, memory mapped from its hierarchy file
+ ( get_hierarchy() )
+
+NOTE: The returned objects are shared between every caller. Callers should not mutate them; load a
+private copy with classes.load_graph() or classes.load_dict() instead.
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Any, Callable
+import os
+import threading
+import classes
+import compact
+import hierarchy
+import snapshot
+
+# Maps (loader name, absolute file path) to (modification time, loaded value).
+_cache: dict[tuple[str, str], tuple[int, Any]] = {}
+_lock = threading.Lock()
+
+
+def get_graph(file_name: str = 'road.csv') -> classes.RoadSystem:
+    """Return the RoadSystem built from file_name, loading it only if it has not been loaded yet
+    or if the file has changed since it was last loaded.
+
+    Preconditions
+       - file_name is a path to the csv file location
+    """
+    return get_cached('graph', file_name, classes.load_graph)
+
+
+def get_dict(file_name: str = 'road.csv') -> dict[str, list[dict]]:
+    """Return the dictionary built by classes.load_dict from file_name, loading it only if it has
+    not been loaded yet or if the file has changed since it was last loaded.
+
+    Preconditions
+       - file_name is a path to the csv file location
+    """
+    return get_cached('dict', file_name, classes.load_dict)
+
+
+def get_compact_graph(file_name: str = 'road.csv') -> compact.CompactRoadSystem:
+    """Return the CompactRoadSystem of file_name, memory mapped from its snapshot by
+    snapshot.load_snapshot(), which rebuilds the snapshot first if file_name has changed.
+
+    Preconditions
+       - file_name is a path to the csv file location
+    """
+    return get_cached('compact', file_name, snapshot.load_snapshot)
+
+
+def get_hierarchy(file_name: str = 'road.csv', weight: str = 'distance') \
+        -> hierarchy.ContractionHierarchy:
+    """Return the contraction hierarchy of file_name for the given weight, memory mapped from its
+    hierarchy file by hierarchy.load_hierarchy(), which rebuilds that file first if file_name has
+    changed.
+
+    The hierarchy is also given to the graph returned by get_compact_graph(file_name), so routes
+    searched for on that graph with algorithm 'ch' use it instead of building their own.
+
+    Preconditions
+       - file_name is a path to the csv file location
+       - weight in hierarchy.WEIGHTS
+    """
+    loaded = get_cached('hierarchy ' + weight, file_name,
+                        lambda path: hierarchy.load_hierarchy(path, weight))
+    get_compact_graph(file_name).hierarchies[weight] = loaded
+    return loaded
+
+
+def get_cached(kind: str, file_name: str, loader: Callable[[str], Any]) -> Any:
+    """Return loader(file_name), reusing the value from an earlier call with the same kind and
+    file if the file has not been modified since.
+
+    Preconditions
+       - file_name is a path to an existing file
+    """
+    path = os.path.abspath(file_name)
+    mtime = os.stat(path).st_mtime_ns
+    key = (kind, path)
+    with _lock:
+        if key in _cache and _cache[key][0] == mtime:
+            return _cache[key][1]
+
+        value = loader(path)
+        _cache[key] = (mtime, value)
+        return value
+
+
+def clear() -> None:
+    """Forget every loaded value, so the next request reads the files again."""
+    with _lock:
+        _cache.clear()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['os', 'threading', 'typing', 'classes', 'compact', 'hierarchy',
+                          'snapshot'],
+        'allowed-io': [],
+        'max-nested-blocks': 5,
+    })
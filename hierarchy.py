@@ -0,0 +1,439 @@
+"""CSC111 Final Project, Contraction Hierarchies
+
+This python module speeds up route queries between two junctions by preprocessing the road graph
+into a contraction hierarchy, for one road weight at a time ('distance', 'cycle' or 'motor').
+
+The junctions are contracted one at a time, least important first. Contracting a junction removes
+it from the graph, adding a shortcut road between two of its remaining neighbours whenever the
+route through it is the only shortest route between them. The junction's rank is the order in
+which it was contracted, and only its roads to junctions of higher rank are kept
+( build_hierarchy() ).
+
+A query searches upwards from both ends at once, only ever following roads to junctions of higher
+rank, so it settles a few dozen junctions instead of most of the graph. The shortcuts on the route
+found are then unpacked into the roads they replace, giving the same junction names as
+computations.shortest_route() and computations.fastest_route() ( ContractionHierarchy.route() ).
+
+Hierarchies are saved next to the csv file they were built from, and are only rebuilt when that
+file changes ( load_hierarchy() ).
+
+A hierarchy file uses the header of snapshot.HEADER_FORMAT, with HIERARCHY_MAGIC, the format
+VERSION, the index of its weight in WEIGHTS, the modification time and size of the csv file, the
+number of junctions, upward roads, strings and string bytes. After the header come the 8 byte
+arrays ranks, offsets, targets, weights and middles of the ContractionHierarchy, in that order,
+and the string table of junction names as in a snapshot file.
+
+The hierarchies of the csv file can also be built from the command line with:
+    python hierarchy.py build road.csv
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from __future__ import annotations
+from array import array
+from typing import Optional
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import computations
+import snapshot
+
+HIERARCHY_MAGIC = b'RDHIERCH'
+VERSION = 1
+WEIGHTS = ('distance', 'cycle', 'motor')
+
+# The name and type code of each array stored in a hierarchy file after ranks and offsets, which
+# have one element per junction and one more than that. These have one element per upward road.
+ROAD_ARRAYS = [('targets', 'q'), ('weights', 'd'), ('middles', 'q')]
+
+
+class ContractionHierarchy:
+    """A contraction hierarchy of a road graph for one road weight.
+
+    The upward roads leaving the junction with id i, which lead to junctions of higher rank, are
+    stored at the positions offsets[i] to offsets[i + 1] - 1 of targets, weights and middles, as
+    in a CompactRoadSystem. Every upward road is also a downward road from its target back to i
+    with the same weight.
+
+    Instance Attributes:
+        - names - The name of each junction, in the order of the graph's get_all_junctions().
+        - ids - A dictionary mapping each junction name to its id.
+        - weight - The road weight the hierarchy was built for.
+        - ranks - The position of each junction in the order of contraction.
+        - offsets - The start of the upward roads of each junction, followed by the number of
+         upward roads.
+        - targets - The id of the junction at the end of each upward road.
+        - weights - The weight of each upward road.
+        - middles - The id of the junction contracted to make each upward road a shortcut, or -1
+         if it is a road of the graph.
+
+    Representation Invariants:
+        - len(self.names) == len(self.ranks) == len(self.offsets) - 1
+        - all(self.ranks[self.targets[i]] > self.ranks[j]
+              for j in range(len(self.names))
+              for i in range(self.offsets[j], self.offsets[j + 1]))
+    """
+    names: list[str]
+    ids: dict[str, int]
+    weight: str
+    ranks: array
+    offsets: array
+    targets: array
+    weights: array
+    middles: array
+
+    def __init__(self, names: list[str], weight: str, ranks: array, offsets: array,
+                 targets: array, weights: array, middles: array) -> None:
+        """Initialize a contraction hierarchy from its arrays."""
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.weight = weight
+        self.ranks = ranks
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+
+    def route(self, start: str, end: str) -> tuple[list[str], float, int]:
+        """Return a path from start to end with the least total road weight, that total, and the
+        number of junctions settled while searching for it. Return ([], math.inf, number of
+        settled junctions) if there is no such path.
+
+        The search goes upwards from start and from end at the same time. The route found is
+        through the junction where the two searches meet with the least total weight, and the
+        searches stop once neither has an unsettled junction nearer than that total.
+
+        Preconditions:
+        - start in self.ids and end in self.ids
+
+        >>> import classes
+        >>> g = classes.RoadSystem()
+        >>> for name in ['A', 'B', 'C', 'D']:
+        ...     g.add_junction(name)
+        >>> g.add_road('A', 'B', 1.0, 0, 0)
+        >>> g.add_road('B', 'C', 2.0, 0, 0)
+        >>> g.add_road('A', 'C', 5.0, 0, 0)
+        >>> build_hierarchy(g).route('A', 'C')[:2]
+        (['A', 'B', 'C'], 3.0)
+        >>> build_hierarchy(g).route('A', 'D')[:2]
+        ([], inf)
+        """
+        source = self.ids[start]
+        target = self.ids[end]
+        costs = ({source: 0.0}, {target: 0.0})
+        previous = ({source: None}, {target: None})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meeting = math.inf, None
+        settled = 0
+        while True:
+            sides = [side for side in (0, 1) if heaps[side] and heaps[side][0][0] < best]
+            if sides == []:
+                break
+            side = min(sides, key=lambda s: heaps[s][0][0])
+            cost, key = heapq.heappop(heaps[side])
+            if cost > costs[side][key]:
+                continue
+            settled += 1
+            if key in costs[1 - side] and cost + costs[1 - side][key] < best:
+                best, meeting = cost + costs[1 - side][key], key
+
+            for i in range(self.offsets[key], self.offsets[key + 1]):
+                other = self.targets[i]
+                new_cost = cost + self.weights[i]
+                if new_cost < costs[side].get(other, math.inf):
+                    costs[side][other] = new_cost
+                    previous[side][other] = key
+                    heapq.heappush(heaps[side], (new_cost, other))
+
+        if meeting is None:
+            return ([], math.inf, settled)
+
+        upward = computations.build_path(previous[0], meeting) \
+            + computations.build_path(previous[1], meeting)[-2::-1]
+        path = [source]
+        total = 0.0
+        for i in range(len(upward) - 1):
+            for junction, road_weight in self.unpack(upward[i], upward[i + 1]):
+                path.append(junction)
+                total += road_weight
+        return ([self.names[junction] for junction in path], total, settled)
+
+    def unpack(self, start: int, end: int) -> list[tuple[int, float]]:
+        """Return the (junction id, road weight) of each road of the graph along the upward road
+        between start and end, in order from start, where each junction id is the end of its road.
+
+        Preconditions:
+        - there is an upward road between start and end
+        """
+        roads = []
+        stack = [(start, end)]
+        while stack:
+            u, v = stack.pop()
+            i = self.road_index(u, v)
+            if self.middles[i] == -1:
+                roads.append((v, self.weights[i]))
+            else:
+                stack.append((self.middles[i], v))
+                stack.append((u, self.middles[i]))
+        return roads
+
+    def road_index(self, u: int, v: int) -> int:
+        """Return the position of the upward road between u and v in targets, or -1 if there is
+        none."""
+        low, high = (u, v) if self.ranks[u] < self.ranks[v] else (v, u)
+        for i in range(self.offsets[low], self.offsets[low + 1]):
+            if self.targets[i] == high:
+                return i
+        return -1
+
+
+def build_hierarchy(graph: computations.Graph, weight: str = 'distance',
+                    witness_limit: int = 100) -> ContractionHierarchy:
+    """Return the contraction hierarchy of graph for the given road weight.
+
+    Junctions are contracted in order of the number of shortcuts their contraction adds less the
+    number of roads it removes, plus the number of their neighbours already contracted, so that
+    the graph stays small and the contracted junctions are spread out. The order is kept in a heap
+    and a junction's priority is only recomputed when it reaches the top.
+
+    Before a shortcut is added, a witness search looks for another route between its ends that is
+    no longer. The search gives up after settling witness_limit junctions, in which case the
+    shortcut is added anyway: an unneeded shortcut makes queries slower but not wrong.
+
+    Preconditions:
+    - weight in WEIGHTS
+    - witness_limit >= 1
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0)
+    >>> g.add_road('B', 'C', 2.0, 0, 0)
+    >>> hierarchy = build_hierarchy(g)
+    >>> sorted(hierarchy.names, key=lambda name: hierarchy.ranks[hierarchy.ids[name]])
+    ['A', 'C', 'B']
+    """
+    names = graph.get_all_junctions()
+    keys = [computations.junction_key(graph, name) for name in names]
+    index = {key: i for i, key in enumerate(keys)}
+
+    # roads[i] maps each neighbour of junction i that is not contracted yet to the weight of the
+    # road between them and the junction it is a shortcut through (or -1).
+    roads = [{} for _ in names]
+    for i, key in enumerate(keys):
+        for other, road_weight in graph.weighted_neighbours(key, weight):
+            j = index[other]
+            if j != i and road_weight < roads[i].get(j, (math.inf, -1))[0]:
+                roads[i][j] = (road_weight, -1)
+                roads[j][i] = (road_weight, -1)
+
+    contracted_neighbours = [0] * len(names)
+    ranks = array('q', [0]) * len(names)
+    upward = [[] for _ in names]
+    heap = [(_priority(roads, contracted_neighbours, v, witness_limit)[0], v)
+            for v in range(len(names))]
+    heapq.heapify(heap)
+    rank = 0
+    while heap:
+        _, v = heapq.heappop(heap)
+        priority, shortcuts = _priority(roads, contracted_neighbours, v, witness_limit)
+        if heap and priority > heap[0][0]:
+            heapq.heappush(heap, (priority, v))
+            continue
+
+        ranks[v] = rank
+        rank += 1
+        upward[v] = [(u, road_weight, middle) for u, (road_weight, middle) in roads[v].items()]
+        for u in roads[v]:
+            del roads[u][v]
+            contracted_neighbours[u] += 1
+        for u, w, shortcut_weight in shortcuts:
+            if shortcut_weight < roads[u].get(w, (math.inf, -1))[0]:
+                roads[u][w] = (shortcut_weight, v)
+                roads[w][u] = (shortcut_weight, v)
+        roads[v] = {}
+
+    offsets = array('q', [0])
+    targets, weights, middles = array('q'), array('d'), array('q')
+    for v in range(len(names)):
+        for u, road_weight, middle in upward[v]:
+            targets.append(u)
+            weights.append(road_weight)
+            middles.append(middle)
+        offsets.append(len(targets))
+
+    return ContractionHierarchy(names, weight, ranks, offsets, targets, weights, middles)
+
+
+def _priority(roads: list[dict[int, tuple[float, int]]], contracted_neighbours: list[int], v: int,
+              witness_limit: int) -> tuple[int, list[tuple[int, int, float]]]:
+    """Return the contraction priority of junction v and the (u, w, weight) shortcuts its
+    contraction would add, as described in build_hierarchy()."""
+    neighbours = list(roads[v].items())
+    shortcuts = []
+    for a, (u, (u_weight, _)) in enumerate(neighbours[:-1]):
+        limit = u_weight + max(road_weight for _, (road_weight, _) in neighbours[a + 1:])
+        witness = _witness_search(roads, u, v, limit, witness_limit)
+        for w, (w_weight, _) in neighbours[a + 1:]:
+            if witness.get(w, math.inf) > u_weight + w_weight:
+                shortcuts.append((u, w, u_weight + w_weight))
+
+    priority = len(shortcuts) - len(neighbours) + contracted_neighbours[v]
+    return (priority, shortcuts)
+
+
+def _witness_search(roads: list[dict[int, tuple[float, int]]], source: int, avoid: int,
+                    limit: float, witness_limit: int) -> dict[int, float]:
+    """Return the least total weight of the routes from source that avoid the junction avoid to
+    the junctions settled by a Dijkstra search that stops beyond limit or after settling
+    witness_limit junctions."""
+    settled = {}
+    heap = [(0.0, source)]
+    while heap and len(settled) < witness_limit:
+        cost, key = heapq.heappop(heap)
+        if key in settled:
+            continue
+        if cost > limit:
+            break
+        settled[key] = cost
+        for other, (road_weight, _) in roads[key].items():
+            if other != avoid and other not in settled:
+                heapq.heappush(heap, (cost + road_weight, other))
+    return settled
+
+
+def hierarchy_path(file_name: str, weight: str) -> str:
+    """Return the default hierarchy file name for the csv file file_name and the given weight.
+
+    >>> hierarchy_path('road.csv', 'cycle')
+    'road.cycle.hierarchy'
+    """
+    return os.path.splitext(file_name)[0] + '.' + weight + '.hierarchy'
+
+
+def save_hierarchy(hierarchy: ContractionHierarchy, file_name: str, output: str) -> None:
+    """Write hierarchy, which was built from the current contents of the csv file file_name, to
+    the file output.
+
+    As in snapshot.build_index(), the file is first written to a temporary file which then
+    replaces output.
+    """
+    source = os.stat(file_name)
+    strings = [name.encode('utf-8') for name in hierarchy.names]
+    string_offsets = array('q', [0])
+    for string in strings:
+        string_offsets.append(string_offsets[-1] + len(string))
+
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(output)),
+                                     prefix=os.path.basename(output) + '.', suffix='.tmp',
+                                     delete=False) as hierarchy_file:
+        hierarchy_file.write(struct.pack(snapshot.HEADER_FORMAT, HIERARCHY_MAGIC, VERSION,
+                                         WEIGHTS.index(hierarchy.weight), source.st_mtime_ns,
+                                         source.st_size, len(hierarchy.names),
+                                         len(hierarchy.targets), len(strings),
+                                         string_offsets[-1]))
+        hierarchy_file.write(array('q', hierarchy.ranks).tobytes())
+        hierarchy_file.write(array('q', hierarchy.offsets).tobytes())
+        for name, type_code in ROAD_ARRAYS:
+            hierarchy_file.write(array(type_code, getattr(hierarchy, name)).tobytes())
+        hierarchy_file.write(string_offsets.tobytes())
+        hierarchy_file.write(b''.join(strings))
+
+    # Temporary files can only be read by their owner, unlike the files other processes share.
+    os.chmod(hierarchy_file.name, 0o644)
+    os.replace(hierarchy_file.name, output)
+
+
+def load_hierarchy(file_name: str, weight: str = 'distance',
+                   hierarchy_file: Optional[str] = None) -> ContractionHierarchy:
+    """Return the contraction hierarchy of the road graph of the csv file file_name for the given
+    weight, memory mapped from its hierarchy file.
+
+    The hierarchy is read from hierarchy_file, or from hierarchy_path(file_name, weight) if
+    hierarchy_file is None. If that file does not exist or was built from an older version of
+    file_name, the hierarchy is built from the snapshot of file_name and saved there first.
+
+    Preconditions
+       - file_name is a path to the csv file location
+       - weight in WEIGHTS
+    """
+    if hierarchy_file is None:
+        hierarchy_file = hierarchy_path(file_name, weight)
+    if not snapshot.is_current(file_name, hierarchy_file, HIERARCHY_MAGIC, VERSION):
+        save_hierarchy(build_hierarchy(snapshot.load_snapshot(file_name), weight), file_name,
+                       hierarchy_file)
+
+    with open(hierarchy_file, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    header_size = struct.calcsize(snapshot.HEADER_FORMAT)
+    _, _, _, _, _, num_junctions, num_roads, num_strings, _ = \
+        struct.unpack(snapshot.HEADER_FORMAT, view[:header_size])
+
+    position = header_size
+    ranks = view[position:position + 8 * num_junctions].cast('q')
+    position += 8 * num_junctions
+    offsets = view[position:position + 8 * (num_junctions + 1)].cast('q')
+    position += 8 * (num_junctions + 1)
+    arrays = {}
+    for name, type_code in ROAD_ARRAYS:
+        arrays[name] = view[position:position + 8 * num_roads].cast(type_code)
+        position += 8 * num_roads
+
+    string_offsets = view[position:position + 8 * (num_strings + 1)].cast('q')
+    position += 8 * (num_strings + 1)
+    string_bytes = view[position:]
+    names = [str(string_bytes[string_offsets[i]:string_offsets[i + 1]], 'utf-8')
+             for i in range(num_strings)]
+
+    return ContractionHierarchy(names, weight, ranks, offsets, **arrays)
+
+
+def graph_hierarchy(graph: computations.Graph, weight: str = 'distance') \
+        -> ContractionHierarchy:
+    """Return the contraction hierarchy of graph for the given weight, building it if graph does
+    not have one yet. The hierarchy is remembered by the graph.
+
+    Preconditions:
+    - weight in WEIGHTS
+    """
+    if weight not in graph.hierarchies:
+        graph.hierarchies[weight] = build_hierarchy(graph, weight)
+    return graph.hierarchies[weight]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == 'build':
+        for road_weight in WEIGHTS:
+            load_hierarchy(sys.argv[2], road_weight)
+            print(hierarchy_path(sys.argv[2], road_weight))
+    else:
+        import doctest
+        doctest.testmod()
+
+        import python_ta
+        python_ta.check_all(config={
+            'max-line-length': 100,
+            'disable': ['E1136', 'R0913', 'R0914'],
+            'extra-imports': ['array', 'heapq', 'math', 'mmap', 'os', 'struct', 'sys', 'tempfile',
+                              'typing', 'computations', 'snapshot'],
+            'allowed-io': ['save_hierarchy', 'load_hierarchy'],
+            'max-nested-blocks': 5,
+        })
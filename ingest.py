@@ -0,0 +1,171 @@
+"""CSC111 Final Project, Data Ingestion
+
+This python module reads road traffic count csv files in the format of the Department for
+Transport's annual average daily flow (AADF) data, from the London extract in road.csv up to the
+full file for every region and year of Great Britain.
+
+The columns are found by their names in the header row ( column_indexes() ), so the files may
+have extra columns or the columns in a different order. The rows are read one at a time and only
+those in the wanted regions, years and road types are kept ( read_count_points() ). A road link
+can be counted in many years, so the count points of each link are then combined into one
+( aggregate_count_points() ). Only one record per road link is ever held in memory, so even the
+full file can be read into a graph ( classes.load_graph() and compact.load_compact_graph() ).
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import AbstractSet, Iterable, Iterator, NamedTuple, Optional
+import csv
+
+# The name in the header row of each column that is read.
+COLUMNS = ('year', 'region_name', 'road_name', 'road_type', 'start_junction_road_name',
+           'end_junction_road_name', 'latitude', 'longitude', 'link_length_km', 'pedal_cycles',
+           'all_motor_vehicles')
+
+# The ways the count points of one road link can be combined, as described in
+# aggregate_count_points().
+POLICIES = ('latest', 'mean')
+
+
+class CountPoint(NamedTuple):
+    """The traffic counted on a road link between two junctions in one year.
+
+    Instance Attributes:
+        - year - The year of the count.
+        - road_name - The name of the road the link is on.
+        - start - The name of the junction at the start of the link.
+        - end - The name of the junction at the end of the link.
+        - latitude - The latitude of the count point.
+        - longitude - The longitude of the count point.
+        - distance - The length of the link in km.
+        - cycles - The average number of pedal cycles counted per day.
+        - motor - The average number of motor vehicles counted per day.
+    """
+    year: int
+    road_name: str
+    start: str
+    end: str
+    latitude: float
+    longitude: float
+    distance: float
+    cycles: int
+    motor: int
+
+
+def column_indexes(header: list[str]) -> dict[str, int]:
+    """Return a dictionary mapping each name in COLUMNS to its index in the header row header.
+
+    Raises a ValueError naming the missing columns if any are not in header.
+
+    >>> indexes = column_indexes(['count_point_id'] + list(COLUMNS))
+    >>> indexes['year'], indexes['all_motor_vehicles']
+    (1, 11)
+    """
+    indexes = {name.strip(): i for i, name in enumerate(header)}
+    missing = [name for name in COLUMNS if name not in indexes]
+    if missing != []:
+        raise ValueError('Missing columns: ' + ', '.join(missing))
+    return {name: indexes[name] for name in COLUMNS}
+
+
+def read_count_points(file_name: str, regions: Optional[AbstractSet[str]] = None,
+                      years: Optional[AbstractSet[int]] = None,
+                      road_types: Optional[AbstractSet[str]] = None) -> Iterator[CountPoint]:
+    """Yield the count points in the csv file file_name, in order, that are in one of regions,
+    one of years and one of road_types. A filter that is None lets every row through.
+
+    Rows without a start or end junction, or with a missing length or count, are skipped, since
+    they are not links between two junctions.
+
+    Preconditions
+       - file_name is a path to a csv file with a header row containing COLUMNS
+    """
+    with open(file_name, newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        columns = column_indexes(next(reader))
+        year, region, road_type = columns['year'], columns['region_name'], columns['road_type']
+        start, end = columns['start_junction_road_name'], columns['end_junction_road_name']
+        numbers = [columns[name] for name in ('link_length_km', 'pedal_cycles',
+                                              'all_motor_vehicles')]
+        for row in reader:
+            if (regions is not None and row[region] not in regions) \
+                    or (road_types is not None and row[road_type] not in road_types) \
+                    or (years is not None and int(row[year]) not in years) \
+                    or row[start] == '' or row[end] == '' \
+                    or any(row[i] == '' for i in numbers):
+                continue
+            yield CountPoint(int(row[year]), row[columns['road_name']], row[start], row[end],
+                             float(row[columns['latitude']]), float(row[columns['longitude']]),
+                             float(row[numbers[0]]), int(row[numbers[1]]), int(row[numbers[2]]))
+
+
+def aggregate_count_points(points: Iterable[CountPoint], policy: str = 'latest') \
+        -> tuple[dict[str, None], dict[frozenset[str], CountPoint], dict[frozenset[str], tuple]]:
+    """Combine the count points of each road link in points, and return:
+    - a dictionary whose keys are the junction names, in the order they first appear
+    - a dictionary mapping the unordered pair of junction names of each road link to its combined
+     count point, in the order the links first appear
+    - a dictionary mapping the unordered pair of junction names of each road link to the
+     (latitude, longitude, road name) of its first count point
+
+    If policy is 'latest', a link's count point is its last one from the latest year it was
+    counted in. If policy is 'mean', it is that count point with the counts replaced by the mean
+    counts over every year, rounded to the nearest whole number.
+
+    Preconditions:
+    - policy in POLICIES
+
+    >>> points = [CountPoint(2018, 'A1', 'X', 'Y', 51.5, -0.1, 1.0, 10, 100),
+    ...           CountPoint(2019, 'A1', 'Y', 'X', 51.6, -0.1, 1.0, 20, 300),
+    ...           CountPoint(2017, 'A1', 'X', 'Y', 51.5, -0.1, 1.0, 30, 200)]
+    >>> junctions, roads, locations = aggregate_count_points(points)
+    >>> list(junctions), roads[frozenset(('X', 'Y'))].cycles, locations[frozenset(('X', 'Y'))]
+    (['X', 'Y'], 20, (51.5, -0.1, 'A1'))
+    >>> aggregate_count_points(points, 'mean')[1][frozenset(('X', 'Y'))][7:]
+    (20, 200)
+    """
+    junctions = {}
+    roads = {}
+    locations = {}
+    # Maps each link to the sums of its cycle and motor counts and the number of count points.
+    totals = {}
+    for point in points:
+        junctions.setdefault(point.start)
+        junctions.setdefault(point.end)
+        pair = frozenset((point.start, point.end))
+        locations.setdefault(pair, (point.latitude, point.longitude, point.road_name))
+        if pair not in roads or point.year >= roads[pair].year:
+            roads[pair] = point
+        if policy == 'mean':
+            cycles, motor, count = totals.get(pair, (0, 0, 0))
+            totals[pair] = (cycles + point.cycles, motor + point.motor, count + 1)
+
+    for pair, (cycles, motor, count) in totals.items():
+        roads[pair] = roads[pair]._replace(cycles=round(cycles / count),
+                                           motor=round(motor / count))
+    return (junctions, roads, locations)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['csv', 'typing'],
+        'allowed-io': ['read_count_points'],
+        'max-nested-blocks': 5,
+    })
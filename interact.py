@@ -15,12 +15,13 @@ The GB Road Traffic Counts is produced by the Department for Transport. The Depa
 collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
 last updated in October 2020."""
 
-import classes
-import computations
+import math
+import graph_store
+import route_cache
 import visualizations
 
-graph_dict = classes.load_dict('road.csv')
-graph = classes.load_graph('road.csv')
+graph_dict = graph_store.get_dict('road.csv')
+graph = graph_store.get_graph('road.csv')
 
 
 def ask_origin() -> str:
@@ -76,100 +77,59 @@ mode_transport = ask_mode_transport()
 def visualize() -> None:
     """Show the visualizations for paths with the number of stops OR direct path, shortest path,
      and the most efficient path in terms of time along with the total destination and time taken.
+
+     Every path is drawn on the one map of visualizations.visualize_all_routes().
      """
+    different = origin != destination
+    if different:
+        path_stops, total_distance = route_cache.exact_stops_route(graph, origin, destination,
+                                                                   number_stops)
+    else:
+        path_stops, total_distance = [], 0.0
 
-    is_available = visualizations.visualize_path_specific_stops(origin,
-                                                                destination, number_stops)
-    if not is_available[0]:
-        print('')
-        n = input(f'How many paths are you looking for from {origin} to {destination}?')
-        visualizations.visualize_multiple_path(origin, destination, int(n))
+    print('')
+    n = input(f'How many paths are you looking for from {origin} to {destination}?')
 
+    if path_stops == []:
         print('')
         print(f'No path found between {origin} and {destination} with {number_stops} stops.')
         print('')
 
-        if visualizations.visualize_shortest_path(origin, destination):
-            total_distance_shortest = computations.shortest_route(graph, origin, destination)[
-                1]
-            path_shortest = computations.shortest_route(graph, origin, destination)[
-                0]
-            list_time_shortestpath = []
-            for i in range(len(path_shortest) - 1):
-                list_time_shortestpath.append(
-                    classes.RoadSystem.time_taken_between_junctions(graph,
-                                                                    mode_transport,
-                                                                    path_shortest[i],
-                                                                    path_shortest[i + 1]))
-
-            if any(isinstance(item, str) for item in list_time_shortestpath):
-                print('Cycles cannot be used on the shortest road!')
-            else:
-                tota_time_shortestpath = sum(list_time_shortestpath)
-                print(f'Total distance of the shortest path = {total_distance_shortest} KM')
-                print(f'Total time of the shortest path = {tota_time_shortestpath} hours')
-                print('')
-
-        if visualizations.visualize_direct_path(origin, destination):
-            helper_visualize()
-
-        if visualizations.visualize_shortest_time_path(origin, destination, mode_transport):
-            helper_visualize2()
+    if different and route_cache.shortest_route(graph, origin, destination)[0] != []:
+        total_distance_shortest = route_cache.shortest_route(graph, origin, destination)[1]
+        path_shortest = route_cache.shortest_route(graph, origin, destination)[0]
+        tota_time_shortestpath = graph.path_time(path_shortest, mode_transport)
 
-    else:
-        print('')
-        n = input(f'How many paths are you looking for from {origin} to {destination}?')
-        visualizations.visualize_multiple_path(origin, destination, int(n))
-
-        if visualizations.visualize_shortest_path(origin, destination):
-            total_distance_shortest = computations.shortest_route(graph, origin, destination)[
-                1]
-            path_shortest = computations.shortest_route(graph, origin, destination)[
-                0]
-            list_time_shortestpath = []
-            for i in range(len(path_shortest) - 1):
-                list_time_shortestpath.append(
-                    classes.RoadSystem.time_taken_between_junctions(graph,
-                                                                    mode_transport,
-                                                                    path_shortest[i],
-                                                                    path_shortest[i + 1]))
-
-            if any(isinstance(item, str) for item in list_time_shortestpath):
-                print('Cycles cannot be used on the shortest road!')
-            else:
-                tota_time_shortestpath = sum(list_time_shortestpath)
-                print(f'Total distance of the shortest path = {total_distance_shortest} KM')
-                print(f'Total time of the shortest path = {tota_time_shortestpath} hours')
-                print('')
-
-        if visualizations.visualize_direct_path(origin, destination):
-            helper_visualize()
-
-        if visualizations.visualize_shortest_time_path(origin, destination, mode_transport):
-            helper_visualize2()
-
-        total_distance = is_available[1]
-        time_between_juncs = []
-        alternative_paths = computations.multiple_path(graph, origin, destination)
-        shortest_time_path_tuple = computations.path_with_shortest_time(graph, mode_transport,
-                                                                        alternative_paths)
-        for i in range(len(shortest_time_path_tuple[0]) - 1):
-            time_between_juncs.append(
-                graph.time_taken_between_junctions(mode_transport, shortest_time_path_tuple[0][i],
-                                                   shortest_time_path_tuple[0][i + 1]))
-        if any(isinstance(item, str) for item in time_between_juncs):
+        if tota_time_shortestpath == math.inf:
+            print('Cycles cannot be used on the shortest road!')
+        else:
+            print(f'Total distance of the shortest path = {total_distance_shortest} KM')
+            print(f'Total time of the shortest path = {tota_time_shortestpath} hours')
+            print('')
+
+    if different and route_cache.direct_route(graph, origin, destination)[0] != []:
+        helper_visualize()
+
+    shortest_time_path_tuple = route_cache.fastest_route(graph, origin, destination,
+                                                         mode_transport)
+    if different and shortest_time_path_tuple[0] != []:
+        helper_visualize2()
+
+    if path_stops != []:
+        if shortest_time_path_tuple[0] == []:
             print('Cycles cannot be used on that road!')
             print('')
         else:
-            total_time = sum(time_between_juncs)
+            total_time = graph.path_time(shortest_time_path_tuple[0], mode_transport)
             print(f'Total distance of the path with {number_stops} stops = {total_distance} KM')
             print(f'Total time of the path with {number_stops} stops = {total_time} hours')
             print('')
 
-    print(
-        'Please open the generated files to view the visualizations if either of the paths exist.')
+    visualizations.visualize_all_routes(origin, destination, mode_transport, number_stops, int(n))
+
+    print('Please open the generated file to view the visualization if any of the paths exist.')
 
-    print('\nNote: In case of no files being generated, try the following input paris by re running'
+    print('\nNote: In case of no file being generated, try the following input paris by re running'
           ' the console: \n'
           'Where do you want to start?: LA Boundary'
           '\nHow many places do you want to stop by? : 3'
@@ -179,21 +139,14 @@ def visualize() -> None:
 
 def helper_visualize() -> None:
     """A helper for visualize for the direct path branch."""
-    total_distance_direct = computations.direct_route(graph, origin, destination)[1]
-    path_direct = computations.direct_route(graph, origin, destination)[0]
-    list_time_direct = []
-    for i in range(len(path_direct) - 1):
-        list_time_direct.append(
-            classes.RoadSystem.time_taken_between_junctions(graph,
-                                                            mode_transport,
-                                                            path_direct[i],
-                                                            path_direct[i + 1]))
-
-    if any(isinstance(item, str) for item in list_time_direct):
+    total_distance_direct = route_cache.direct_route(graph, origin, destination)[1]
+    path_direct = route_cache.direct_route(graph, origin, destination)[0]
+    total_time_direct = graph.path_time(path_direct, mode_transport)
+
+    if total_time_direct == math.inf:
         print('Cycles cannot be used on the direct road!')
         print('')
     else:
-        total_time_direct = sum(list_time_direct)
         print(f'Total distance of the direct path = {total_distance_direct} KM')
         print(f'Total time of the direct path = {total_time_direct} hours')
         print('')
@@ -201,11 +154,8 @@ def helper_visualize() -> None:
 
 def helper_visualize2() -> None:
     """A helper for visualize for the shortest time path branch."""
-    alternative_paths = computations.multiple_path(graph, origin, destination)
-    total_distance_shortest_time \
-        = computations.path_with_shortest_time(graph, mode_transport, alternative_paths)[2]
-    total_time_shortest_time \
-        = computations.path_with_shortest_time(graph, mode_transport, alternative_paths)[1]
+    _, total_time_shortest_time, total_distance_shortest_time \
+        = route_cache.fastest_route(graph, origin, destination, mode_transport)
 
     print(f'Total distance of the shortest time path = {total_distance_shortest_time} KM')
     print(f'Total time of the shortest time path = {total_time_shortest_time} hours')
@@ -217,7 +167,7 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'max-line-length': 100,
         'disable': ['E1136', 'E9997'],
-        'extra-imports': ['random', 'classes', 'visualizations', 'computations'],
+        'extra-imports': ['math', 'random', 'visualizations', 'graph_store', 'route_cache'],
         'allowed-io': ['ask_origin', 'ask_stops', 'ask_mode_transport', 'ask_destination',
                        'visualize', 'helper_visualize', 'helper_visualize2'],
         'max-nested-blocks': 5,
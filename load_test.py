@@ -0,0 +1,167 @@
+"""CSC111 Final Project, Routing Service Load Test
+
+This python module measures how quickly the routing service ( service.py ) answers requests. It
+sends a number of requests from several threads at once and reports the median (p50) and 99th
+percentile (p99) time taken to answer a request, and the number of requests answered per second.
+
+The requests are between random pairs of junctions of road.csv, chosen with a fixed seed so that
+runs can be compared. If no service address is given, a service is started in this process on a
+free port for the length of the test.
+
+Run it with:
+    python load_test.py --requests 2000 --concurrency 8 --endpoint route
+or, against a service that is already running:
+    python load_test.py --url http://localhost:8000
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import argparse
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import graph_store
+import service
+
+
+def request_urls(base_url: str, endpoint: str, num_requests: int, seed: int = 111) -> list[str]:
+    """Return num_requests urls of requests to endpoint of the service at base_url, each between
+    a random pair of junctions of road.csv.
+
+    >>> urls = request_urls('http://localhost:8000', 'route', 2)
+    >>> len(urls), urls[0].startswith('http://localhost:8000/route?origin=')
+    (2, True)
+    """
+    names = graph_store.get_graph('road.csv').get_all_junctions()
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(num_requests):
+        params = {'origin': rng.choice(names), 'destination': rng.choice(names)}
+        if endpoint in ('fastest', 'map'):
+            params['mode'] = rng.choice(['cycle', 'motor'])
+        urls.append(base_url + '/' + endpoint + '?' + urllib.parse.urlencode(params))
+    return urls
+
+
+def timed_request(url: str) -> tuple[float, int]:
+    """Return the time in seconds taken to get the response to url, and its status code, which
+    is 0 if no response was received."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except urllib.error.URLError:
+        status = 0
+    return (time.perf_counter() - start, status)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Return the p-th percentile of values, by the nearest rank method.
+
+    Preconditions:
+    - values != []
+    - 0 < p <= 100
+
+    >>> percentile([4.0, 1.0, 3.0, 2.0], 50)
+    2.0
+    >>> percentile([float(i) for i in range(1, 101)], 99)
+    99.0
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_load_test(urls: list[str], concurrency: int) -> dict[str, float]:
+    """Request every url in urls from concurrency threads at once, and return the number of
+    requests, the number that failed (with no response or a server error), the p50 and p99
+    latency in milliseconds and the number of requests answered per second.
+
+    Preconditions:
+    - urls != []
+    - concurrency >= 1
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(timed_request, urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for latency, _ in results]
+    return {'requests': len(results),
+            'errors': sum(1 for _, status in results if status == 0 or status >= 500),
+            'p50_ms': percentile(latencies, 50),
+            'p99_ms': percentile(latencies, 99),
+            'requests_per_second': len(results) / elapsed}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the load test with the given arguments (sys.argv[1:] by default) and print its
+    report."""
+    parser = argparse.ArgumentParser(description='Load test the routing service.')
+    parser.add_argument('--url', help='address of a running service (default: start one here)')
+    parser.add_argument('--endpoint', choices=['route', 'fastest', 'k-paths', 'map'],
+                        default='route', help='endpoint to request (default route)')
+    parser.add_argument('-n', '--requests', type=int, default=1000,
+                        help='number of requests (default 1000)')
+    parser.add_argument('-c', '--concurrency', type=int, default=8,
+                        help='number of requests sent at once (default 8)')
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = service.make_server('localhost', 0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://localhost:{server.server_port}'
+
+    try:
+        report = run_load_test(request_urls(base_url.rstrip('/'), args.endpoint, args.requests),
+                               args.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f'{report["requests"]} requests to /{args.endpoint} from {args.concurrency} threads, '
+          f'{report["errors"]} errors')
+    print(f'p50 {report["p50_ms"]:.2f} ms, p99 {report["p99_ms"]:.2f} ms, '
+          f'{report["requests_per_second"]:.1f} requests per second')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+    else:
+        import doctest
+        doctest.testmod()
+
+        import python_ta
+        python_ta.check_all(config={
+            'max-line-length': 100,
+            'disable': ['E1136'],
+            'extra-imports': ['concurrent.futures', 'argparse', 'random', 'sys', 'threading',
+                              'time', 'urllib.error', 'urllib.parse', 'urllib.request', 'typing',
+                              'graph_store', 'service'],
+            'allowed-io': ['main', 'timed_request'],
+            'max-nested-blocks': 5,
+        })
@@ -2,6 +2,12 @@
 
 Our main file.
 
+Run it without arguments to be asked for a route interactively, or as
+    python main.py batch [queries file] [-o results file]
+to answer a file of route queries (see batch.py), or as
+    python main.py serve [--port 8000]
+to answer route requests over HTTP (see service.py).
+
 Copyright and Usage Information
 ===============================
 
@@ -14,7 +20,7 @@ The GB Road Traffic Counts is produced by the Department for Transport. The Depa
 collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
 last updated in October 2020."""
 
-import interact
+import sys
 
 
 def overall() -> None:
@@ -23,8 +29,28 @@ def overall() -> None:
     junctions to pick one from.
     Show the visualizations for direct path, all paths, and the most efficient path along
     with the total destination and time taken."""
+    # interact asks its questions when it is imported.
+    import interact
     interact.visualize()
 
 
+def batch(argv: list[str]) -> None:
+    """Answer the route queries in the file given in argv without asking the user anything,
+    writing one line of results per query."""
+    import batch as batch_routing
+    batch_routing.main(argv)
+
+
+def serve(argv: list[str]) -> None:
+    """Answer route requests over HTTP with the options given in argv until interrupted."""
+    import service
+    service.main(argv)
+
+
 if __name__ == '__main__':
-    overall()
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        batch(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2:])
+    else:
+        overall()
@@ -0,0 +1,167 @@
+"""CSC111 Final Project, Route Matrices
+
+This python module computes origin-destination matrices: dense NumPy arrays holding the shortest
+distance, or the shortest cycling or driving time, from every origin junction to every destination
+junction. Unreachable destinations are math.inf.
+
+Rather than answering each origin-destination pair separately, each row of a matrix comes from a
+single Dijkstra search from its origin ( route_matrix() ). For small graphs the whole matrix can
+instead be computed with the Floyd-Warshall algorithm on NumPy arrays ( floyd_warshall() ).
+
+Matrices of a csv file can also be stored on disk, so that asking for the same matrix again does not
+recompute it until the csv file changes ( cached_route_matrix() ).
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Optional
+import hashlib
+import json
+import math
+import os
+import numpy as np
+import computations
+import graph_store
+import parallel
+
+WEIGHTS = ('distance', 'cycle', 'motor')
+
+
+def route_matrix(graph: computations.Graph, origins: Optional[list[str]] = None,
+                 destinations: Optional[list[str]] = None, weight: str = 'distance') \
+        -> np.ndarray:
+    """Return a matrix whose entry [i, j] is the shortest distance (if weight is 'distance') or
+    the shortest travel time (if weight is 'cycle' or 'motor') from origins[i] to
+    destinations[j], or math.inf if there is no route. origins and destinations default to every
+    junction in graph.
+
+    Each row is computed by one Dijkstra search from its origin.
+
+    Preconditions:
+    - weight in WEIGHTS
+    - all origins and destinations are junctions of graph
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C', 'D']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0)
+    >>> g.add_road('B', 'C', 2.0, 0, 0)
+    >>> route_matrix(g, ['A', 'C'], ['A', 'B', 'C', 'D']).tolist()
+    [[0.0, 1.0, 3.0, inf], [3.0, 2.0, 0.0, inf]]
+    """
+    if origins is None:
+        origins = graph.get_all_junctions()
+    if destinations is None:
+        destinations = graph.get_all_junctions()
+
+    matrix = np.full((len(origins), len(destinations)), math.inf)
+    for i, origin in enumerate(origins):
+        matrix[i] = matrix_row(graph, (origin, destinations, weight))
+    return matrix
+
+
+def matrix_row(graph: computations.Graph, row: tuple[str, list[str], str]) -> np.ndarray:
+    """Return the row of route_matrix() for the (origin, destinations, weight) of row."""
+    origin, destinations, weight = row
+    distances, _ = computations.dijkstra_keys(graph, computations.junction_key(graph, origin),
+                                              weight=weight)
+    keys = [computations.junction_key(graph, name) for name in destinations]
+    return np.array([distances.get(key, math.inf) for key in keys])
+
+
+def floyd_warshall(graph: computations.Graph, weight: str = 'distance') -> np.ndarray:
+    """Return the matrix of shortest distances or travel times between every pair of junctions
+    in graph, ordered as in graph.get_all_junctions(), using the Floyd-Warshall algorithm.
+
+    This takes time proportional to the cube of the number of junctions and memory proportional
+    to its square, so it is only suitable for small graphs.
+
+    Preconditions:
+    - weight in WEIGHTS
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 0)
+    >>> g.add_road('B', 'C', 2.0, 0, 0)
+    >>> g.add_road('A', 'C', 5.0, 0, 0)
+    >>> floyd_warshall(g).tolist()
+    [[0.0, 1.0, 3.0], [1.0, 0.0, 2.0], [3.0, 2.0, 0.0]]
+    """
+    names = graph.get_all_junctions()
+    index = {computations.junction_key(graph, name): i for i, name in enumerate(names)}
+    matrix = np.full((len(names), len(names)), math.inf)
+    np.fill_diagonal(matrix, 0.0)
+    for key, i in index.items():
+        for other, road_weight in graph.weighted_neighbours(key, weight):
+            j = index[other]
+            matrix[i, j] = min(matrix[i, j], road_weight)
+
+    for k in range(len(names)):
+        np.minimum(matrix, matrix[:, k, np.newaxis] + matrix[np.newaxis, k, :], out=matrix)
+    return matrix
+
+
+def cached_route_matrix(file_name: str = 'road.csv', origins: Optional[list[str]] = None,
+                        destinations: Optional[list[str]] = None, weight: str = 'distance',
+                        cache_dir: str = 'matrix_cache', workers: Optional[int] = 1) \
+        -> np.ndarray:
+    """Return route_matrix() for the road graph of the csv file file_name, reading it from
+    cache_dir if the same matrix was computed before from the current contents of file_name,
+    and otherwise computing it and saving it to cache_dir.
+
+    The rows are computed by parallel.run_parallel() with the given number of worker processes.
+
+    Preconditions:
+    - file_name is a path to the csv file location
+    - weight in WEIGHTS
+    """
+    graph = graph_store.get_compact_graph(file_name)
+    if origins is None:
+        origins = graph.get_all_junctions()
+    if destinations is None:
+        destinations = graph.get_all_junctions()
+
+    source = os.stat(file_name)
+    key = json.dumps([os.path.abspath(file_name), source.st_mtime_ns, source.st_size, weight,
+                      origins, destinations])
+    cache_file = os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.npy')
+    if os.path.exists(cache_file):
+        return np.load(cache_file)
+
+    rows = parallel.run_parallel(matrix_row, ((origin, destinations, weight) for origin in origins),
+                                 file_name, workers, chunk_size=8)
+    matrix = np.array(list(rows)).reshape((len(origins), len(destinations)))
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary = cache_file + '.tmp.npy'
+    np.save(temporary, matrix)
+    os.replace(temporary, cache_file)
+    return matrix
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['hashlib', 'json', 'math', 'os', 'numpy', 'typing', 'computations',
+                          'graph_store', 'parallel'],
+        'allowed-io': ['cached_route_matrix'],
+        'max-nested-blocks': 5,
+    })
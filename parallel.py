@@ -0,0 +1,134 @@
+"""CSC111 Final Project, Parallel Queries
+
+This python module spreads route computations over a pool of worker processes, each of which uses
+the same road graph. The graph is the memory mapped snapshot from graph_store.get_compact_graph():
+it is loaded in this process before the pool starts, so forked workers inherit it copy-on-write,
+and workers started by spawning map the same snapshot file, so its pages are shared either way.
+
+The work is split into chunks of chunk_size items which are handed out to the workers, and the
+results are gathered back in the same order as the items.
+
+The list of parallel computations are:
+- Answer batch route queries as in batch.answer_query() ( route_queries() )
+
+- Compute the rows of an all-pairs table of shortest distances ( distance_rows() )
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Any, Callable, Iterable, Iterator, Optional
+import itertools
+import multiprocessing
+import batch
+import computations
+import graph_store
+
+# The name of the csv file whose graph the workers of this process use.
+_data_file = 'road.csv'
+
+
+def run_parallel(function: Callable[[computations.Graph, Any], Any], items: Iterable,
+                 file_name: str = 'road.csv', workers: Optional[int] = None,
+                 chunk_size: int = 64) -> Iterator:
+    """Yield function(graph, item) for every item in items, in order, where graph is the
+    CompactRoadSystem of file_name. The calls are made by a pool of worker processes, or by
+    os.cpu_count() workers if workers is None.
+
+    If workers is 1, the calls are made in this process without starting a pool.
+
+    Preconditions:
+    - workers is None or workers >= 1
+    - chunk_size >= 1
+    - function can be pickled, so it must be defined at the top level of a module
+    """
+    graph = graph_store.get_compact_graph(file_name)
+    if workers == 1:
+        for item in items:
+            yield function(graph, item)
+        return
+
+    items = iter(items)
+    chunks = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(file_name,)) as pool:
+        for results in pool.imap(_run_chunk, ((function, chunk) for chunk in chunks)):
+            yield from results
+
+
+def _init_worker(file_name: str) -> None:
+    """Prepare a worker process to use the graph of file_name. Forked workers find the graph
+    already loaded in graph_store; spawned workers map the snapshot file."""
+    global _data_file
+    _data_file = file_name
+    graph_store.get_compact_graph(file_name)
+
+
+def _run_chunk(task: tuple[Callable[[computations.Graph, Any], Any], list]) -> list:
+    """Return the results of calling the function of task on each item of its chunk in a
+    worker process."""
+    function, chunk = task
+    graph = graph_store.get_compact_graph(_data_file)
+    return [function(graph, item) for item in chunk]
+
+
+def answer(graph: computations.Graph, query: tuple[str, str, str, str]) -> dict:
+    """Return batch.answer_query() for an (origin, destination, mode, algorithm) query."""
+    return batch.answer_query(graph, *query)
+
+
+def route_queries(queries: Iterable[tuple[str, str, str]], file_name: str = 'road.csv',
+                  workers: Optional[int] = None, chunk_size: int = 64,
+                  algorithm: str = 'dijkstra') -> Iterator[dict]:
+    """Yield the answer of batch.answer_query() with the given algorithm for every
+    (origin, destination, mode) query in queries, in order, computed by a pool of worker
+    processes.
+
+    Preconditions:
+    - workers is None or workers >= 1
+    - chunk_size >= 1
+    - algorithm in computations.ALGORITHMS
+    """
+    return run_parallel(answer, ((origin, destination, mode, algorithm)
+                                 for origin, destination, mode in queries),
+                        file_name, workers, chunk_size)
+
+
+def distance_row(graph: computations.Graph, origin: str) -> dict[str, float]:
+    """Return the shortest distance from origin to every junction reachable from it."""
+    return computations.dijkstra(graph, origin)[0]
+
+
+def distance_rows(origins: Iterable[str], file_name: str = 'road.csv',
+                  workers: Optional[int] = None, chunk_size: int = 8) \
+        -> Iterator[dict[str, float]]:
+    """Yield the shortest distance from each origin in origins to every junction reachable from
+    it, in order, computed by a pool of worker processes. Together the rows form an all-pairs
+    table of shortest distances.
+
+    Preconditions:
+    - workers is None or workers >= 1
+    - chunk_size >= 1
+    """
+    return run_parallel(distance_row, origins, file_name, workers, chunk_size)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136', 'W0603'],
+        'extra-imports': ['itertools', 'multiprocessing', 'typing', 'batch', 'computations',
+                          'graph_store'],
+        'allowed-io': [],
+        'max-nested-blocks': 5,
+    })
@@ -0,0 +1,237 @@
+"""CSC111 Final Project, Shortest Path Trees
+
+This python module keeps everything a single search from one origin junction finds, rather than
+only the one route that was asked for. A shortest path tree records, for every junction that can be
+reached from the origin, the junction before it on its best route from the origin and the total
+weight, distance, travel time and number of roads of that route ( build_tree() ).
+
+Once a tree has been built, the route from its origin to any junction is read off the tree by
+following the previous junctions back to the origin, in time proportional to the length of the
+route ( ShortestPathTree.path_to() ), so asking for many destinations from the same origin costs
+a single search. Trees can be saved to and loaded from JSON files ( save_tree() and load_tree() ),
+and are cached by route_cache.shortest_path_tree().
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Optional
+import json
+import math
+import computations
+
+WEIGHTS = ('distance', 'cycle', 'motor')
+
+
+class ShortestPathTree:
+    """The best routes from one origin junction to every junction that can be reached from it.
+
+    The dictionaries below are keyed by the names of the reached junctions, in the order they
+    were reached, so every junction comes after the junction before it on its route.
+
+    Instance Attributes:
+        - origin - The name of the junction the routes start at.
+        - weight - The road weight the routes have the least total of, as in
+         computations.dijkstra().
+        - mode - The mode of transport of times.
+        - parents - The junction before each junction on its route (None for origin).
+        - costs - The total road weight of the route to each junction.
+        - distances - The length in km of the route to each junction.
+        - times - The time in hours taken to travel along the route to each junction in mode, or
+         math.inf if the route uses a road that cannot be used in mode.
+        - hops - The number of roads on the route to each junction.
+
+    Representation Invariants:
+        - self.weight in WEIGHTS
+        - self.mode in {'cycle', 'motor'}
+        - self.weight == 'distance' or self.mode == self.weight
+        - self.parents[self.origin] is None
+        - all parents, costs, distances, times and hops have the same keys
+    """
+    origin: str
+    weight: str
+    mode: str
+    parents: dict[str, Optional[str]]
+    costs: dict[str, float]
+    distances: dict[str, float]
+    times: dict[str, float]
+    hops: dict[str, int]
+
+    def __init__(self, origin: str, weight: str, mode: str, parents: dict[str, Optional[str]],
+                 costs: dict[str, float], distances: dict[str, float], times: dict[str, float],
+                 hops: dict[str, int]) -> None:
+        """Initialize a shortest path tree from its dictionaries."""
+        self.origin = origin
+        self.weight = weight
+        self.mode = mode
+        self.parents = parents
+        self.costs = costs
+        self.distances = distances
+        self.times = times
+        self.hops = hops
+
+    def reaches(self, end: str) -> bool:
+        """Return whether there is a route from the origin to end."""
+        return end in self.parents
+
+    def path_to(self, end: str) -> list[str]:
+        """Return the route from the origin to end, or [] if there is none.
+
+        >>> import classes
+        >>> g = classes.RoadSystem()
+        >>> for name in ['A', 'B', 'C', 'D']:
+        ...     g.add_junction(name)
+        >>> g.add_road('A', 'B', 1.0, 0, 240)
+        >>> g.add_road('B', 'C', 2.0, 24, 240)
+        >>> tree = build_tree(g, 'A')
+        >>> tree.path_to('C'), tree.path_to('A'), tree.path_to('D')
+        (['A', 'B', 'C'], ['A'], [])
+        """
+        return computations.build_path(self.parents, end)
+
+    def route_to(self, end: str) -> tuple[list[str], float]:
+        """Return the route from the origin to end and its total road weight, or ([], math.inf)
+        if there is none. This is the route computations.point_to_point() finds with Dijkstra's
+        algorithm.
+        """
+        if end not in self.costs:
+            return ([], math.inf)
+        return (self.path_to(end), self.costs[end])
+
+    def to_json(self) -> str:
+        """Return the tree as a JSON string, which tree_from_json() turns back into the tree.
+
+        The junctions are numbered in the order they were reached, and each parent is given by
+        its number, so each junction name is only written once.
+        """
+        names = list(self.parents)
+        index = {name: i for i, name in enumerate(names)}
+        return json.dumps({
+            'origin': self.origin, 'weight': self.weight, 'mode': self.mode, 'junctions': names,
+            'parents': [None if parent is None else index[parent]
+                        for parent in self.parents.values()],
+            'costs': list(self.costs.values()), 'distances': list(self.distances.values()),
+            'times': [None if t == math.inf else t for t in self.times.values()],
+            'hops': list(self.hops.values())
+        })
+
+
+def tree_from_json(text: str) -> ShortestPathTree:
+    """Return the tree whose JSON string, as returned by ShortestPathTree.to_json(), is text.
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 0, 240)
+    >>> g.add_road('B', 'C', 2.0, 24, 240)
+    >>> tree = build_tree(g, 'A', mode='cycle')
+    >>> copy = tree_from_json(tree.to_json())
+    >>> copy.path_to('C'), copy.distances['C'], copy.times, copy.hops['C']
+    (['A', 'B', 'C'], 3.0, {'A': 0.0, 'B': inf, 'C': inf}, 2)
+    """
+    data = json.loads(text)
+    names = data['junctions']
+    return ShortestPathTree(
+        data['origin'], data['weight'], data['mode'],
+        {name: None if parent is None else names[parent]
+         for name, parent in zip(names, data['parents'])},
+        dict(zip(names, data['costs'])), dict(zip(names, data['distances'])),
+        {name: math.inf if t is None else t for name, t in zip(names, data['times'])},
+        dict(zip(names, data['hops'])))
+
+
+def build_tree(graph: computations.Graph, origin: str, weight: str = 'distance',
+               mode: Optional[str] = None) -> ShortestPathTree:
+    """Return the shortest path tree of graph from origin for the given road weight, found by one
+    search with computations.dijkstra().
+
+    The times of the tree are for mode, which is weight itself if weight is 'cycle' or 'motor',
+    and 'motor' by default if weight is 'distance'.
+
+    Preconditions:
+    - origin is a junction of graph
+    - weight in WEIGHTS
+    - mode is None or weight == 'distance' or mode == weight
+
+    >>> import classes
+    >>> g = classes.RoadSystem()
+    >>> for name in ['A', 'B', 'C']:
+    ...     g.add_junction(name)
+    >>> g.add_road('A', 'B', 1.0, 50, 100)
+    >>> g.add_road('B', 'C', 1.0, 50, 100)
+    >>> g.add_road('A', 'C', 1.5, 0, 100)
+    >>> tree = build_tree(g, 'A', 'cycle')
+    >>> tree.path_to('C'), tree.costs['C'], tree.distances['C'], tree.hops['C']
+    (['A', 'B', 'C'], 0.034, 2.0, 2)
+    >>> build_tree(g, 'A').times
+    {'A': 0.0, 'B': 0.017, 'C': 0.017}
+    """
+    if mode is None:
+        mode = 'motor' if weight == 'distance' else weight
+
+    costs, parents = computations.dijkstra(graph, origin, weight=weight)
+    distances, hops = {}, {}
+    # The route to each junction is the route to its parent and one more road, so the times of
+    # a tree for the travel times of its own mode are its costs.
+    times = dict(costs) if weight == mode else {}
+    # Maps each parent to the time of each road leaving it in mode, by the key of the other end.
+    road_times = {}
+    for name, parent in parents.items():
+        if parent is None:
+            distances[name], hops[name] = 0.0, 0
+            times[name] = 0.0
+            continue
+
+        distances[name] = distances[parent] + graph.get_junctions_dist(parent, name)
+        hops[name] = hops[parent] + 1
+        if weight != mode:
+            if parent not in road_times:
+                road_times[parent] = {}
+                for key, road_time in graph.weighted_neighbours(
+                        computations.junction_key(graph, parent), mode):
+                    road_times[parent][key] = min(road_time,
+                                                  road_times[parent].get(key, math.inf))
+            times[name] = times[parent] + road_times[parent].get(
+                computations.junction_key(graph, name), math.inf)
+    return ShortestPathTree(origin, weight, mode, parents, costs, distances, times, hops)
+
+
+def save_tree(tree: ShortestPathTree, file_name: str) -> None:
+    """Save tree to the JSON file file_name."""
+    with open(file_name, 'w') as tree_file:
+        tree_file.write(tree.to_json())
+
+
+def load_tree(file_name: str) -> ShortestPathTree:
+    """Return the tree saved to the JSON file file_name by save_tree().
+
+    Preconditions:
+    - file_name is a path to a file written by save_tree()
+    """
+    with open(file_name) as tree_file:
+        return tree_from_json(tree_file.read())
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['json', 'math', 'typing', 'computations'],
+        'allowed-io': ['save_tree', 'load_tree'],
+        'max-nested-blocks': 5,
+    })
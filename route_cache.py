@@ -0,0 +1,257 @@
+"""CSC111 Final Project, Route Cache
+
+This python module remembers the results of the route computations in computations.py, so that
+asking for the same route again (as the visualizations and the interactive prompts do several
+times for one query) does not search the graph again.
+
+The results are kept in a least recently used cache of bounded size, keyed by the graph, the kind
+of route, the origin and destination, the mode of transport and the search algorithm. Each result
+also records the version of the graph's roads it was computed from ( classes.RoadSystem.versions ):
+once the graph changes in a way that can affect the route, the result is computed again. Graphs
+that cannot change, such as compact.CompactRoadSystem, have no versions and their results stay
+valid.
+
+The list of cached computations are:
+- shortest_route(), fastest_route(), direct_route(), multiple_path() and exact_stops_route(), which
+ take the same arguments as the functions of the same names in computations.py
+
+- The shortest path tree from an origin ( shortest_path_tree() ). Shortest and fastest routes
+ found with Dijkstra's algorithm are read off the tree of their origin, so routes from the same
+ origin to other destinations do not search the graph again. A tree holds a route to every
+ junction, so trees are kept in a separate, smaller cache of TREE_CACHE_SIZE trees.
+
+- The number of hits and misses of the caches ( stats() and tree_stats() )
+
+NOTE: The returned routes are shared between every caller. Callers should not mutate them.
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from typing import Any, Callable, Optional
+import collections
+import threading
+import computations
+import path_tree
+
+
+class RouteCache:
+    """A least recently used cache of route results.
+
+    Instance Attributes:
+        - maxsize - The greatest number of results kept. The least recently used result is
+         dropped when another one is added.
+        - hits - The number of lookups answered from the cache.
+        - misses - The number of lookups that had to compute their result.
+
+    Representation Invariants:
+        - self.maxsize >= 1
+        - self.hits >= 0 and self.misses >= 0
+    """
+    maxsize: int
+    hits: int
+    misses: int
+    # Private Instance Attributes:
+    #     - _entries: Maps each key to the (graph, version, result) of its lookup, from least to
+    #       most recently used.
+    #     - _lock: Guards _entries and the counters when lookups come from several threads.
+    _entries: collections.OrderedDict[tuple, tuple[computations.Graph, int, Any]]
+    _lock: threading.Lock
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """Initialize an empty cache holding at most maxsize results.
+
+        Preconditions:
+        - maxsize >= 1
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, graph: computations.Graph, key: tuple, weight: str,
+               compute: Callable[[], Any]) -> Any:
+        """Return the result remembered for key on graph, or compute() if there is none or the
+        roads of graph have changed since it was computed in a way that affects the given road
+        weight. A computed result is remembered.
+
+        Preconditions:
+        - weight in {'distance', 'cycle', 'motor'}
+
+        >>> import classes
+        >>> g = classes.RoadSystem()
+        >>> cache = RouteCache()
+        >>> cache.lookup(g, ('answer',), 'distance', lambda: 42)
+        42
+        >>> cache.lookup(g, ('answer',), 'distance', lambda: 0)
+        42
+        >>> g.versions['distance'] += 1
+        >>> cache.lookup(g, ('answer',), 'distance', lambda: 0)
+        0
+        >>> (cache.hits, cache.misses)
+        (1, 2)
+        """
+        version = graph.versions[weight] if hasattr(graph, 'versions') else 0
+        full_key = (id(graph),) + key
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] is graph and entry[1] == version:
+                self.hits += 1
+                self._entries.move_to_end(full_key)
+                return entry[2]
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[full_key] = (graph, version, result)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Forget every result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of hits and misses, the number of results kept, and maxsize."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries),
+                    'maxsize': self.maxsize}
+
+
+# The greatest number of shortest path trees kept. Each tree holds several dictionaries with an
+# entry per reachable junction, so this is much smaller than the number of routes kept.
+TREE_CACHE_SIZE = 64
+
+# The caches used by the functions below: one for routes and one for shortest path trees.
+_cache = RouteCache()
+_tree_cache = RouteCache(TREE_CACHE_SIZE)
+
+
+def shortest_route(graph: computations.Graph, start: str, end: str,
+                   algorithm: str = 'dijkstra') -> tuple[list, float]:
+    """Return computations.shortest_route(graph, start, end, algorithm), from the cache if
+    possible.
+
+    If algorithm is 'dijkstra', the route is read off shortest_path_tree(graph, start). The
+    first route asked for from start therefore searches the whole graph instead of stopping once
+    end is reached, and its tree takes memory proportional to the number of junctions. In
+    return, every later route from start, to any destination, needs no search at all while its
+    tree stays among the TREE_CACHE_SIZE most recently used trees.
+    """
+    if algorithm == 'dijkstra':
+        if not computations.has_junction(graph, start) or not computations.has_junction(graph, end):
+            return ([], 0.0)
+        tree = shortest_path_tree(graph, start)
+        if not tree.reaches(end):
+            return ([], 0.0)
+        return (tree.path_to(end), float(tree.costs[end]))
+    return _cache.lookup(graph, ('shortest', start, end, 'distance', algorithm), 'distance',
+                         lambda: computations.shortest_route(graph, start, end, algorithm))
+
+
+def fastest_route(graph: computations.Graph, start: str, end: str, mode: str,
+                  algorithm: str = 'dijkstra') -> tuple[list[str], float, float]:
+    """Return computations.fastest_route(graph, start, end, mode, algorithm), from the cache if
+    possible. If algorithm is 'dijkstra', the route is read off the shortest_path_tree() of start
+    for the travel times in mode.
+    """
+    weight = 'cycle' if mode == 'cycle' else 'motor'
+    if algorithm == 'dijkstra':
+        if not computations.has_junction(graph, start) or not computations.has_junction(graph, end):
+            return ([], 0.0, 0.0)
+        tree = shortest_path_tree(graph, start, weight)
+        if not tree.reaches(end):
+            return ([], 0.0, 0.0)
+        return (tree.path_to(end), round(tree.costs[end], 3), tree.distances[end])
+    return _cache.lookup(graph, ('fastest', start, end, weight, algorithm), weight,
+                         lambda: computations.fastest_route(graph, start, end, mode, algorithm))
+
+
+def shortest_path_tree(graph: computations.Graph, origin: str, weight: str = 'distance',
+                       mode: Optional[str] = None) -> path_tree.ShortestPathTree:
+    """Return path_tree.build_tree(graph, origin, weight, mode), from the cache of trees if
+    possible.
+
+    The tree is computed again once the roads of graph change in a way that affects the travel
+    times in its mode. Every change to the road lengths (adding or removing a road) also changes
+    the travel times, so this covers trees for the weight 'distance' too.
+
+    Preconditions:
+    - origin is a junction of graph
+    - weight in path_tree.WEIGHTS
+    - mode is None or weight == 'distance' or mode == weight
+    """
+    if mode is None:
+        mode = 'motor' if weight == 'distance' else weight
+    return _tree_cache.lookup(graph, ('tree', origin, weight, mode), mode,
+                              lambda: path_tree.build_tree(graph, origin, weight, mode))
+
+
+def direct_route(graph: computations.Graph, start: str, end: str) -> tuple[list, float]:
+    """Return computations.direct_route(graph, start, end), from the cache if possible."""
+    return _cache.lookup(graph, ('direct', start, end, 'distance', 'bfs'), 'distance',
+                         lambda: computations.direct_route(graph, start, end))
+
+
+def multiple_path(graph: computations.Graph, start: str, end: str, n: int = 0) \
+        -> list[tuple[list[str], float]]:
+    """Return computations.multiple_path(graph, start, end, n), from the cache if possible."""
+    return _cache.lookup(graph, ('multiple', start, end, 'distance', 'yen', n), 'distance',
+                         lambda: computations.multiple_path(graph, start, end, n))
+
+
+def exact_stops_route(graph: computations.Graph, start: str, end: str, num_stops: int,
+                      weight: str = 'distance') -> tuple[list[str], float]:
+    """Return computations.exact_stops_route(graph, start, end, num_stops, weight), from the
+    cache if possible."""
+    return _cache.lookup(graph, ('stops', start, end, weight, 'bounded', num_stops), weight,
+                         lambda: computations.exact_stops_route(graph, start, end, num_stops,
+                                                                weight))
+
+
+def stats() -> dict[str, int]:
+    """Return the statistics of the cache of routes used by this module, as in
+    RouteCache.stats()."""
+    return _cache.stats()
+
+
+def tree_stats() -> dict[str, int]:
+    """Return the statistics of the cache of shortest path trees used by this module, as in
+    RouteCache.stats()."""
+    return _tree_cache.stats()
+
+
+def clear() -> None:
+    """Forget every result remembered by this module and reset its counters."""
+    _cache.clear()
+    _tree_cache.clear()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 100,
+        'disable': ['E1136'],
+        'extra-imports': ['collections', 'threading', 'typing', 'computations', 'path_tree'],
+        'allowed-io': [],
+        'max-nested-blocks': 5,
+    })
@@ -0,0 +1,302 @@
+"""CSC111 Final Project, Routing Service
+
+This python module answers route requests over HTTP. The road graph of road.csv is loaded once
+when the service starts, and every request is answered from that same graph in memory, so a route
+costs a graph search rather than starting Python and reading the csv file again.
+
+Each request is answered in its own thread, so slow requests (such as maps) do not hold up others.
+The results are JSON, except for /map which is an HTML page. Junction names are given by the
+query parameters origin and destination.
+
+The list of endpoints are:
+- /route?origin=A&destination=B: the shortest route ( computations.shortest_route() )
+
+- /fastest?origin=A&destination=B&mode=cycle: the fastest route in the mode of transport, which
+ is 'motor' if left out ( computations.fastest_route() )
+
+- /k-paths?origin=A&destination=B&k=3: the k shortest loopless routes, 3 if left out
+ ( computations.k_shortest_paths() )
+
+- /matrix?origin=A&origin=B&destination=C&weight=cycle: the shortest distance, or time if weight
+ is 'cycle' or 'motor', from every origin to every destination, with null where there is no route
+ ( matrix.route_matrix() )
+
+- /map?origin=A&destination=B&mode=cycle&stops=3&k=3: a map of every kind of route, as drawn by
+ visualizations.visualize_all_routes()
+
+The service is started with:
+    python main.py serve --port 8000
+and can be load tested with load_test.py.
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+import argparse
+import itertools
+import json
+import math
+import sys
+import urllib.parse
+import classes
+import computations
+import graph_store
+import matrix
+import route_cache
+import visualizations
+
+# The greatest number of routes /k-paths and /map will look for, and the greatest number of
+# origins times destinations of /matrix, so that one request cannot keep a thread busy for long.
+MAX_PATHS = 20
+MAX_MATRIX_SIZE = 10000
+
+
+def route(graph: classes.RoadSystem, params: dict[str, list[str]]) -> dict:
+    """Return the response to /route: the shortest route from origin to destination.
+
+    Raises a ValueError if a parameter is missing or invalid.
+    """
+    origin, destination = junction_param(graph, params, 'origin'), \
+        junction_param(graph, params, 'destination')
+    path, distance = route_cache.shortest_route(graph, origin, destination)
+    return {'origin': origin, 'destination': destination, 'path': path, 'distance': distance}
+
+
+def fastest(graph: classes.RoadSystem, params: dict[str, list[str]]) -> dict:
+    """Return the response to /fastest: the fastest route from origin to destination in the
+    given mode of transport.
+
+    Raises a ValueError if a parameter is missing or invalid.
+    """
+    origin, destination = junction_param(graph, params, 'origin'), \
+        junction_param(graph, params, 'destination')
+    mode = choice_param(params, 'mode', ('cycle', 'motor'), 'motor')
+    path, time_taken, distance = route_cache.fastest_route(graph, origin, destination, mode)
+    return {'origin': origin, 'destination': destination, 'mode': mode, 'path': path,
+            'time': time_taken, 'distance': distance}
+
+
+def k_paths(graph: classes.RoadSystem, params: dict[str, list[str]]) -> dict:
+    """Return the response to /k-paths: the k shortest loopless routes from origin to
+    destination, in increasing order of distance.
+
+    Raises a ValueError if a parameter is missing or invalid.
+    """
+    origin, destination = junction_param(graph, params, 'origin'), \
+        junction_param(graph, params, 'destination')
+    k = int_param(params, 'k', 3, 1, MAX_PATHS)
+    paths = itertools.islice(computations.k_shortest_paths(graph, origin, destination), k)
+    return {'origin': origin, 'destination': destination,
+            'paths': [{'path': path, 'distance': distance} for path, distance in paths]}
+
+
+def route_matrix(graph: classes.RoadSystem, params: dict[str, list[str]]) -> dict:
+    """Return the response to /matrix: the shortest distances or times from every origin to
+    every destination.
+
+    Raises a ValueError if a parameter is missing or invalid.
+    """
+    origins = [junction_param(graph, {'origin': [name]}, 'origin')
+               for name in params.get('origin', [])]
+    destinations = [junction_param(graph, {'destination': [name]}, 'destination')
+                    for name in params.get('destination', [])]
+    weight = choice_param(params, 'weight', matrix.WEIGHTS, 'distance')
+    if origins == [] or destinations == []:
+        raise ValueError('At least one origin and one destination are needed')
+    elif len(origins) * len(destinations) > MAX_MATRIX_SIZE:
+        raise ValueError(f'At most {MAX_MATRIX_SIZE} origin-destination pairs can be asked for')
+
+    values = matrix.route_matrix(graph, origins, destinations, weight)
+    return {'origins': origins, 'destinations': destinations, 'weight': weight,
+            'matrix': [[value if value != math.inf else None for value in row]
+                       for row in values.tolist()]}
+
+
+def route_map(graph: classes.RoadSystem, params: dict[str, list[str]]) -> str:
+    """Return the response to /map: an HTML page of the map drawn by
+    visualizations.visualize_all_routes(), for the routes in graph. The junction markers are
+    placed at their positions in graph, so no file is read.
+
+    Raises a ValueError if a parameter is missing or invalid.
+    """
+    origin, destination = junction_param(graph, params, 'origin'), \
+        junction_param(graph, params, 'destination')
+    mode = choice_param(params, 'mode', ('cycle', 'motor'), 'motor')
+    stops = int_param(params, 'stops', 0, 0, MAX_PATHS)
+    k = int_param(params, 'k', 3, 1, MAX_PATHS)
+    routes = visualizations.all_routes(origin, destination, mode, stops, k, graph)
+    return visualizations.render_routes(origin, destination, routes, graph=graph) \
+        .get_root().render()
+
+
+# Maps the path of each endpoint to the function returning its response.
+ENDPOINTS: dict[str, Callable[[classes.RoadSystem, dict[str, list[str]]], Union[dict, str]]] = {
+    '/route': route,
+    '/fastest': fastest,
+    '/k-paths': k_paths,
+    '/matrix': route_matrix,
+    '/map': route_map
+}
+
+
+def junction_param(graph: classes.RoadSystem, params: dict[str, list[str]], name: str) -> str:
+    """Return the junction name given by the query parameter name.
+
+    Raises a ValueError if it is missing or is not a junction of graph.
+    """
+    if params.get(name, [''])[0] == '':
+        raise ValueError('Missing parameter: ' + name)
+    elif not computations.has_junction(graph, params[name][0]):
+        raise ValueError('Unknown junction: ' + params[name][0])
+    return params[name][0]
+
+
+def choice_param(params: dict[str, list[str]], name: str, choices: tuple[str, ...],
+                 default: str) -> str:
+    """Return the value of the query parameter name, or default if it is left out.
+
+    Raises a ValueError if it is not one of choices.
+
+    >>> choice_param({'mode': ['cycle']}, 'mode', ('cycle', 'motor'), 'motor')
+    'cycle'
+    >>> choice_param({}, 'mode', ('cycle', 'motor'), 'motor')
+    'motor'
+    """
+    value = params.get(name, [default])[0]
+    if value not in choices:
+        raise ValueError(f'{name} must be one of: ' + ', '.join(choices))
+    return value
+
+
+def int_param(params: dict[str, list[str]], name: str, default: int, low: int, high: int) -> int:
+    """Return the value of the query parameter name as an integer, or default if it is left out.
+
+    Raises a ValueError if it is not a whole number from low to high.
+
+    >>> int_param({'k': ['5']}, 'k', 3, 1, 20)
+    5
+    >>> int_param({'k': ['50']}, 'k', 3, 1, 20)
+    Traceback (most recent call last):
+    ValueError: k must be a whole number from 1 to 20
+    """
+    value = params.get(name, [str(default)])[0]
+    if not value.isdigit() or not low <= int(value) <= high:
+        raise ValueError(f'{name} must be a whole number from {low} to {high}')
+    return int(value)
+
+
+class RoutingServer(ThreadingHTTPServer):
+    """An HTTP server answering route requests from one road graph, each in its own thread.
+
+    Instance Attributes:
+        - graph - The road graph routes are found in.
+        - quiet - Whether requests are not logged.
+    """
+    graph: classes.RoadSystem
+    quiet: bool
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], graph: classes.RoadSystem,
+                 quiet: bool = False) -> None:
+        """Initialize a server listening on address (a host and port) for routes in graph."""
+        self.graph = graph
+        self.quiet = quiet
+        super().__init__(address, RoutingHandler)
+
+
+class RoutingHandler(BaseHTTPRequestHandler):
+    """The handler of a request to a RoutingServer."""
+    server: RoutingServer
+
+    def do_GET(self) -> None:
+        """Answer a GET request with the response of its endpoint in ENDPOINTS."""
+        url = urllib.parse.urlsplit(self.path)
+        if url.path not in ENDPOINTS:
+            self.send_json(404, {'error': 'Unknown endpoint: ' + url.path,
+                                 'endpoints': list(ENDPOINTS)})
+            return
+
+        try:
+            response = ENDPOINTS[url.path](self.server.graph, urllib.parse.parse_qs(url.query))
+        except ValueError as error:
+            self.send_json(400, {'error': str(error)})
+            return
+
+        if isinstance(response, str):
+            self.send_body(200, 'text/html; charset=utf-8', response.encode('utf-8'))
+        else:
+            self.send_json(200, response)
+
+    def send_json(self, status: int, response: dict) -> None:
+        """Send response as JSON with the given status code."""
+        self.send_body(status, 'application/json', json.dumps(response).encode('utf-8'))
+
+    def send_body(self, status: int, content_type: str, body: bytes) -> None:
+        """Send body with the given status code and content type."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Log a request unless the server is quiet."""
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = 'localhost', port: int = 8000, quiet: bool = False) -> RoutingServer:
+    """Return a RoutingServer listening on host and port, with the road graph of road.csv loaded.
+    If port is 0, a free port is chosen, which is given by the server's server_port attribute.
+    """
+    return RoutingServer((host, port), graph_store.get_graph('road.csv'), quiet)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the routing service with the given arguments (sys.argv[1:] by default) until it is
+    interrupted."""
+    parser = argparse.ArgumentParser(description='Answer route requests over HTTP.')
+    parser.add_argument('--host', default='localhost', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on (default 8000)')
+    parser.add_argument('--quiet', action='store_true', help='do not log every request')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.quiet)
+    print(f'Serving routes on http://{args.host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+    else:
+        import doctest
+        doctest.testmod()
+
+        import python_ta
+        python_ta.check_all(config={
+            'max-line-length': 100,
+            'disable': ['E1136'],
+            'extra-imports': ['http.server', 'argparse', 'itertools', 'json', 'math', 'sys',
+                              'urllib.parse', 'typing', 'classes', 'computations',
+                              'graph_store', 'matrix', 'route_cache', 'visualizations'],
+            'allowed-io': ['main'],
+            'max-nested-blocks': 5,
+        })
@@ -0,0 +1,188 @@
+"""CSC111 Final Project, Graph Snapshots
+
+This python module compiles the road map csv file into a binary snapshot of a
+compact.CompactRoadSystem, and loads that snapshot back by memory mapping it. Loading a snapshot
+does not parse any numbers: the arrays of the CompactRoadSystem are read straight out of the mapped
+file, so startup is fast and several processes loading the same snapshot share its memory pages.
+
+The list of functions are:
+- Compile a csv file into a snapshot file ( build_index() )
+
+- Load the snapshot of a csv file, rebuilding it first if it is missing or out of date
+ ( load_snapshot() )
+
+A snapshot can also be built from the command line with:
+    python snapshot.py build-index road.csv
+
+Snapshot file layout (all numbers little endian):
+- A header of HEADER_FORMAT: the MAGIC bytes, the format VERSION, the modification time and size of
+ the csv file it was built from, the number of junctions, road directions, strings and string
+ bytes.
+- The 8 byte arrays offsets, targets, distances, cycles, motor, cycle_times, motor_times,
+ latitudes, longitudes and road_ids of the CompactRoadSystem, in that order.
+- The string table: the offsets of each string followed by their utf-8 bytes. The junction names
+ come first, followed by the road names.
+
+
+Copyright and Usage Information
+===============================
+
+This file is Copyright (c) 2021 by Aditya Shankar Sarma Peri, Praket Kanaujia,
+Aakash Vaithyanathan, and Nazanin Ghazitabatabai.
+
+This module is expected to use data from:
+https://data.gov.uk/dataset/208c0e7b-353f-4e2d-8b7a-1a7118467acc/gb-road-traffic-counts.
+The GB Road Traffic Counts is produced by the Department for Transport. The Department for Transport
+collects traffic data to produce statistics on the level of traffic on roads in Great Britain,
+last updated in October 2020.
+"""
+
+from array import array
+from typing import Optional
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import compact
+
+MAGIC = b'RDSNAPSH'
+VERSION = 1
+HEADER_FORMAT = '<8sIIqqqqqq'
+
+# The name and type code of each array stored in a snapshot, in file order. offsets comes first
+# and has one more element than there are junctions; the others have one element per road
+# direction.
+EDGE_ARRAYS = [('targets', 'q'), ('distances', 'd'), ('cycles', 'q'), ('motor', 'q'),
+               ('cycle_times', 'd'), ('motor_times', 'd'), ('latitudes', 'd'),
+               ('longitudes', 'd'), ('road_ids', 'q')]
+
+
+def snapshot_path(file_name: str) -> str:
+    """Return the default snapshot file name for the csv file file_name.
+
+    >>> snapshot_path('road.csv')
+    'road.snapshot'
+    """
+    return os.path.splitext(file_name)[0] + '.snapshot'
+
+
+def build_index(file_name: str, output: Optional[str] = None) -> str:
+    """Compile the csv file file_name into a snapshot file and return the snapshot's file name.
+
+    The snapshot is written to output, or to snapshot_path(file_name) if output is None. It is
+    first written to a new temporary file in the same directory which then replaces output, so
+    a process loading the snapshot at the same time never sees a partly written file, and
+    processes rebuilding it at the same time never write to the same file.
+
+    Preconditions
+       - file_name is a path to the csv file location
+    """
+    if output is None:
+        output = snapshot_path(file_name)
+
+    source = os.stat(file_name)
+    graph = compact.load_compact_graph(file_name)
+    strings = [name.encode('utf-8') for name in graph.names + graph.road_names]
+    string_offsets = array('q', [0])
+    for string in strings:
+        string_offsets.append(string_offsets[-1] + len(string))
+
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(output)),
+                                     prefix=os.path.basename(output) + '.', suffix='.tmp',
+                                     delete=False) as snapshot_file:
+        snapshot_file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, source.st_mtime_ns,
+                                        source.st_size, len(graph.names), len(graph.targets),
+                                        len(strings), string_offsets[-1]))
+        snapshot_file.write(array('q', graph.offsets).tobytes())
+        for name, type_code in EDGE_ARRAYS:
+            snapshot_file.write(array(type_code, getattr(graph, name)).tobytes())
+        snapshot_file.write(string_offsets.tobytes())
+        snapshot_file.write(b''.join(strings))
+
+    # Temporary files can only be read by their owner, unlike the files other processes share.
+    os.chmod(snapshot_file.name, 0o644)
+    os.replace(snapshot_file.name, output)
+    return output
+
+
+def is_current(file_name: str, snapshot_file: str, magic: bytes = MAGIC,
+               version: int = VERSION) -> bool:
+    """Return whether snapshot_file exists, starts with the given magic bytes and format version,
+    and was built from the current contents of the csv file file_name.
+
+    Other binary files built from a csv file, such as hierarchy.py's, use the same header layout
+    with their own magic bytes and version, so this checks them too."""
+    if not os.path.exists(snapshot_file):
+        return False
+
+    source = os.stat(file_name)
+    with open(snapshot_file, 'rb') as f:
+        header = f.read(struct.calcsize(HEADER_FORMAT))
+    if len(header) < struct.calcsize(HEADER_FORMAT):
+        return False
+
+    file_magic, file_version, _, mtime, size = struct.unpack(HEADER_FORMAT, header)[:5]
+    return file_magic == magic and file_version == version and mtime == source.st_mtime_ns \
+        and size == source.st_size
+
+
+def load_snapshot(file_name: str, snapshot_file: Optional[str] = None) \
+        -> compact.CompactRoadSystem:
+    """Return the CompactRoadSystem of the csv file file_name, memory mapped from its snapshot.
+
+    The snapshot is read from snapshot_file, or from snapshot_path(file_name) if snapshot_file is
+    None. If the snapshot does not exist or is out of date, it is rebuilt first.
+
+    Preconditions
+       - file_name is a path to the csv file location
+    """
+    if snapshot_file is None:
+        snapshot_file = snapshot_path(file_name)
+    if not is_current(file_name, snapshot_file):
+        build_index(file_name, snapshot_file)
+
+    with open(snapshot_file, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    header_size = struct.calcsize(HEADER_FORMAT)
+    _, _, _, _, _, num_junctions, num_edges, num_strings, _ = \
+        struct.unpack(HEADER_FORMAT, view[:header_size])
+
+    position = header_size
+    offsets = view[position:position + 8 * (num_junctions + 1)].cast('q')
+    position += 8 * (num_junctions + 1)
+    arrays = {}
+    for name, type_code in EDGE_ARRAYS:
+        arrays[name] = view[position:position + 8 * num_edges].cast(type_code)
+        position += 8 * num_edges
+
+    string_offsets = view[position:position + 8 * (num_strings + 1)].cast('q')
+    position += 8 * (num_strings + 1)
+    string_bytes = view[position:]
+    strings = [str(string_bytes[string_offsets[i]:string_offsets[i + 1]], 'utf-8')
+               for i in range(num_strings)]
+
+    return compact.CompactRoadSystem(strings[:num_junctions], offsets, arrays.pop('targets'),
+                                     arrays.pop('distances'), arrays.pop('cycles'),
+                                     arrays.pop('motor'), road_names=strings[num_junctions:],
+                                     **arrays)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == 'build-index':
+        print(build_index(*sys.argv[2:4]))
+    else:
+        import doctest
+        doctest.testmod()
+
+        import python_ta
+        python_ta.check_all(config={
+            'max-line-length': 100,
+            'disable': ['E1136'],
+            'extra-imports': ['array', 'mmap', 'os', 'struct', 'sys', 'tempfile', 'typing',
+                              'compact'],
+            'allowed-io': ['build_index', 'is_current', 'load_snapshot'],
+            'max-nested-blocks': 5,
+        })
@@ -17,6 +17,9 @@ The list of possible visualizations are:
 - Plot the path with shortest time taken between the start and end junctions
 ( visualize_shortest_time_path() )
 
+- Plot every kind of route above on one map, each in a layer that can be shown or hidden
+( visualize_all_routes(), which computes the routes and passes them to render_routes() )
+
 
 Copyright and Usage Information
 ===============================
@@ -31,11 +34,13 @@ collects traffic data to produce statistics on the level of traffic on roads in
 last updated in October 2020.
 """
 
-from typing import Tuple
+from typing import Iterable, Optional, Tuple
+import itertools
 import random
 import folium
 import classes
-import computations
+import graph_store
+import route_cache
 
 
 def visualize_multiple_path(start: str, end: str, n: int) -> None:
@@ -61,7 +66,7 @@ def visualize_multiple_path(start: str, end: str, n: int) -> None:
               ' different start and end junctions.')
         return None
 
-    dict_junctions = classes.load_dict('road.csv')
+    dict_junctions = graph_store.get_dict('road.csv')
     end_junc_coord = [dict_junctions[end][0]['latitude'], dict_junctions[end][0]['longitude']]
 
     dict_road_coords = {}
@@ -71,14 +76,13 @@ def visualize_multiple_path(start: str, end: str, n: int) -> None:
     folium.Marker(location=end_junc_coord, popup='<b>' + end + '</b>',
                   tooltip='<b>Click here to see junction name</b>',
                   icon=folium.Icon(color='beige', icon='road')).add_to(plot_map)
-    graph = classes.load_graph('road.csv')
-    dict_path = computations.multiple_path(graph, start, end, n)
+    graph = graph_store.get_graph('road.csv')
+    list_paths = [path for path, _ in route_cache.multiple_path(graph, start, end, n)]
 
     colours = ['red', 'blue', 'purple', 'green', 'orange', 'gray', 'black', 'pink']
     colours_markers = colours.copy()
 
-    if dict_path != {}:
-        list_paths = [dict_path[key] for key in dict_path]
+    if list_paths != []:
         # Plot different markers for all junctions in list_paths.
         req_plotting_variables = [colours_markers, end_junc_coord, plot_map]
         helper_plot_markers(graph, list_paths, dict_road_coords, start, req_plotting_variables)
@@ -104,6 +108,9 @@ def visualize_path_specific_stops(start: str, end: str, num_stops: int) -> Tuple
     The method saves the map result in a separate file called 'path_with_specific_stops.html',
     which when opened shows the visualization.
 
+    The path is the shortest one that stops at exactly num_stops junctions between start and end
+    without passing through any junction twice ( computations.exact_stops_route() ).
+
     The function also returns a Tuple(bool, float) which represents whether we could find such a
     path which the given num_stops or not along with the cumulative distance of this path.
     These return values are used in the main file appropriately
@@ -125,7 +132,7 @@ def visualize_path_specific_stops(start: str, end: str, num_stops: int) -> Tuple
               ' different start and end junctions.')
         return (False, 0.0)
 
-    dict_junctions = classes.load_dict('road.csv')
+    dict_junctions = graph_store.get_dict('road.csv')
     end_junc_coord = [dict_junctions[end][0]['latitude'], dict_junctions[end][0]['longitude']]
 
     dict_road_coords = {}
@@ -135,38 +142,25 @@ def visualize_path_specific_stops(start: str, end: str, num_stops: int) -> Tuple
     folium.Marker(location=end_junc_coord, popup='<b>' + end + '</b>',
                   tooltip='<b>Click here to see junction name</b>',
                   icon=folium.Icon(color='green', icon='road')).add_to(plot_map)
-    graph = classes.load_graph('road.csv')
-    dict_path = computations.multiple_path(graph, start, end)
-
-    if dict_path != {}:
-        list_paths = [dict_path[key] for key in dict_path]
-
-        specific_stops_paths = [path for path in list_paths if len(path) == num_stops + 2]
+    graph = graph_store.get_graph('road.csv')
+    specific_stops_path, distance = route_cache.exact_stops_route(graph, start, end, num_stops)
 
-        if specific_stops_paths != []:
-            specific_stops_path = specific_stops_paths[0]
-            # Plot different markers for shortest path
-            req_plotting_variables = [end_junc_coord, plot_map]
-            helper_plot_specific_marker(graph, specific_stops_path, dict_road_coords, start,
-                                        req_plotting_variables)
-
-            # Plot link between different markers for shortest path
-            helper_plot_shortest_road_links(specific_stops_path, end, end_junc_coord,
-                                            dict_road_coords, plot_map)
-
-            # dist_specific_stop_path = [key for key in dict_path
-            #                            if dict_path[key] == specific_stops_path][0]
+    if specific_stops_path != []:
+        # Plot different markers for shortest path
+        req_plotting_variables = [end_junc_coord, plot_map]
+        helper_plot_specific_marker(graph, specific_stops_path, dict_road_coords, start,
+                                    req_plotting_variables)
 
-            print('\n\nHOORAY! A map with paths with specific stops has been traced and generated. '
-                  'Please open the "path_with_specific_stops.html" file '
-                  'under Plots_Generated folder to view the plot.')
-            plot_map.save('Plots_Generated/path_with_specific_stops.html')
+        # Plot link between different markers for shortest path
+        helper_plot_shortest_road_links(specific_stops_path, end, end_junc_coord,
+                                        dict_road_coords, plot_map)
 
-            return (True, [key for key in dict_path
-                           if dict_path[key] == specific_stops_path][0])
+        print('\n\nHOORAY! A map with paths with specific stops has been traced and generated. '
+              'Please open the "path_with_specific_stops.html" file '
+              'under Plots_Generated folder to view the plot.')
+        plot_map.save('Plots_Generated/path_with_specific_stops.html')
 
-        else:
-            return (False, 0.0)
+        return (True, distance)
 
     else:
         return (False, 0.0)
@@ -194,7 +188,7 @@ def visualize_shortest_path(start: str, end: str) -> bool:
         print(' The start and end end junctions are the same! Please re run the program with '
               ' different start and end junctions.')
         return False
-    dict_junctions = classes.load_dict('road.csv')
+    dict_junctions = graph_store.get_dict('road.csv')
     end_junc_coord = [dict_junctions[end][0]['latitude'], dict_junctions[end][0]['longitude']]
 
     dict_road_coords = {}
@@ -204,16 +198,16 @@ def visualize_shortest_path(start: str, end: str) -> bool:
     folium.Marker(location=end_junc_coord, popup='<b>' + end + '</b>',
                   tooltip='<b>Click here to see junction name</b>',
                   icon=folium.Icon(color='green', icon='road')).add_to(plot_map)
-    graph = classes.load_graph('road.csv')
-    dict_path = computations.multiple_path(graph, start, end, 2)
+    graph = graph_store.get_graph('road.csv')
+    other_paths = route_cache.multiple_path(graph, start, end, 2)
 
-    shortest_path = computations.shortest_route(graph, start, end)[0]
+    shortest_path = route_cache.shortest_route(graph, start, end)[0]
 
     colours = ['red', 'blue', 'purple', 'orange', 'gray', 'black', 'pink']
     colours_other_markers = colours.copy()
 
-    if dict_path != {} and shortest_path != []:
-        list_paths = [dict_path[key] for key in dict_path]
+    if other_paths != [] and shortest_path != []:
+        list_paths = [path for path, _ in other_paths]
         if shortest_path in list_paths:
             list_paths.remove(shortest_path)
 
@@ -268,7 +262,7 @@ def visualize_direct_path(start: str, end: str) -> bool:
               ' different start and end junctions.')
         return False
 
-    dict_junctions = classes.load_dict('road.csv')
+    dict_junctions = graph_store.get_dict('road.csv')
     end_junc_coord = [dict_junctions[end][0]['latitude'], dict_junctions[end][0]['longitude']]
 
     dict_road_coords = {}
@@ -278,16 +272,16 @@ def visualize_direct_path(start: str, end: str) -> bool:
     folium.Marker(location=end_junc_coord, popup='<b>' + end + '</b>',
                   tooltip='<b>Click here to see junction name</b>',
                   icon=folium.Icon(color='green', icon='road')).add_to(plot_map)
-    graph = classes.load_graph('road.csv')
-    dict_path = computations.multiple_path(graph, start, end, 2)
+    graph = graph_store.get_graph('road.csv')
+    other_paths = route_cache.multiple_path(graph, start, end, 2)
 
-    direct_path = computations.direct_route(graph, start, end)[0]
+    direct_path = route_cache.direct_route(graph, start, end)[0]
 
     colours = ['red', 'blue', 'purple', 'orange', 'gray', 'black', 'pink']
     colours_other_markers = colours.copy()
 
-    if dict_path != {} and direct_path != []:
-        list_paths = [dict_path[key] for key in dict_path]
+    if other_paths != [] and direct_path != []:
+        list_paths = [path for path, _ in other_paths]
         if direct_path in list_paths:
             list_paths.remove(direct_path)
 
@@ -342,7 +336,7 @@ def visualize_shortest_time_path(start: str, end: str, mode: str) -> bool:
               ' different start and end junctions.')
         return False
 
-    dict_junctions = classes.load_dict('road.csv')
+    dict_junctions = graph_store.get_dict('road.csv')
     end_junc_coord = [dict_junctions[end][0]['latitude'], dict_junctions[end][0]['longitude']]
 
     dict_road_coords = {}
@@ -352,20 +346,11 @@ def visualize_shortest_time_path(start: str, end: str, mode: str) -> bool:
     folium.Marker(location=end_junc_coord, popup='<b>' + end + '</b>',
                   tooltip='<b>Click here to see junction name</b>',
                   icon=folium.Icon(color='green', icon='road')).add_to(plot_map)
-    graph = classes.load_graph('road.csv')
-    dict_path = computations.multiple_path(graph, start, end, 2)
-
-    if dict_path != {}:
-        list_paths = [dict_path[key] for key in dict_path]
-        time_between_juncs = []
-        shortest_time_path_tuple = computations.path_with_shortest_time(graph, mode, dict_path)
-        for i in range(len(shortest_time_path_tuple[0]) - 1):
-            time_between_juncs.append(
-                graph.time_taken_between_junctions(mode, shortest_time_path_tuple[0][i],
-                                                   shortest_time_path_tuple[0][i + 1]))
+    graph = graph_store.get_graph('road.csv')
+    shortest_time_path_tuple = route_cache.fastest_route(graph, start, end, mode)
 
-        if shortest_time_path_tuple[1] in list_paths:
-            list_paths.remove(shortest_time_path_tuple[1])
+    if shortest_time_path_tuple[0] != []:
+        time_between_juncs = graph.path_travel_times(shortest_time_path_tuple[0], mode).tolist()
 
         # Plot different markers for shortest_time_path
         req_plotting_variables = [end_junc_coord, plot_map]
@@ -389,6 +374,155 @@ def visualize_shortest_time_path(start: str, end: str, mode: str) -> bool:
         return False
 
 
+def visualize_all_routes(start: str, end: str, mode: str, num_stops: int, n: int) -> bool:
+    """This method draws every kind of route between the start and end junctions on one map: up
+    to n multiple paths, the shortest path, the most direct path, the path with the shortest time
+    for the given mode of transport and the path with num_stops stops. Each kind of route is a
+    layer that can be shown or hidden from the control in the corner of the map.
+    The method saves the map result in a separate file called 'all_routes.html', which when
+    opened shows the visualization.
+
+    The routes are found by all_routes(). Return whether any route was found.
+
+    file_path: 'road.csv'
+
+    Preconditions
+     - start != ''
+     - end != ''
+     - start and end represent appropriate places on the map
+     - num_stops >= 0
+     """
+    if start == end:
+        print(' The start and end end junctions are the same! Please re run the program with '
+              ' different start and end junctions.')
+        return False
+
+    routes = all_routes(start, end, mode, num_stops, n)
+    if all(paths == [] for paths in routes.values()):
+        print(f'\n\nSorry! No path exists between the {start} and {end} junctions.')
+        return False
+
+    render_routes(start, end, routes, 'Plots_Generated/all_routes.html')
+    print('\n\nHOORAY! A map with every kind of route has been traced and generated. '
+          'Please open the "all_routes.html" file under Plots_Generated folder to view the plot.')
+    return True
+
+
+def all_routes(start: str, end: str, mode: str, num_stops: int, n: int,
+               graph: Optional[classes.RoadSystem] = None) \
+        -> dict[str, list[tuple[list[str], str]]]:
+    """Return the routes drawn by visualize_all_routes() in graph, in the form taken by
+    render_routes(). Layers whose route was not found are empty.
+
+    The routes come from route_cache, so asking for the same routes again (for example, from
+    several requests for the same map) does not search the graph again.
+
+    file_path: 'road.csv', the default graph if graph is None
+
+    Preconditions
+     - start != ''
+     - end != ''
+     - num_stops >= 0
+     """
+    if graph is None:
+        graph = graph_store.get_graph('road.csv')
+    fastest_path, fastest_time, _ = route_cache.fastest_route(graph, start, end, mode)
+    routes = {
+        'Multiple paths': [(path, f'{distance} KM') for path, distance in
+                           route_cache.multiple_path(graph, start, end, n)],
+        'Shortest path': [(route_cache.shortest_route(graph, start, end)[0], 'Shortest path')],
+        'Most direct path': [(route_cache.direct_route(graph, start, end)[0],
+                              'Most direct path')],
+        'Shortest time path': [(fastest_path, f'{fastest_time} hours')],
+        f'Path with {num_stops} stops': [(route_cache.exact_stops_route(graph, start, end,
+                                                                        num_stops)[0],
+                                          f'Path with {num_stops} stops')]
+    }
+    return {layer: [(path, label) for path, label in paths if len(path) >= 2]
+            for layer, paths in routes.items()}
+
+
+def render_routes(start: str, end: str, routes: dict[str, list[tuple[list[str], str]]],
+                  output: Optional[str] = None,
+                  graph: Optional[classes.RoadSystem] = None) -> folium.Map:
+    """Return a map of the already computed routes in graph, saving it to the html file output
+    if it is not None.
+
+    routes maps the name of each layer of the map to the (path, label) of every route in that
+    layer, where the label is shown when hovering over the route. Each route is drawn as one
+    line in its own colour.
+
+    Every junction on any of the routes gets a single marker, placed at its coordinates in graph
+    from junction_coordinates(), in a layer of its own. The start and end junctions are green and
+    the others are gray. Junctions without coordinates are left out.
+
+    file_path: 'road.csv', the default graph if graph is None
+
+    Preconditions
+     - every path in routes is a list of junction names of graph
+    """
+    junctions = {name: None for paths in routes.values() for path, _ in paths for name in path}
+    coordinates = junction_coordinates(junctions, graph)
+    plot_map = folium.Map(location=[51.509865, -0.118092], tiles='cartodbpositron',
+                          zoom_start=12)
+    colours = itertools.cycle(['green', 'red', 'blue', 'purple', 'orange', 'gray', 'black',
+                               'pink'])
+    for layer, paths in routes.items():
+        group = folium.FeatureGroup(name=layer)
+        for path, label in paths:
+            points = [coordinates[name] for name in path if name in coordinates]
+            if len(points) >= 2:
+                folium.PolyLine(points, tooltip='<b>' + label + '</b>',
+                                popup='<b>' + ' &rarr; '.join(path) + '</b>', color=next(colours),
+                                weight=4.5, opacity=0.6).add_to(group)
+        group.add_to(plot_map)
+
+    markers = folium.FeatureGroup(name='Junctions')
+    for name in junctions:
+        if name in coordinates:
+            folium.Marker(location=coordinates[name], popup='<b>' + name + '</b>',
+                          tooltip='<b><i>Click here to see junction name</i></b>',
+                          icon=folium.Icon(color='green' if name in (start, end) else 'gray',
+                                           icon='road')).add_to(markers)
+    markers.add_to(plot_map)
+    folium.LayerControl().add_to(plot_map)
+
+    if output is not None:
+        plot_map.save(output)
+    return plot_map
+
+
+def junction_coordinates(junctions: Iterable[str], graph: Optional[classes.RoadSystem] = None) \
+        -> dict[str, list[float]]:
+    """Return a dictionary mapping each of the given junctions of graph to the
+    [latitude, longitude] its marker is placed at.
+
+    For the default graph of 'road.csv' (graph is None), this is the location of the first road
+    starting at the junction, as used for the end junction markers of the other visualizations.
+    For junctions that no road starts at, and for every junction of a graph that is given, it is
+    the position from classes.RoadSystem.junction_position(), so 'road.csv' is only read when
+    graph is None. Junctions with no position are left out.
+
+    file_path: 'road.csv', the default graph if graph is None
+
+    Preconditions
+     - every junction in junctions is a junction of graph
+    """
+    if graph is None:
+        graph = graph_store.get_graph('road.csv')
+        dict_junctions = graph_store.get_dict('road.csv')
+    else:
+        dict_junctions = {}
+    coordinates = {}
+    for name in junctions:
+        if name in dict_junctions:
+            coordinates[name] = [dict_junctions[name][0]['latitude'],
+                                 dict_junctions[name][0]['longitude']]
+        elif graph.junction_position(name) is not None:
+            coordinates[name] = list(graph.junction_position(name)[:2])
+    return coordinates
+
+
 def helper_plot_markers(graph: classes.RoadSystem(), list_paths: list, dict_road_coords: dict,
                         start: str, req_plotting_variables: list) -> None:
     """This is a helper method for visualize_multiple_path() method.
@@ -417,10 +551,8 @@ def helper_plot_markers(graph: classes.RoadSystem(), list_paths: list, dict_road
                                   ).add_to(req_plotting_variables[2])
                 else:
                     coordinates = graph.get_junctions_location(start=path[i], end=path[i + 1])
-                    if coordinates == end_junc_coord:
-                        list_paths.remove(path)
-                    else:
-                        dict_road_coords[path[i]] = coordinates
+                    dict_road_coords[path[i]] = coordinates
+                    if coordinates != end_junc_coord:
                         folium.Marker(location=coordinates, popup='<b>' + path[i] + '</b>',
                                       tooltip='<b><i>Click here to see junction name</i></b>',
                                       icon=folium.Icon(color=colour, icon='road')
@@ -456,10 +588,10 @@ def helper_plot_specific_marker(graph: classes.RoadSystem(), shortest_path: list
             else:
                 coordinates = graph.get_junctions_location(start=shortest_path[i],
                                                            end=shortest_path[i + 1])
+                dict_road_coords[shortest_path[i]] = coordinates
                 if coordinates == end_junc_coord:
                     return None
                 else:
-                    dict_road_coords[shortest_path[i]] = coordinates
                     folium.Marker(location=coordinates, popup='<b>' + shortest_path[i] + '</b>',
                                   tooltip='<b><i>Click here to see junction name</i></b>',
                                   icon=folium.Icon(color='gray', icon='road')
@@ -499,10 +631,10 @@ def helper_plot_shortest_marker(graph: classes.RoadSystem(), shortest_path: list
             else:
                 coordinates = graph.get_junctions_location(start=shortest_path[i],
                                                            end=shortest_path[i + 1])
+                dict_road_coords[shortest_path[i]] = coordinates
                 if coordinates == end_junc_coord:
                     return None
                 else:
-                    dict_road_coords[shortest_path[i]] = coordinates
                     folium.Marker(location=coordinates, popup='<b>' + shortest_path[i] + '</b>',
                                   tooltip='<b><i>Click here to see junction name</i></b>',
                                   icon=folium.Icon(color='gray', icon='road')
@@ -645,6 +777,10 @@ if __name__ == '__main__':
 
     # visualize_shortest_time_path('A406', 'M1 spur', 'cycle')
 
+    # Every kind of route on one map
+
+    # visualize_all_routes('LA Boundary', 'A406', 'cycle', 3, 5)
+
     # import python_ta.contracts
     # python_ta.contracts.check_all_contracts()
 
@@ -652,7 +788,9 @@ if __name__ == '__main__':
     python_ta.check_all(config={
         'max-line-length': 100,
         'disable': ['E9998'],
-        'extra-imports': ['folium', 'random', 'classes', 'typing', 'computations'],
-        'allowed-io': ['classes.get_junctions_location', 'classes.load_graph'],
+        'extra-imports': ['folium', 'itertools', 'random', 'classes', 'typing', 'graph_store',
+                          'route_cache'],
+        'allowed-io': ['classes.get_junctions_location', 'classes.load_graph',
+                       'visualize_all_routes'],
         'max-nested-blocks': 5,
     })